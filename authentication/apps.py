@@ -5,3 +5,6 @@ class AuthenticationConfig(AppConfig):
     name = 'authentication'
     verbose_name = 'Authentication'
 
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+
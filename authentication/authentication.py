@@ -0,0 +1,66 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+# The CACHES alias holding token lookups; checks.py rejects per-process backends.
+TOKEN_CACHE_ALIAS = 'auth_tokens'
+
+
+def token_cache_key(key):
+    # Hashed so raw tokens never end up in a shared cache backend.
+    return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_cached_tokens(keys):
+    caches[TOKEN_CACHE_ALIAS].delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that keeps the token -> user lookup in the shared
+    'auth_tokens' cache for AUTH_TOKEN_CACHE_TIMEOUT seconds. Entries are
+    dropped when the token is deleted (e.g. on logout) or the user is saved
+    (see signals.py), for every worker at once.
+
+    The cache holds the user's field values without the password hash; a user
+    rebuilt from it has the password deferred, so checking a password loads it
+    and saving the user writes only the other fields.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = caches[TOKEN_CACHE_ALIAS]
+        cache_key = token_cache_key(key)
+        cached = cache.get(cache_key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, self._to_cache(user, token), getattr(settings, 'AUTH_TOKEN_CACHE_TIMEOUT', 300))
+            return user, token
+
+        user, token = self._from_cache(key, cached)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return user, token
+
+    @staticmethod
+    def _to_cache(user, token):
+        # Plain values: a FieldFile, for one, would pickle the whole user with it.
+        fields = {
+            field.attname: field.get_prep_value(field.value_from_object(user))
+            for field in user._meta.concrete_fields
+            if field.attname != 'password'
+        }
+        return {'user': fields, 'token_created': token.created}
+
+    def _from_cache(self, key, cached):
+        User, Token = get_user_model(), self.get_model()
+        fields = cached['user']
+        user = User.from_db(router.db_for_read(User), list(fields), list(fields.values()))
+        token = Token.from_db(router.db_for_read(Token), ['key', 'user_id', 'created'],
+                              [key, user.pk, cached['token_created']])
+        token.user = user
+        return user, token
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+from django.utils.module_loading import import_string
+
+from .authentication import TOKEN_CACHE_ALIAS
+
+PER_PROCESS_HINT = (
+    "Each worker would keep its own copy, so a logout in one worker would leave the token "
+    "valid in the others for up to AUTH_TOKEN_CACHE_TIMEOUT seconds. Use a backend shared by "
+    "every worker (file, database, Redis or Memcached), or DummyCache to look tokens up every time."
+)
+
+
+@register(Tags.caches, Tags.security)
+def check_token_cache(app_configs, **kwargs):
+    options = settings.CACHES.get(TOKEN_CACHE_ALIAS)
+    if options is None:
+        return [Error(
+            f"CACHES has no '{TOKEN_CACHE_ALIAS}' alias for CachedTokenAuthentication.",
+            hint="Add one with a backend shared by every worker, e.g. FileBasedCache.",
+            id='authentication.E001',
+        )]
+    if issubclass(import_string(options['BACKEND']), LocMemCache):
+        return [Error(
+            f"CACHES['{TOKEN_CACHE_ALIAS}'] is a per-process cache.",
+            hint=PER_PROCESS_HINT, id='authentication.E002',
+        )]
+    return []
@@ -0,0 +1,83 @@
+import pickle
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .authentication import TOKEN_CACHE_ALIAS, token_cache_key
+from .checks import check_token_cache
+
+LOCMEM = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+FILE = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/auth_tokens'}
+
+
+# One process, so a local cache stands in for the shared one (and keeps the
+# tests out of the project's file cache).
+@override_settings(CACHES={'default': LOCMEM, TOKEN_CACHE_ALIAS: {**LOCMEM, 'LOCATION': 'auth-tests'}})
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('asha', 'asha@ayursutra.test', 'x', user_type='patient')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def tearDown(self):
+        caches[TOKEN_CACHE_ALIAS].clear()
+
+    def cached(self):
+        return caches[TOKEN_CACHE_ALIAS].get(token_cache_key(self.token.key))
+
+    def test_lookup_is_cached(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        self.assertIsNotNone(self.cached())
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'asha')
+
+    def test_password_hash_is_not_cached(self):
+        self.client.get('/api/auth/profile/')
+        self.assertNotIn('password', self.cached()['user'])
+        self.assertNotIn(self.user.password.encode(), pickle.dumps(self.cached()))
+
+    def test_saving_a_cached_user_keeps_the_password(self):
+        self.client.get('/api/auth/profile/')
+        response = self.client.put('/api/auth/profile/', {'first_name': 'Asha'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Asha')
+        self.assertTrue(self.user.check_password('x'))
+
+    def test_logout_revokes_the_cached_token(self):
+        self.client.get('/api/auth/profile/')
+        self.assertEqual(self.client.post('/api/auth/logout/').status_code, 204)
+        self.assertIsNone(self.cached())
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get('/api/auth/profile/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.cached())
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+
+class TokenCacheCheckTests(SimpleTestCase):
+
+    def check_ids(self):
+        return [error.id for error in check_token_cache(None)]
+
+    @override_settings(CACHES={'default': LOCMEM})
+    def test_missing_alias(self):
+        self.assertEqual(self.check_ids(), ['authentication.E001'])
+
+    @override_settings(CACHES={'default': LOCMEM, TOKEN_CACHE_ALIAS: LOCMEM})
+    def test_per_process_cache(self):
+        self.assertEqual(self.check_ids(), ['authentication.E002'])
+
+    @override_settings(CACHES={'default': LOCMEM, TOKEN_CACHE_ALIAS: FILE})
+    def test_shared_cache(self):
+        self.assertEqual(self.check_ids(), [])
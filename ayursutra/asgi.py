@@ -3,6 +3,10 @@ ASGI config for ayursutra project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project with an ASGI server (e.g. ``uvicorn ayursutra.asgi:application``)
+so async views such as the streaming chatbot (core.views.chat_stream) run on the
+event loop instead of holding a worker thread for the whole LLM round trip.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
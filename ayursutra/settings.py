@@ -37,8 +37,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.timing.ServerTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.db_routing.ReplicaRoutingMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -76,6 +79,42 @@ DATABASES = {
     }
 }
 
+# Production SQLite profile (see core/backends/sqlite3/base.py), enabled with
+# SQLITE_PROFILE=production. `manage.py sqlite_stress` compares it with the
+# default profile under concurrent writers.
+SQLITE_PRODUCTION_PROFILE = {
+    'ENGINE': 'core.backends.sqlite3',
+    'CONN_MAX_AGE': 600,  # seconds a connection is reused across requests
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'transaction_mode': 'IMMEDIATE',  # take the write lock at BEGIN
+        'pragmas': {
+            'journal_mode': 'WAL',  # readers no longer block the writer
+            'synchronous': 'NORMAL',  # fsync at checkpoints, not every commit
+            'busy_timeout': 5000,  # milliseconds to wait for a lock before "database is locked"
+            'cache_size': -64 * 1024,  # KiB of page cache per connection
+            'mmap_size': 256 * 1024 * 1024,  # bytes of the file read through mmap
+            'temp_store': 'MEMORY',
+        },
+    },
+}
+if os.getenv('SQLITE_PROFILE') == 'production':
+    DATABASES['default'].update(SQLITE_PRODUCTION_PROFILE)
+
+# Read replicas (see core/db_routing.py). DATABASE_REPLICAS is a comma-separated
+# list of SQLite files holding copies of the default database, e.g. kept fresh
+# with `manage.py sync_sqlite_replicas`; other backends can add their replica
+# aliases to DATABASES and REPLICAS directly.
+DATABASE_ROUTERS = ['core.db_routing.PrimaryReplicaRouter']
+DATABASE_REPLICA_ROUTING = {
+    'REPLICAS': [],
+    'STICKY_SECONDS': 5,  # a client reads from the primary this long after a write
+}
+for index, name in enumerate(filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {**DATABASES['default'], 'NAME': name.strip(), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICA_ROUTING['REPLICAS'].append(alias)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -101,16 +140,110 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Caching
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Token -> user lookups (see authentication/authentication.py). Logging out
+    # must reach every worker, so this cannot be a per-process cache; the file
+    # cache is shared by all workers on the host that holds the SQLite file.
+    # Point it at Redis or Memcached when workers span hosts.
+    'auth_tokens': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'auth_tokens',
+        # One entry per token used within AUTH_TOKEN_CACHE_TIMEOUT; past this the
+        # cache culls a third of its entries, so keep it above the number of
+        # clients active in that window.
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    # State every worker must see the same way: cached dashboard stats and
+    # their invalidation (core/stats.py), the chatbot's per-user message
+    # counts (core/throttling.py) and the sticky-primary marks that give
+    # read-after-write across workers (core/db_routing.py). Same reasoning and
+    # backend as above.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'shared',
+        # A stats entry per user, two message counts per chatbot user and a
+        # sticky mark per recently writing client; culls past this could also
+        # drop the admin stats version key.
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+DASHBOARD_STATS_CACHE_TIMEOUT = 60  # seconds
+AUTH_TOKEN_CACHE_TIMEOUT = 300  # seconds a token -> user lookup is reused
+
+# Responses smaller than this are sent uncompressed (see core/middleware.py)
+COMPRESSION_MIN_LENGTH = 1024  # bytes
+
+# Scheduled notification delivery (see core/dispatch.py)
+NOTIFICATION_BACKEND = os.getenv('NOTIFICATION_BACKEND', 'core.dispatch.ConsoleBackend')
+NOTIFICATION_FILE_PATH = BASE_DIR / 'sent_notifications.log'
+NOTIFICATION_DISPATCH_BATCH_SIZE = 100
+
+# Chatbot LLM client (see core/llm.py). To develop without Gemini, run
+# `manage.py fake_llm_server` and set GEMINI_API_ENDPOINT=http://127.0.0.1:8765
+# together with GEMINI_TRANSPORT=rest.
+CHATBOT_LLM = {
+    'MODEL': os.getenv('GEMINI_MODEL', 'gemini-pro'),
+    'API_ENDPOINT': os.getenv('GEMINI_API_ENDPOINT') or None,
+    'TRANSPORT': os.getenv('GEMINI_TRANSPORT') or None,
+    'TIMEOUT': 30,  # seconds allowed for a whole reply
+    'STREAM_THREADS': 8,  # upstream streams bridged from the REST transport
+}
+
+# Replies to repeated chatbot questions (see core/chat_cache.py)
+CHATBOT_CACHE = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 1000,
+    'TTL': 24 * 60 * 60,  # seconds
+    'PERSIST': False,  # also keep replies in the database across restarts
+}
+
+# Limits on concurrent upstream LLM calls per process (see core/admission.py);
+# per-user limits are the 'chatbot' throttle rate in REST_FRAMEWORK below.
+CHATBOT_ADMISSION = {
+    'MAX_CONCURRENT': 8,
+    'MAX_QUEUE': 32,
+    'MAX_WAIT': 10,  # seconds a request may wait for a free slot
+}
+
+# Per-request Server-Timing headers and log lines (see core/timing.py);
+# REQUEST_TIMING=1 turns them on, REQUEST_TIMING_SAMPLE=5 measures 5% of requests.
+REQUEST_TIMING = {
+    'ENABLED': os.getenv('REQUEST_TIMING') == '1',
+    'SAMPLE_PERCENT': float(os.getenv('REQUEST_TIMING_SAMPLE', '100')),
+    'HEADER': True,  # send the Server-Timing header
+    'LOG': True,  # log a JSON line to the core.timing logger
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'authentication.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    'DEFAULT_THROTTLE_RATES': {
+        'chatbot': '10/min',
+    },
 }
\ No newline at end of file
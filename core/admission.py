@@ -0,0 +1,175 @@
+"""
+Admission control for upstream LLM calls.
+
+At most MAX_CONCURRENT calls run at once per process. Further callers wait in
+a FIFO queue of at most MAX_QUEUE entries for up to MAX_WAIT seconds; when the
+queue is full, or the wait runs out, the call is refused with Overloaded, which
+carries a Retry-After estimate. A finishing call hands its slot straight to the
+oldest waiter, so sync (thread) and async (event loop) callers share one queue.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from django.conf import settings
+
+
+class Overloaded(Exception):
+    """ Raised when an LLM call cannot be admitted """
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _ThreadWaiter:
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def wake(self):
+        self.event.set()
+
+
+class _AsyncWaiter:
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def wake(self):
+        self.loop.call_soon_threadsafe(self._set)
+
+    def _set(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class AdmissionController:
+
+    def __init__(self, max_concurrent=8, max_queue=32, max_wait=10.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = deque()
+        self.admitted = self.queued = self.rejected = self.timed_out = 0
+        self.wait_seconds = self.max_wait_seconds = 0.0
+        self.hold_seconds = 0.0
+
+    @contextmanager
+    def slot(self):
+        """Hold an LLM call slot for the duration of the block (blocking)."""
+        started = time.monotonic()
+        waiter = self._enqueue(_ThreadWaiter)
+        if waiter is not None and not waiter.event.wait(self.max_wait) and self._abandon(waiter):
+            raise self._overloaded('Timed out waiting for a free assistant slot.')
+        held = self._admitted(started)
+        try:
+            yield
+        finally:
+            self._release(held)
+
+    @asynccontextmanager
+    async def aslot(self):
+        """Async counterpart of slot(); waiting does not block the event loop."""
+        started = time.monotonic()
+        waiter = self._enqueue(lambda: _AsyncWaiter(asyncio.get_running_loop()))
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(waiter.future, self.max_wait)
+            except TimeoutError:
+                if self._abandon(waiter):
+                    raise self._overloaded('Timed out waiting for a free assistant slot.')
+            except asyncio.CancelledError:
+                if not self._abandon(waiter):
+                    self._release(time.monotonic())
+                raise
+        held = self._admitted(started)
+        try:
+            yield
+        finally:
+            self._release(held)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active': self._active,
+                'queue_depth': len(self._waiters),
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'max_wait': self.max_wait,
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected_queue_full': self.rejected,
+                'rejected_wait_timeout': self.timed_out,
+                'average_wait_seconds': round(self.wait_seconds / self.admitted, 4) if self.admitted else 0.0,
+                'max_wait_seconds': round(self.max_wait_seconds, 4),
+            }
+
+    def _enqueue(self, make_waiter):
+        """Take a free slot (returns None) or join the queue (returns the waiter)."""
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                return None
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                retry_after = self._retry_after()
+            else:
+                waiter = make_waiter()
+                self._waiters.append(waiter)
+                self.queued += 1
+                return waiter
+        raise Overloaded('The assistant is busy; too many requests are waiting.', retry_after)
+
+    def _abandon(self, waiter):
+        """Leave the queue; False if the waiter was handed a slot in the meantime."""
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                return False
+            self.timed_out += 1
+            return True
+
+    def _admitted(self, started):
+        now = time.monotonic()
+        with self._lock:
+            waited = now - started
+            self.admitted += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return now
+
+    def _release(self, held_since):
+        with self._lock:
+            self.hold_seconds += time.monotonic() - held_since
+            if self._waiters:
+                # The slot passes to the next waiter; _active stays the same.
+                self._waiters.popleft().wake()
+            else:
+                self._active -= 1
+
+    def _overloaded(self, message):
+        with self._lock:
+            return Overloaded(message, self._retry_after())
+
+    def _retry_after(self):
+        """Seconds until the queue ahead is likely to drain (caller holds the lock)."""
+        average_hold = self.hold_seconds / self.admitted if self.admitted else 1.0
+        return max(1, math.ceil(average_hold * (len(self._waiters) + 1) / self.max_concurrent))
+
+
+def admission_from_settings():
+    options = getattr(settings, 'CHATBOT_ADMISSION', {})
+    return AdmissionController(
+        max_concurrent=options.get('MAX_CONCURRENT', 8),
+        max_queue=options.get('MAX_QUEUE', 32),
+        max_wait=options.get('MAX_WAIT', 10.0),
+    )
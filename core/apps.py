@@ -10,4 +10,4 @@ class CoreConfig(AppConfig):
         This method is called when Django starts.
         You can use it to register signals or perform other initialization.
         """
-        pass
\ No newline at end of file
+        from . import signals  # noqa: F401
\ No newline at end of file
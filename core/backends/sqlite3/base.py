@@ -0,0 +1,59 @@
+"""
+SQLite backend with per-connection tuning for concurrent use.
+
+Two extra keys are read from the database OPTIONS (and not passed on to
+sqlite3.connect()):
+
+``pragmas``
+    Ordered mapping of PRAGMA name to value, run on every new connection
+    after Django's own set-up, e.g. ``{'journal_mode': 'WAL'}``.
+
+``transaction_mode``
+    ``'DEFERRED'`` (SQLite's and Django's default), ``'IMMEDIATE'`` or
+    ``'EXCLUSIVE'``; used for the BEGIN that opens every atomic() block.
+    A deferred transaction that reads before it writes has to upgrade its
+    lock halfway through, and when another connection already holds the
+    write lock SQLite fails that upgrade at once with "database is locked"
+    instead of waiting out the busy timeout. IMMEDIATE takes the write lock
+    at BEGIN, where waiting is safe. Django 5.1 grew the same option; this
+    backend provides it on 5.0.
+
+Everything else behaves like django.db.backends.sqlite3.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.pop('pragmas', None)
+        kwargs.pop('transaction_mode', None)
+        return kwargs
+
+    @property
+    def pragmas(self):
+        return self.settings_dict['OPTIONS'].get('pragmas') or {}
+
+    @property
+    def transaction_mode(self):
+        mode = (self.settings_dict['OPTIONS'].get('transaction_mode') or 'DEFERRED').upper()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}, not {mode!r}."
+            )
+        return mode
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.transaction_mode
+        self.cursor().execute('BEGIN' if mode == 'DEFERRED' else f'BEGIN {mode}')
@@ -0,0 +1,583 @@
+"""
+Offline end-to-end API benchmark.
+
+run_benchmark() loads a synthetic clinic (core/synthetic_data.py) into the
+current database, then calls every endpoint of core/urls.py and
+authentication/api_urls.py as each role through the Django test client, so
+the whole middleware, authentication, view and serializer stack is measured
+without a network. The chatbot talks to an in-process fake Gemini server, so
+nothing leaves the machine.
+
+Each endpoint and role is called ``warmup`` times untimed, then
+``iterations`` times for the latency percentiles and sequential throughput,
+split over ``rounds`` passes through all endpoints. One more call runs under CaptureQueriesContext and tracemalloc for the SQL
+query count and peak Python memory; it is kept out of the timings because
+both instruments slow the request down. Any rows an iteration needs (a
+fresh user to log out, a plan to delete) are created before its timer starts.
+
+compare_results() checks a run against a stored baseline.
+"""
+
+import itertools
+import json
+import logging
+import platform
+import statistics
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, time as dtime, timedelta
+from decimal import Decimal
+from http.server import ThreadingHTTPServer
+
+import django
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .management.commands.fake_llm_server import FakeGeminiHandler
+from .models import Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback
+from .synthetic_data import SyntheticDataGenerator
+from .throttling import ChatRateThrottle
+
+ROLES = ('admin', 'doctor', 'patient')
+PASSWORD = 'Benchmark-pass-123'
+# Percent slower (or larger) than the baseline before a metric counts as a
+# regression, and the absolute noise floors below which it never does.
+DEFAULT_THRESHOLD = 30
+MIN_LATENCY_DELTA_MS = 1.0
+MIN_MEMORY_DELTA_KIB = 64
+
+
+@dataclass
+class Call:
+    method: str
+    path: str
+    data: object = None
+    client: object = None  # defaults to the role's authenticated client
+    asynchronous: bool = False  # async views are requested and read on one event loop
+
+
+@dataclass
+class Endpoint:
+    name: str
+    call: object  # (context, role, iteration) -> Call
+    roles: tuple = ROLES
+    expect: object = 200  # status code, or {role: status code}
+
+    def expected_status(self, role):
+        return self.expect[role] if isinstance(self.expect, dict) else self.expect
+
+
+def _client():
+    # Server errors are results to report, not exceptions to stop the run.
+    client = APIClient()
+    client.raise_request_exception = False
+    return client
+
+
+class BenchmarkContext:
+    """
+    The role users with their clients, one existing row of each resource that
+    every role can see, and helpers that create throwaway rows.
+    """
+
+    def __init__(self, doctor, patient):
+        User = get_user_model()
+        admin = User.objects.create_user(
+            'bench_admin', 'bench_admin@ayursutra.test', PASSWORD, user_type='admin', is_staff=True,
+        )
+        self.users = {'admin': admin, 'doctor': doctor, 'patient': patient}
+        self.clients = {}
+        self.authorization = {}
+        for role, user in self.users.items():
+            self.authorization[role] = f'Token {Token.objects.create(user=user).key}'
+            client = _client()
+            client.credentials(HTTP_AUTHORIZATION=self.authorization[role])
+            client.force_login(user)  # for the session-based dashboard pages
+            self.clients[role] = client
+
+        self._sequence = itertools.count()
+        # Appointments booked by the benchmark go a year past the generated calendar.
+        self._first_free_day = timezone.localdate() + timedelta(days=365)
+        self._slots = itertools.count()
+
+        self.practitioner = doctor.practitioner_profile
+        self.patient = patient.patient_profile
+        own = {'patient': self.patient, 'practitioner': self.practitioner}
+        self.plan = TreatmentPlan.objects.filter(**own).first() or self.new_plan()
+        self.appointment = Appointment.objects.filter(**own).first() or self.new_appointment()
+        self.notification = Notification.objects.filter(**own).first() or self.new_notification()
+        self.feedback = self.new_feedback()
+        self.appointment_ids = list(
+            Appointment.objects.filter(practitioner=self.practitioner).values_list('pk', flat=True)[:10]
+        )
+        self.notification_ids = list(
+            Notification.objects.filter(patient=self.patient).values_list('pk', flat=True)[:10]
+        )
+
+    def anonymous_client(self):
+        return _client()
+
+    def unique(self, label):
+        return f'benchmark_{label}_{next(self._sequence)}'
+
+    def phone(self):
+        return f'+91-5{next(self._sequence):09d}'
+
+    def free_slot(self):
+        """A (date, time) at which the benchmark doctor has nothing booked."""
+        slot = next(self._slots)
+        return self._first_free_day + timedelta(days=slot // 8), dtime(9 + slot % 8)
+
+    def reset_chat_throttle(self, role):
+        ChatRateThrottle().reset(self.users[role].pk)
+
+    def new_user(self, user_type, with_token=False):
+        name = self.unique(user_type)
+        user = get_user_model().objects.create_user(name, f'{name}@ayursutra.test', PASSWORD, user_type=user_type)
+        if with_token:
+            Token.objects.create(user=user)
+        return user
+
+    def patient_data(self):
+        name = self.unique('patient')
+        return {
+            'user': self.new_user('patient').pk, 'first_name': 'Bench', 'last_name': 'Patient',
+            'date_of_birth': '1985-01-01', 'phone': self.phone(), 'email': f'{name}@clinic.test',
+        }
+
+    def practitioner_data(self):
+        name = self.unique('doctor')
+        return {
+            'user': self.new_user('doctor').pk, 'first_name': 'Bench', 'last_name': 'Doctor',
+            'specialization': 'Panchakarma Specialist', 'qualification': 'BAMS',
+            'phone': self.phone(), 'email': f'{name}@clinic.test', 'license_number': name,
+        }
+
+    def plan_data(self):
+        today = timezone.localdate()
+        return {
+            'patient': self.patient.pk, 'practitioner': self.practitioner.pk,
+            'title': 'Benchmark Plan', 'description': 'Benchmark', 'primary_diagnosis': 'Ama',
+            'treatment_type': 'Panchakarma', 'start_date': today.isoformat(),
+            'end_date': (today + timedelta(days=21)).isoformat(), 'total_cost': '30000.00',
+        }
+
+    def appointment_data(self):
+        day, at = self.free_slot()
+        return {
+            'patient': self.patient.pk, 'practitioner': self.practitioner.pk,
+            'appointment_date': day.isoformat(), 'appointment_time': at.strftime('%H:%M'),
+        }
+
+    def notification_data(self):
+        return {
+            'title': 'Benchmark', 'message': 'Benchmark notification', 'notification_type': 'general',
+            'patient': self.patient.pk, 'practitioner': self.practitioner.pk,
+        }
+
+    def registration_data(self, role):
+        name = self.unique('register')
+        return {
+            'username': name, 'email': f'{name}@ayursutra.test', 'password': PASSWORD,
+            'password_confirm': PASSWORD, 'user_type': role,
+        }
+
+    def feedback_data(self):
+        return {
+            'patient': self.patient.pk, 'practitioner': self.practitioner.pk, 'rating': 5,
+            'title': 'Benchmark', 'comment': 'Benchmark feedback',
+        }
+
+    def new_patient(self):
+        data = self.patient_data()
+        return Patient.objects.create(user_id=data.pop('user'), **data)
+
+    def new_practitioner(self):
+        data = self.practitioner_data()
+        return Practitioner.objects.create(user_id=data.pop('user'), **data)
+
+    def new_plan(self):
+        today = timezone.localdate()
+        return TreatmentPlan.objects.create(
+            patient=self.patient, practitioner=self.practitioner, title='Benchmark Plan',
+            description='Benchmark', primary_diagnosis='Ama', treatment_type='Panchakarma',
+            start_date=today, end_date=today + timedelta(days=21), total_cost=Decimal('30000.00'),
+        )
+
+    def new_appointment(self):
+        day, at = self.free_slot()
+        return Appointment.objects.create(
+            patient=self.patient, practitioner=self.practitioner, appointment_date=day, appointment_time=at,
+        )
+
+    def new_notification(self):
+        return Notification.objects.create(
+            title='Benchmark', message='Benchmark notification', patient=self.patient, practitioner=self.practitioner,
+        )
+
+    def new_feedback(self):
+        return Feedback.objects.create(
+            patient=self.patient, practitioner=self.practitioner, rating=5, title='Benchmark', comment='Benchmark',
+        )
+
+
+def _detail(resource, attribute):
+    return lambda ctx, role, i: Call('GET', f'/api/{resource}/{getattr(ctx, attribute).pk}/')
+
+
+def _chat(path, asynchronous=False):
+    def call(ctx, role, i):
+        ctx.reset_chat_throttle(role)
+        return Call('POST', path, {'message': f'Benchmark question {i} from {role}'}, asynchronous=asynchronous)
+    return call
+
+
+ADMIN_ONLY = {'admin': 200, 'doctor': 403, 'patient': 403}
+STAFF = ('admin', 'doctor')
+
+ENDPOINTS = [
+    Endpoint('api-root', lambda ctx, role, i: Call('GET', '/api/')),
+    Endpoint('patients-list', lambda ctx, role, i: Call('GET', '/api/patients/')),
+    Endpoint('patients-detail', _detail('patients', 'patient')),
+    Endpoint('patients-active', lambda ctx, role, i: Call('GET', '/api/patients/active_patients/')),
+    Endpoint('patients-create', lambda ctx, role, i: Call('POST', '/api/patients/', ctx.patient_data()),
+             roles=('admin',), expect=201),
+    Endpoint('patients-update', lambda ctx, role, i: Call('PATCH', f'/api/patients/{ctx.patient.pk}/', {'status': 'Active'})),
+    Endpoint('patients-delete', lambda ctx, role, i: Call('DELETE', f'/api/patients/{ctx.new_patient().pk}/'),
+             roles=('admin',), expect=204),
+    Endpoint('practitioners-list', lambda ctx, role, i: Call('GET', '/api/practitioners/')),
+    Endpoint('practitioners-detail', _detail('practitioners', 'practitioner')),
+    Endpoint('practitioners-available-slots',
+             lambda ctx, role, i: Call('GET', f'/api/practitioners/{ctx.practitioner.pk}/available_slots/')),
+    Endpoint('practitioners-create',
+             lambda ctx, role, i: Call('POST', '/api/practitioners/', ctx.practitioner_data()),
+             roles=('admin',), expect=201),
+    Endpoint('practitioners-update',
+             lambda ctx, role, i: Call('PATCH', f'/api/practitioners/{ctx.practitioner.pk}/', {'status': 'Active'}),
+             roles=STAFF),
+    Endpoint('practitioners-delete',
+             lambda ctx, role, i: Call('DELETE', f'/api/practitioners/{ctx.new_practitioner().pk}/'),
+             roles=('admin',), expect=204),
+    Endpoint('treatment-plans-list', lambda ctx, role, i: Call('GET', '/api/treatment-plans/')),
+    Endpoint('treatment-plans-detail', _detail('treatment-plans', 'plan')),
+    Endpoint('treatment-plans-active', lambda ctx, role, i: Call('GET', '/api/treatment-plans/active_plans/')),
+    Endpoint('treatment-plans-create', lambda ctx, role, i: Call('POST', '/api/treatment-plans/', ctx.plan_data()),
+             roles=STAFF, expect=201),
+    Endpoint('treatment-plans-update',
+             lambda ctx, role, i: Call('PATCH', f'/api/treatment-plans/{ctx.plan.pk}/', {'completed_sessions': 1}),
+             roles=STAFF),
+    Endpoint('treatment-plans-delete',
+             lambda ctx, role, i: Call('DELETE', f'/api/treatment-plans/{ctx.new_plan().pk}/'),
+             roles=STAFF, expect=204),
+    Endpoint('appointments-list', lambda ctx, role, i: Call('GET', '/api/appointments/')),
+    Endpoint('appointments-detail', _detail('appointments', 'appointment')),
+    Endpoint('appointments-today', lambda ctx, role, i: Call('GET', '/api/appointments/todays_appointments/')),
+    Endpoint('appointments-create',
+             lambda ctx, role, i: Call('POST', '/api/appointments/', ctx.appointment_data()), expect=201),
+    Endpoint('appointments-update',
+             lambda ctx, role, i: Call('PATCH', f'/api/appointments/{ctx.appointment.pk}/', {'notes': f'Visit {i}'}),
+             roles=STAFF),
+    Endpoint('appointments-delete',
+             lambda ctx, role, i: Call('DELETE', f'/api/appointments/{ctx.new_appointment().pk}/'),
+             roles=STAFF, expect=204),
+    Endpoint('appointments-bulk-create',
+             lambda ctx, role, i: Call('POST', '/api/appointments/bulk_create/',
+                                       [ctx.appointment_data() for _ in range(10)]),
+             roles=STAFF, expect=201),
+    Endpoint('appointments-bulk-status',
+             lambda ctx, role, i: Call('POST', '/api/appointments/bulk_status/',
+                                       {'updates': [{'id': pk, 'status': 'confirmed'} for pk in ctx.appointment_ids]}),
+             roles=STAFF),
+    Endpoint('notifications-list', lambda ctx, role, i: Call('GET', '/api/notifications/')),
+    Endpoint('notifications-detail', _detail('notifications', 'notification')),
+    Endpoint('notifications-unread', lambda ctx, role, i: Call('GET', '/api/notifications/unread_notifications/')),
+    Endpoint('notifications-create',
+             lambda ctx, role, i: Call('POST', '/api/notifications/', ctx.notification_data()),
+             roles=('admin',), expect=201),
+    Endpoint('notifications-update',
+             lambda ctx, role, i: Call('PATCH', f'/api/notifications/{ctx.notification.pk}/', {'status': 'read'})),
+    Endpoint('notifications-delete',
+             lambda ctx, role, i: Call('DELETE', f'/api/notifications/{ctx.new_notification().pk}/'),
+             roles=('admin',), expect=204),
+    Endpoint('notifications-mark-read',
+             lambda ctx, role, i: Call('POST', '/api/notifications/mark_read/', {'ids': ctx.notification_ids})),
+    Endpoint('feedback-list', lambda ctx, role, i: Call('GET', '/api/feedback/')),
+    Endpoint('feedback-detail', _detail('feedback', 'feedback')),
+    Endpoint('feedback-create', lambda ctx, role, i: Call('POST', '/api/feedback/', ctx.feedback_data()),
+             roles=('admin', 'patient'), expect=201),
+    Endpoint('feedback-update',
+             lambda ctx, role, i: Call('PATCH', f'/api/feedback/{ctx.feedback.pk}/', {'rating': 4}),
+             roles=('admin', 'patient')),
+    Endpoint('feedback-delete', lambda ctx, role, i: Call('DELETE', f'/api/feedback/{ctx.new_feedback().pk}/'),
+             roles=('admin',), expect=204),
+    Endpoint('dashboard-stats', lambda ctx, role, i: Call('GET', '/api/dashboard-stats/')),
+    Endpoint('admin-dashboard', lambda ctx, role, i: Call('GET', '/api/admin-dashboard/')),
+    # templates/dashboards/ has no doctor or patient page yet, so these fail to render.
+    Endpoint('doctor-dashboard', lambda ctx, role, i: Call('GET', '/api/doctor-dashboard/'), expect=500),
+    Endpoint('patient-dashboard', lambda ctx, role, i: Call('GET', '/api/patient-dashboard/'), expect=500),
+    Endpoint('chat', _chat('/api/chat/')),
+    Endpoint('chat-stream', _chat('/api/chat/stream/', asynchronous=True)),
+    Endpoint('chat-cache-stats', lambda ctx, role, i: Call('GET', '/api/chat/cache-stats/'), expect=ADMIN_ONLY),
+    Endpoint('chat-admission-stats', lambda ctx, role, i: Call('GET', '/api/chat/admission-stats/'), expect=ADMIN_ONLY),
+    Endpoint('auth-register',
+             lambda ctx, role, i: Call('POST', '/api/auth/register/', ctx.registration_data(role),
+                                       client=ctx.anonymous_client()),
+             expect=201),
+    Endpoint('auth-login',
+             lambda ctx, role, i: Call('POST', '/api/auth/login/',
+                                       {'username': ctx.users[role].username, 'password': PASSWORD},
+                                       client=ctx.anonymous_client())),
+    Endpoint('auth-logout', lambda ctx, role, i: _logout_call(ctx, role), expect=204),
+    Endpoint('auth-profile', lambda ctx, role, i: Call('GET', '/api/auth/profile/')),
+    Endpoint('auth-profile-update',
+             lambda ctx, role, i: Call('PUT', '/api/auth/profile/', {'first_name': ctx.users[role].first_name})),
+    # Last in every pass: its first call marks everything the role can see read.
+    Endpoint('notifications-mark-all-read', lambda ctx, role, i: Call('POST', '/api/notifications/mark_all_read/')),
+]
+
+
+def _logout_call(ctx, role):
+    # Logging out deletes the token, so each call uses a fresh user of the role.
+    client = _client()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {ctx.new_user(role, with_token=True).auth_token.key}')
+    return Call('POST', '/api/auth/logout/', client=client)
+
+
+def _send(ctx, role, call):
+    if call.asynchronous:
+        return async_to_sync(_send_async)(call, ctx.authorization[role])
+    client = call.client or ctx.clients[role]
+    response = getattr(client, call.method.lower())(call.path, call.data, format='json')
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+async def _send_async(call, authorization):
+    client = AsyncClient(raise_request_exception=False)
+    response = await getattr(client, call.method.lower())(
+        call.path, json.dumps(call.data), content_type='application/json',
+        headers={'Authorization': authorization},
+    )
+    if response.streaming:
+        async for _ in response.streaming_content:
+            pass
+    return response
+
+
+def _percentile(samples, percent):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[percent - 1]
+
+
+class Measurement:
+    """The samples collected for one endpoint and role."""
+
+    def __init__(self, ctx, endpoint, role):
+        self.ctx = ctx
+        self.endpoint = endpoint
+        self.role = role
+        self.latencies = []
+        self.statuses = Counter()
+        self._iteration = itertools.count()
+
+    def _next_call(self):
+        return self.endpoint.call(self.ctx, self.role, next(self._iteration))
+
+    def warm_up(self, times):
+        for _ in range(times):
+            _send(self.ctx, self.role, self._next_call())
+
+    def time(self, times):
+        for _ in range(times):
+            call = self._next_call()
+            started = time.perf_counter()
+            response = _send(self.ctx, self.role, call)
+            self.latencies.append(time.perf_counter() - started)
+            self.statuses[response.status_code] += 1
+
+    def result(self):
+        """Make the instrumented call and return the result entry."""
+        call = self._next_call()
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response = _send(self.ctx, self.role, call)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.statuses[response.status_code] += 1
+
+        expected = self.endpoint.expected_status(self.role)
+        ms = [latency * 1000 for latency in self.latencies]
+        return {
+            'endpoint': self.endpoint.name,
+            'role': self.role,
+            'method': call.method,
+            'path': call.path,
+            'expected_status': expected,
+            'statuses': {str(code): count for code, count in sorted(self.statuses.items())},
+            'ok': set(self.statuses) == {expected},
+            'requests': len(ms),
+            'p50_ms': round(_percentile(ms, 50), 3),
+            'p95_ms': round(_percentile(ms, 95), 3),
+            'p99_ms': round(_percentile(ms, 99), 3),
+            'mean_ms': round(statistics.fmean(ms), 3),
+            'throughput_rps': round(len(ms) / sum(self.latencies), 1),
+            'queries': len(queries.captured_queries),
+            'peak_memory_kib': round(peak / 1024, 1),
+        }
+
+
+@contextmanager
+def _quiet(logger):
+    """Keep expected 4xx/5xx responses from printing a traceback per call."""
+    level = logger.level
+    logger.setLevel(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+class _FakeLLMServer:
+    """The fake Gemini REST API on a free local port, for the duration of a with block."""
+
+    def __enter__(self):
+        handler = type('Handler', (FakeGeminiHandler,), {'delay': 0, 'reply': 'Drink warm water and rest well.'})
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.server.daemon_threads = True
+        self.server.verbosity = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def run_benchmark(scale, seed=0, iterations=20, warmup=2, rounds=5, only=None, log=None):
+    """
+    Seed the current (throwaway) database and benchmark every endpoint as
+    every role; returns the JSON-serialisable results document. ``only``
+    limits the run to endpoints whose name contains one of its strings.
+    """
+    log = log or (lambda message: None)
+    started = time.perf_counter()
+    generator = SyntheticDataGenerator(scale, seed=seed, prefix='bench', password=PASSWORD, log=log)
+    counts = generator.generate()
+    User = get_user_model()
+    ctx = BenchmarkContext(
+        doctor=User.objects.get(username='bench_doctor_0'),
+        patient=User.objects.get(username='bench_patient_0'),
+    )
+    log(f'Seeded {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s')
+
+    results = {}
+    request_log = logging.getLogger('django.request')
+    with _FakeLLMServer() as llm_endpoint, _quiet(request_log), override_settings(
+        GEMINI_API_KEY='benchmark',
+        CHATBOT_LLM={'MODEL': 'gemini-pro', 'API_ENDPOINT': llm_endpoint, 'TRANSPORT': 'rest', 'TIMEOUT': 10},
+        # Every call should reach the (fake) model, not the response cache.
+        CHATBOT_CACHE={'ENABLED': False},
+    ):
+        measurements = [
+            Measurement(ctx, endpoint, role)
+            for endpoint in ENDPOINTS
+            if not only or any(part in endpoint.name for part in only)
+            for role in endpoint.roles
+        ]
+        for measurement in measurements:
+            measurement.warm_up(warmup)
+        # Spread each endpoint's timed calls over several passes, so a burst of
+        # noise on the machine is shared by all endpoints instead of skewing one.
+        calibrations = []
+        for round_number in range(rounds):
+            calibrations.append(calibrate())
+            share = iterations // rounds + (round_number < iterations % rounds)
+            for measurement in measurements:
+                measurement.time(share)
+        for measurement in measurements:
+            result = measurement.result()
+            results[f'{measurement.endpoint.name}:{measurement.role}'] = result
+            log(format_result(result))
+
+    return {
+        'meta': {
+            'created_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'seed': seed,
+            'scale': counts,
+            'iterations': iterations,
+            'warmup': warmup,
+            'rounds': rounds,
+            'calibration_ms': round(statistics.median(calibrations), 3),
+        },
+        'results': results,
+    }
+
+
+def calibrate():
+    """
+    Milliseconds this machine currently takes for a fixed pure-Python
+    workload (best of five). Baseline latencies are scaled by the ratio of
+    two runs' calibrations, so a uniformly slower or faster machine does not
+    read as a regression or hide one.
+    """
+    payload = [{'id': index, 'name': f'Patient {index}', 'tags': ['vata', 'pitta']} for index in range(2000)]
+    best = float('inf')
+    for _ in range(5):
+        started = time.perf_counter()
+        json.loads(json.dumps(payload))
+        sorted(payload, key=lambda item: item['name'])
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def format_result(result):
+    return (
+        f"{result['endpoint']:<30} {result['role']:<8} {result['method']:<6} "
+        f"{'/'.join(result['statuses']):<7} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+        f"p99 {result['p99_ms']:>8.2f}ms  {result['throughput_rps']:>7.1f} req/s  "
+        f"{result['queries']:>3} queries  {result['peak_memory_kib']:>8.1f} KiB"
+    )
+
+
+def compare_results(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Regressions of ``current`` against ``baseline`` (both run_benchmark()
+    documents), as human-readable strings. Median latency (scaled by the runs'
+    calibrations) and peak memory may grow by ``threshold`` percent above a
+    small noise floor; the SQL query count may not grow at all. p95/p99 are
+    reported but not compared: over a few dozen calls they are the slowest one
+    or two, which says more about the machine than about the code.
+    """
+    limit = 1 + threshold / 100
+    speed = current['meta']['calibration_ms'] / baseline['meta']['calibration_ms']
+    regressions = []
+    for key, old in baseline['results'].items():
+        new = current['results'].get(key)
+        if new is None:
+            continue
+        expected = old['p50_ms'] * speed
+        if new['p50_ms'] > expected * limit and new['p50_ms'] - expected > MIN_LATENCY_DELTA_MS:
+            regressions.append(f"{key}: p50_ms {old['p50_ms']:.2f} -> {new['p50_ms']:.2f}")
+        if new['queries'] > old['queries']:
+            regressions.append(f"{key}: queries {old['queries']} -> {new['queries']}")
+        if (new['peak_memory_kib'] > old['peak_memory_kib'] * limit
+                and new['peak_memory_kib'] - old['peak_memory_kib'] > MIN_MEMORY_DELTA_KIB):
+            regressions.append(f"{key}: peak_memory_kib {old['peak_memory_kib']} -> {new['peak_memory_kib']}")
+    return regressions
@@ -0,0 +1,60 @@
+"""
+Maintenance of the CareRelationship table.
+
+A practitioner cares for a patient while at least one TreatmentPlan or
+Appointment links the two. Signal handlers (core/signals.py) call
+add_care_relationships() after saves and prune_care_relationships() after
+deletes or reassignments; code that writes plans or appointments with
+bulk_create() must call add_care_relationships() itself.
+rebuild_care_relationships() regenerates the whole table.
+"""
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Appointment, CareRelationship, TreatmentPlan
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def add_care_relationships(pairs):
+    """Ensure a row exists for every (practitioner_id, patient_id) in ``pairs``."""
+    rows = [
+        CareRelationship(practitioner_id=practitioner_id, patient_id=patient_id)
+        for practitioner_id, patient_id in set(pairs)
+        if practitioner_id is not None and patient_id is not None
+    ]
+    CareRelationship.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def prune_care_relationships(pairs):
+    """Delete the rows among ``pairs`` that no plan or appointment supports any more."""
+    for practitioner_id, patient_id in set(pairs):
+        link = Q(practitioner_id=practitioner_id, patient_id=patient_id)
+        if TreatmentPlan.objects.filter(link).exists() or Appointment.objects.filter(link).exists():
+            continue
+        CareRelationship.objects.filter(link).delete()
+
+
+def care_pairs():
+    """Distinct (practitioner_id, patient_id) pairs currently linked by plans or appointments."""
+    plans = TreatmentPlan.objects.order_by().values_list('practitioner_id', 'patient_id')
+    appointments = Appointment.objects.order_by().values_list('practitioner_id', 'patient_id')
+    return plans.union(appointments)
+
+
+def rebuild_care_relationships(batch_size=REBUILD_BATCH_SIZE):
+    """Regenerate the table from scratch; returns the number of rows written."""
+    written = 0
+    with transaction.atomic():
+        CareRelationship.objects.all().delete()
+        batch = []
+        for practitioner_id, patient_id in care_pairs().iterator(chunk_size=batch_size):
+            batch.append(CareRelationship(practitioner_id=practitioner_id, patient_id=patient_id))
+            if len(batch) >= batch_size:
+                CareRelationship.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        CareRelationship.objects.bulk_create(batch)
+        written += len(batch)
+    return written
@@ -0,0 +1,164 @@
+"""
+Cache of chatbot replies keyed on the normalized prompt.
+
+Prompts are case-folded, stripped of punctuation and whitespace-collapsed, so
+"What is Vata dosha?" and "what is vata  dosha" share an entry. Entries live in
+an in-process LRU bounded by MAX_ENTRIES and expire after TTL seconds. With
+PERSIST on, replies are also written to the CachedChatResponse table and a
+process that misses in memory (e.g. after a restart) falls back to it.
+
+Counters are per process; ``stats()`` reports them together with the model
+latency the hits avoided, estimated from the average latency of the misses.
+"""
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .models import CachedChatResponse
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt):
+    text = unicodedata.normalize('NFKC', prompt).casefold()
+    text = _PUNCTUATION.sub(' ', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class ResponseCache:
+
+    def __init__(self, max_entries=1000, ttl=86400, persist=False, namespace=''):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist = persist
+        self.namespace = namespace
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.db_hits = self.misses = self.evictions = 0
+        self.miss_seconds = 0.0
+
+    def key(self, prompt):
+        return hashlib.sha256(f'{self.namespace}\0{normalize_prompt(prompt)}'.encode()).hexdigest()
+
+    def get(self, prompt):
+        """Return the cached reply for ``prompt`` or None, counting a hit or miss."""
+        key = self.key(prompt)
+        text = self._get_local(key)
+        if text is None and self.persist:
+            text = self._get_persisted(key)
+            if text is not None:
+                self._set_local(key, text)
+                with self._lock:
+                    self.db_hits += 1
+        self._count(text is not None)
+        return text
+
+    async def aget(self, prompt):
+        key = self.key(prompt)
+        text = self._get_local(key)
+        if text is None and self.persist:
+            text = await sync_to_async(self._get_persisted)(key)
+            if text is not None:
+                self._set_local(key, text)
+                with self._lock:
+                    self.db_hits += 1
+        self._count(text is not None)
+        return text
+
+    def set(self, prompt, text, latency=0.0):
+        """Store the reply to ``prompt``; ``latency`` is how long the model took."""
+        key = self.key(prompt)
+        self._set_local(key, text, latency)
+        if self.persist:
+            self._persist(key, prompt, text)
+
+    async def aset(self, prompt, text, latency=0.0):
+        key = self.key(prompt)
+        self._set_local(key, text, latency)
+        if self.persist:
+            await sync_to_async(self._persist)(key, prompt, text)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.persist:
+            CachedChatResponse.objects.all().delete()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            average_miss = self.miss_seconds / self.misses if self.misses else 0.0
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'persist': self.persist,
+                'hits': self.hits,
+                'database_hits': self.db_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'average_miss_seconds': round(average_miss, 4),
+                'estimated_seconds_saved': round(self.hits * average_miss, 2),
+            }
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            text, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return text
+
+    def _set_local(self, key, text, latency=0.0):
+        with self._lock:
+            self._entries[key] = (text, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self.miss_seconds += latency
+
+    def _get_persisted(self, key):
+        return CachedChatResponse.objects.filter(
+            key=key, updated_at__gte=timezone.now() - timedelta(seconds=self.ttl),
+        ).values_list('response', flat=True).first()
+
+    def _persist(self, key, prompt, text):
+        CachedChatResponse.objects.update_or_create(
+            key=key, defaults={'prompt': prompt, 'response': text},
+        )
+
+
+def cache_from_settings(namespace=''):
+    """Build the ResponseCache described by CHATBOT_CACHE, or None if it is disabled."""
+    options = getattr(settings, 'CHATBOT_CACHE', {})
+    if not options.get('ENABLED', True):
+        return None
+    return ResponseCache(
+        max_entries=options.get('MAX_ENTRIES', 1000),
+        ttl=options.get('TTL', 86400),
+        persist=options.get('PERSIST', False),
+        namespace=namespace,
+    )
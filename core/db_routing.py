@@ -0,0 +1,126 @@
+"""
+Primary/replica database routing.
+
+Writes always go to the ``default`` database. Reads go to one of the aliases
+in DATABASE_REPLICA_ROUTING['REPLICAS'] only while a request that opted in is
+being handled: a GET or HEAD to a view whose class sets ``replica_reads =
+True`` (the viewsets, dashboard stats). Management commands, background jobs,
+unsafe methods and every other view read from the primary.
+
+Read-after-write: the first write in a request pins the rest of that request
+to the primary, and the client, identified by its Authorization header or
+session cookie, keeps reading from the primary for STICKY_SECONDS afterwards.
+That way a GET made straight after a POST sees its own change even when the
+replicas lag. The sticky marks live in the 'shared' cache, so a write handled
+by one worker pins the client's next reads in every other worker too.
+
+The routing state is a context variable set per request. It is cleared on
+request_finished, which runs after a streaming body has been sent, so exports
+read from the replica they started on.
+"""
+
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import request_finished
+from django.db import DEFAULT_DB_ALIAS
+from django.dispatch import receiver
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework import permissions
+
+CACHE_ALIAS = 'shared'
+
+_state = ContextVar('database_routing', default=None)
+
+
+def routing_settings():
+    return getattr(settings, 'DATABASE_REPLICA_ROUTING', {})
+
+
+def replica_aliases():
+    return routing_settings().get('REPLICAS', [])
+
+
+def _sticky_key(client):
+    return f'db-routing:sticky:{client}'
+
+
+def client_key(request):
+    credential = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credential:
+        return None
+    return hashlib.sha256(credential.encode()).hexdigest()
+
+
+class RoutingState:
+
+    def __init__(self, client=None, pinned=False):
+        self.client = client
+        self.use_replica = False
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+
+    def read_alias(self):
+        if not self.use_replica or self.pinned:
+            return DEFAULT_DB_ALIAS
+        if self.replica is None:
+            # One replica per request, so its reads see a single snapshot.
+            replicas = replica_aliases()
+            self.replica = random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+        return self.replica
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        return state.read_alias() if state is not None else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """
+    Starts the routing state for each request and lets safe requests to
+    ``replica_reads`` views read from a replica unless the client is inside
+    its sticky-primary window.
+    """
+
+    def process_request(self, request):
+        client = client_key(request)
+        pinned = bool(client and replica_aliases() and caches[CACHE_ALIAS].get(_sticky_key(client)))
+        _state.set(RoutingState(client, pinned=pinned))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        if request.method in permissions.SAFE_METHODS and getattr(view_class, 'replica_reads', False):
+            _state.get().use_replica = True
+
+
+@receiver(request_finished)
+def finish_routing(sender, **kwargs):
+    state = _state.get()
+    if state is None:
+        return
+    _state.set(None)
+    if state.wrote and state.client and replica_aliases():
+        caches[CACHE_ALIAS].set(_sticky_key(state.client), True, routing_settings().get('STICKY_SECONDS', 5))
@@ -0,0 +1,149 @@
+"""
+Delivery of scheduled notifications.
+
+Workers claim due notifications (``sent_at`` unset and ``scheduled_for``
+unset or in the past) in batches by stamping them with a claim token, hand
+them to the configured NOTIFICATION_BACKEND and then mark the delivered ones
+with one UPDATE. A claim expires after ``lease_seconds``, so rows held by a worker that
+died are picked up again, but a live worker never shares rows with another.
+"""
+
+import json
+import sys
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Notification
+
+
+class BaseNotificationBackend:
+    """
+    Subclasses implement send_messages(), which receives a list of claimed
+    Notification instances and returns the ones that were delivered.
+    """
+
+    def __init__(self, fail_silently=False, **kwargs):
+        self.fail_silently = fail_silently
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, notifications):
+        raise NotImplementedError('subclasses of BaseNotificationBackend must override send_messages()')
+
+    @staticmethod
+    def recipient(notification):
+        return str(notification.patient or notification.practitioner or 'all users')
+
+
+class ConsoleBackend(BaseNotificationBackend):
+    """ Writes notifications to a stream (stdout by default) """
+
+    def __init__(self, stream=None, **kwargs):
+        super().__init__(**kwargs)
+        self.stream = stream or sys.stdout
+        self._lock = threading.RLock()
+
+    def send_messages(self, notifications):
+        with self._lock:
+            for notification in notifications:
+                self.stream.write(
+                    f"[{notification.notification_type}] to {self.recipient(notification)}: "
+                    f"{notification.title} - {notification.message}\n"
+                )
+            self.stream.flush()
+        return list(notifications)
+
+
+class FileBackend(BaseNotificationBackend):
+    """ Appends one JSON object per notification to NOTIFICATION_FILE_PATH """
+
+    def __init__(self, file_path=None, **kwargs):
+        super().__init__(**kwargs)
+        self.file_path = file_path or getattr(settings, 'NOTIFICATION_FILE_PATH', None)
+        if not self.file_path:
+            raise ValueError('FileBackend needs NOTIFICATION_FILE_PATH or a file_path argument.')
+
+    def send_messages(self, notifications):
+        with open(self.file_path, 'a', encoding='utf-8') as stream:
+            for notification in notifications:
+                stream.write(json.dumps({
+                    'id': notification.pk,
+                    'type': notification.notification_type,
+                    'recipient': self.recipient(notification),
+                    'title': notification.title,
+                    'message': notification.message,
+                    'scheduled_for': notification.scheduled_for.isoformat() if notification.scheduled_for else None,
+                }) + '\n')
+        return list(notifications)
+
+
+def get_backend(backend=None, **kwargs):
+    klass = import_string(backend or getattr(settings, 'NOTIFICATION_BACKEND', 'core.dispatch.ConsoleBackend'))
+    return klass(**kwargs)
+
+
+def due_notifications(now, lease_seconds):
+    return Notification.objects.filter(
+        Q(scheduled_for__isnull=True) | Q(scheduled_for__lte=now),
+        sent_at__isnull=True,
+    ).filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=lease_seconds)))
+
+
+def claim_batch(batch_size, lease_seconds=300):
+    """
+    Claim up to ``batch_size`` due notifications for this worker and return
+    them. The claim is a single ``UPDATE ... WHERE pk IN (SELECT ... LIMIT n)``
+    that repeats the "due and unclaimed" conditions, so it is atomic on SQLite
+    and, on databases with row locks, a worker that loses a race for a row
+    re-checks those conditions and skips it.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due = due_notifications(now, lease_seconds)
+    batch = due.order_by('scheduled_for', 'pk').values('pk')[:batch_size]
+    if not due.filter(pk__in=batch).update(claim_token=token, claimed_at=now):
+        return []
+    return list(
+        # Repeating the partial index condition lets SQLite use notif_claim_idx.
+        Notification.objects.filter(claim_token=token).exclude(claim_token='')
+        .select_related('patient', 'practitioner')
+        .order_by('scheduled_for', 'pk')
+    )
+
+
+def mark_sent(notifications):
+    """
+    Stamp sent_at on delivered notifications with a single UPDATE. Only rows
+    still held under the claim they were loaded with are stamped: once a lease
+    has run out and another worker has claimed the row, it is that worker's.
+    """
+    tokens = {n.claim_token for n in notifications} - {''}
+    if not tokens:
+        return 0
+    now = timezone.now()
+    return Notification.objects.filter(pk__in=[n.pk for n in notifications], claim_token__in=tokens).update(
+        sent_at=now, claim_token='', updated_at=now,
+    )
+
+
+def dispatch_batch(backend, batch_size, lease_seconds=300):
+    """
+    Claim, deliver and mark one batch. Returns (claimed, sent). Notifications the
+    backend did not deliver keep their claim until the lease runs out and are
+    then retried.
+    """
+    claimed = claim_batch(batch_size, lease_seconds)
+    if not claimed:
+        return 0, 0
+    delivered = backend.send_messages(claimed) or []
+    return len(claimed), mark_sent(delivered)
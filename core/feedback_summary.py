@@ -0,0 +1,115 @@
+"""
+Maintenance of the practitioner and treatment plan feedback summaries.
+
+Every Feedback row adds to one PractitionerFeedbackSummary and, when it names
+a plan, one TreatmentPlanFeedbackSummary: a count, the rating sum and its
+histogram bucket, the sum and count of each optional score it gives, and
+would_recommend. Signal handlers (core/signals.py) call
+apply_feedback_change() after every save and delete, which moves the old
+contribution out and the new one in with a single
+``UPDATE ... SET column = column + n`` per summary, however much feedback the
+summary covers. Concurrent writers cannot lose each other's increments.
+
+Code that writes feedback with bulk_create(), queryset.update() or raw SQL
+sends no signals and must call rebuild_feedback_summaries(), which
+regenerates both tables with one GROUP BY per table.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Feedback, FeedbackSummary, PractitionerFeedbackSummary, TreatmentPlanFeedbackSummary
+
+REBUILD_BATCH_SIZE = 1000
+
+# (summary model, the Feedback column naming its row)
+TARGETS = (
+    (PractitionerFeedbackSummary, 'practitioner_id'),
+    (TreatmentPlanFeedbackSummary, 'treatment_plan_id'),
+)
+
+
+def feedback_counts(feedback):
+    """The amounts ``feedback`` adds to its summaries, by summary column."""
+    counts = Counter(feedback_count=1, rating_sum=feedback.rating)
+    counts[f'rating_{feedback.rating}'] = 1
+    for score in FeedbackSummary.SCORES:
+        value = getattr(feedback, score)
+        if value is not None:
+            counts[f'{score}_sum'] = value
+            counts[f'{score}_count'] = 1
+    if feedback.would_recommend:
+        counts['would_recommend_count'] = 1
+    return counts
+
+
+def apply_feedback_change(old=None, new=None):
+    """
+    Take ``old`` (the stored state of a feedback row, None when it is new) out
+    of the summaries and add ``new`` (None when it was deleted).
+    """
+    for model, column in TARGETS:
+        deltas = {}
+        if old is not None and getattr(old, column) is not None:
+            deltas.setdefault(getattr(old, column), Counter()).subtract(feedback_counts(old))
+        if new is not None and getattr(new, column) is not None:
+            deltas.setdefault(getattr(new, column), Counter()).update(feedback_counts(new))
+        for pk, delta in deltas.items():
+            changes = {name: amount for name, amount in delta.items() if amount}
+            if changes:
+                # Only an addition may create the row; a removal may come from
+                # a cascading delete of the practitioner or plan itself.
+                _add(model, pk, changes, create=new is not None and getattr(new, column) == pk)
+
+
+def _add(model, pk, changes, create):
+    updates = {name: F(name) + amount for name, amount in changes.items()}
+    updates['updated_at'] = timezone.now()
+    if model.objects.filter(pk=pk).update(**updates) or not create:
+        return
+    # First feedback for this summary. A concurrent first one may insert the
+    # row too, so insert an empty row if missing and add to it either way.
+    model.objects.bulk_create([model(pk=pk)], ignore_conflicts=True)
+    model.objects.filter(pk=pk).update(**updates)
+
+
+def summary_aggregates():
+    """Aggregate expressions computing every summary column from Feedback rows."""
+    aggregates = {
+        'feedback_count': Count('pk'),
+        'rating_sum': Sum('rating'),
+        'would_recommend_count': Count('pk', filter=Q(would_recommend=True)),
+    }
+    for stars in range(1, 6):
+        aggregates[f'rating_{stars}'] = Count('pk', filter=Q(rating=stars))
+    for score in FeedbackSummary.SCORES:
+        aggregates[f'{score}_sum'] = Coalesce(Sum(score), 0)
+        aggregates[f'{score}_count'] = Count(score)
+    return aggregates
+
+
+def rebuild_feedback_summaries(batch_size=REBUILD_BATCH_SIZE):
+    """Regenerate both tables from scratch; returns the number of rows written per model."""
+    written = {}
+    with transaction.atomic():
+        for model, column in TARGETS:
+            model.objects.all().delete()
+            rows = (
+                Feedback.objects.exclude(**{column: None}).order_by()
+                .values(column).annotate(**summary_aggregates())
+            )
+            batch = []
+            written[model] = 0
+            for row in rows.iterator(chunk_size=batch_size):
+                batch.append(model(pk=row.pop(column), **row))
+                if len(batch) >= batch_size:
+                    model.objects.bulk_create(batch)
+                    written[model] += len(batch)
+                    batch = []
+            model.objects.bulk_create(batch)
+            written[model] += len(batch)
+    return written
@@ -0,0 +1,311 @@
+"""
+Bulk import of patients and appointments from CSV or JSON Lines files.
+
+read_rows() parses an upload one line at a time. An Importer takes the rows
+in batches of IMPORT_BATCH_SIZE, and for each batch:
+
+- resolves columns that name a related row by a unique field rather than
+  its id (e.g. practitioner_license_number), with one lookup per column;
+- validates every row with one serializer, whose related objects are
+  loaded with one in_bulk() per field (BulkListSerializer);
+- runs the checks that would otherwise cost a query per row with set
+  lookups: unique phone and email against the table and the rest of the
+  file, and overlapping appointments through find_conflicts();
+- writes the valid rows with batched raw INSERTs (core/bulk_insert.py) in
+  the same transaction as those checks.
+
+Invalid rows are left out and reported with their line number. They do not
+stop the valid rows around them from being imported. A file that cannot be
+read any further (bytes that are not UTF-8, a malformed CSV record) stops the
+import at that line: the rows before it are imported and the report names
+the line. The INSERTs send no
+signals, so the importers add care relationships and drop cached dashboard
+stats themselves; the full-text search triggers index new rows as usual.
+"""
+
+import csv
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .bulk_insert import insert_rows
+from .care import add_care_relationships
+from .models import Patient, Practitioner, Appointment
+from .scheduling import find_conflicts, INACTIVE_STATUSES
+from .serializers import AppointmentSerializer, PatientImportSerializer
+from .stats import invalidate_dashboard_stats
+
+IMPORT_BATCH_SIZE = 1000
+
+
+class ImportFileError(ValueError):
+    """The file cannot be read past ``line``."""
+
+    def __init__(self, line, message):
+        super().__init__(f'Line {line}: {message}')
+        self.line = line
+
+
+def _lines(file):
+    """
+    Decode the binary ``file`` one line at a time (at \\n, \\r\\n or \\r, the
+    line endings included), so a decoding error is reported on its own line.
+    """
+    number = 0
+    for chunk in file:
+        for line in chunk.splitlines(keepends=True):
+            number += 1
+            try:
+                yield line.decode('utf-8-sig' if number == 1 else 'utf-8')
+            except UnicodeDecodeError:
+                raise ImportFileError(number, 'not valid UTF-8 text.') from None
+
+
+def _csv_rows(lines):
+    reader = csv.DictReader(lines)
+    try:
+        for row in reader:
+            # Blank cells count as absent, so model defaults apply.
+            yield reader.line_num, {name: value for name, value in row.items() if name is not None and value != ''}
+    except csv.Error as exc:
+        # DictReader.line_num only advances once a record parses.
+        raise ImportFileError(reader.reader.line_num, f'{exc}.') from exc
+
+
+def _json_rows(lines):
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+FORMATS = {'csv': _csv_rows, 'jsonl': _json_rows, 'ndjson': _json_rows}
+
+
+def input_format(filename, default='csv'):
+    """The FORMATS key for ``filename``'s extension, or ``default``."""
+    extension = os.path.splitext(filename or '')[1].lstrip('.').lower()
+    return extension if extension in FORMATS else default
+
+
+def read_rows(file, input_format='csv'):
+    """
+    Yield (line number, row) for each row of the binary ``file``; a row that
+    cannot be parsed is None. Raises ImportFileError where the file itself
+    cannot be read.
+    """
+    return FORMATS[input_format](_lines(file))
+
+
+class Importer:
+    """
+    Imports the rows of one resource. An abstract base: subclasses set
+    serializer_class, must implement create() and may add batch checks in
+    check().
+    """
+    serializer_class = None
+    # Columns that name a related object by a unique field instead of its id:
+    # column -> (serializer field, model, model field).
+    references = {}
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.user_ids = set()
+
+    def run(self, rows):
+        """
+        Import ``rows``, (line number, data) pairs, and return the report:
+        ``{"created": n, "failed": n, "errors": [{"row": line, "errors": {...}}]}``.
+        When ``rows`` raises ImportFileError, the rows read before it are
+        imported and the report also has ``"error"`` (its message) and
+        ``"line"``.
+        """
+        report = {'created': 0, 'failed': 0, 'errors': []}
+        batch = []
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch, report)
+                    batch = []
+        except ImportFileError as exc:
+            report.update(error=str(exc), line=exc.line)
+        if batch:
+            self.import_batch(batch, report)
+        invalidate_dashboard_stats(self.user_ids)
+        return report
+
+    def import_batch(self, batch, report):
+        errors = {}
+        rows = []
+        for number, data in batch:
+            if isinstance(data, dict):
+                rows.append((number, dict(data)))
+            else:
+                errors[number] = {'non_field_errors': ['Expected an object of field values.']}
+        self.resolve_references(rows, errors)
+        rows = [(number, data) for number, data in rows if number not in errors]
+
+        serializer = self.serializer_class(many=True)
+        serializer.related_cache = serializer.load_related([data for _, data in rows])
+        valid = []
+        for number, data in rows:
+            try:
+                valid.append((number, serializer.child.run_validation(data)))
+            except serializers.ValidationError as exc:
+                errors[number] = exc.detail
+        # The batch checks run in the transaction that writes the rows, so that
+        # no concurrent write can invalidate them in between.
+        with transaction.atomic():
+            errors.update(self.check(valid))
+            valid = [attrs for number, attrs in valid if number not in errors]
+            if valid:
+                self.create(valid)
+
+        report['created'] += len(valid)
+        report['failed'] += len(errors)
+        report['errors'].extend({'row': number, 'errors': errors[number]} for number in sorted(errors))
+
+    def resolve_references(self, rows, errors):
+        for column, (field, model, lookup) in self.references.items():
+            values = {str(data[column]) for _, data in rows if column in data}
+            if not values:
+                continue
+            found = dict(model.objects.filter(**{f'{lookup}__in': values}).values_list(lookup, 'pk'))
+            for number, data in rows:
+                if column not in data:
+                    continue
+                value = str(data.pop(column))
+                if value in found:
+                    data.setdefault(field, found[value])
+                else:
+                    label = model._meta.get_field(lookup).verbose_name
+                    errors.setdefault(number, {})[column] = [f'No {model._meta.verbose_name} with this {label}.']
+
+    def check(self, valid):
+        """Errors, by line number, of the checks made for the whole batch of validated rows."""
+        return {}
+
+    def create(self, rows):
+        """Write the validated ``rows``, (line number, attrs) pairs, of one batch."""
+        raise NotImplementedError('subclasses of Importer must override create()')
+
+    def column_values(self, attrs, now):
+        """``attrs`` of a validated row as the column values insert_rows() takes."""
+        model = self.serializer_class.Meta.model
+        values = {'created_at': now, 'updated_at': now}
+        for name, value in attrs.items():
+            field = model._meta.get_field(name)
+            values[field.attname] = value.pk if field.is_relation and value is not None else value
+        return values
+
+
+class PatientImporter(Importer):
+    """
+    Patients, each with a new patient user account named after their email.
+    The account has no usable password until one is set for it.
+    """
+    serializer_class = PatientImportSerializer
+    unique_fields = ('phone', 'email')
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        super().__init__(batch_size)
+        # value -> line number, for the rows of the file imported so far
+        self.seen = {name: {} for name in self.unique_fields}
+
+    def check(self, valid):
+        taken = {
+            name: set(Patient.objects.filter(**{f'{name}__in': {attrs[name] for _, attrs in valid}})
+                      .values_list(name, flat=True))
+            for name in self.unique_fields
+        }
+        emails = {attrs['email'] for _, attrs in valid}
+        usernames = set(get_user_model().objects.filter(username__in=emails).values_list('username', flat=True))
+        errors = {}
+        for number, attrs in valid:
+            row_errors = {}
+            for name in self.unique_fields:
+                value = attrs[name]
+                if value in taken[name]:
+                    row_errors[name] = [f'A patient with this {name} already exists.']
+                elif value in self.seen[name]:
+                    row_errors[name] = [f'Row {self.seen[name][value]} has the same {name}.']
+            if 'email' not in row_errors and attrs['email'] in usernames:
+                row_errors['email'] = ['A user account with this email already exists.']
+            if row_errors:
+                errors[number] = row_errors
+            else:
+                for name in self.unique_fields:
+                    self.seen[name][attrs[name]] = number
+        return errors
+
+    def create(self, rows):
+        User = get_user_model()
+        now = timezone.now()
+        # Unusable like set_unusable_password(); one random suffix per batch.
+        password = make_password(None)
+        insert_rows(User, (
+            dict(
+                username=attrs['email'], email=attrs['email'], password=password,
+                first_name=attrs['first_name'], last_name=attrs['last_name'], user_type='patient',
+                phone=attrs['phone'], date_of_birth=attrs['date_of_birth'], date_joined=now,
+            )
+            for attrs in rows
+        ))
+        user_ids = dict(
+            User.objects.filter(username__in=[attrs['email'] for attrs in rows]).values_list('username', 'pk')
+        )
+        insert_rows(Patient, (
+            {**self.column_values(attrs, now), 'user_id': user_ids[attrs['email']]} for attrs in rows
+        ))
+
+
+class AppointmentImporter(Importer):
+    """
+    Appointments. A row names its patient by id (patient), phone
+    (patient_phone) or email (patient_email), and its practitioner by id
+    (practitioner) or license number (practitioner_license_number).
+    """
+    serializer_class = AppointmentSerializer
+    references = {
+        'patient_phone': ('patient', Patient, 'phone'),
+        'patient_email': ('patient', Patient, 'email'),
+        'practitioner_license_number': ('practitioner', Practitioner, 'license_number'),
+    }
+
+    def check(self, valid):
+        default_duration = Appointment._meta.get_field('duration_minutes').default
+        conflicts = find_conflicts([
+            (number, attrs['practitioner'], attrs['appointment_date'], attrs['appointment_time'],
+             attrs.get('duration_minutes') or default_duration)
+            for number, attrs in valid
+            if attrs.get('status') not in INACTIVE_STATUSES
+        ])
+        errors = {}
+        rows = dict(valid)
+        for number, (kind, ref) in conflicts.items():
+            practitioner = rows[number]['practitioner']
+            if kind == 'appointment':
+                message = f"{practitioner} already has appointment {ref} at this time."
+            else:
+                message = f"Overlaps row {ref} for {practitioner}."
+            errors[number] = {"appointment_time": [message]}
+        return errors
+
+    def create(self, rows):
+        now = timezone.now()
+        insert_rows(Appointment, (self.column_values(attrs, now) for attrs in rows))
+        add_care_relationships((attrs['practitioner'].pk, attrs['patient'].pk) for attrs in rows)
+        self.user_ids.update(attrs['patient'].user_id for attrs in rows)
+        self.user_ids.update(attrs['practitioner'].user_id for attrs in rows)
+
+
+IMPORTERS = {'patients': PatientImporter, 'appointments': AppointmentImporter}
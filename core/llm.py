@@ -0,0 +1,182 @@
+"""
+Long-lived client for the chatbot's language model.
+
+The Gemini SDK is configured once per process (see CHATBOT_LLM in settings)
+and the same GenerativeModel serves every request. ``generate()`` is the
+blocking call used by the sync ChatBotAPIView; ``stream()`` is an async
+generator of text chunks for the ASGI streaming view. Both answer repeated
+questions from the response cache (core/chat_cache.py) when it is enabled,
+and every call that does reach the model holds a slot from the admission
+controller (core/admission.py), which raises Overloaded when none is free.
+
+With the default gRPC transport the stream uses the SDK's native asyncio
+client. The REST transport (used to talk to ``manage.py fake_llm_server``) has
+no asyncio client, so its blocking stream is read on a small dedicated thread
+pool and handed to the event loop chunk by chunk.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+import google.generativeai as genai
+
+from .admission import admission_from_settings
+from .chat_cache import cache_from_settings
+from .timing import measure
+
+_DONE = object()
+
+
+class ChatClient:
+
+    def __init__(self, api_key, model='gemini-pro', api_endpoint=None, transport=None,
+                 timeout=30, stream_threads=8, cache=None, admission=None):
+        genai.configure(
+            api_key=api_key,
+            transport=transport,
+            client_options={'api_endpoint': api_endpoint} if api_endpoint else None,
+        )
+        self.model = genai.GenerativeModel(model)
+        self.transport = transport
+        self.timeout = timeout
+        self.cache = cache
+        self.admission = admission
+        self._executor = ThreadPoolExecutor(max_workers=stream_threads, thread_name_prefix='llm-stream')
+
+    def generate(self, prompt, timeout=None):
+        if self.cache is not None:
+            cached = self.cache.get(prompt)
+            if cached is not None:
+                return cached
+        with self._slot():
+            started = time.perf_counter()
+            with measure('llm'):
+                response = self.model.generate_content(
+                    prompt, request_options={'timeout': timeout or self.timeout},
+                )
+        if self.cache is not None:
+            self.cache.set(prompt, response.text, time.perf_counter() - started)
+        return response.text
+
+    async def stream(self, prompt, timeout=None):
+        """
+        Yield the reply to ``prompt`` as it arrives. Raises TimeoutError if the
+        whole reply takes longer than ``timeout`` seconds.
+        """
+        if self.cache is not None:
+            cached = await self.cache.aget(prompt)
+            if cached is not None:
+                yield cached
+                return
+
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        parts = []
+        async with self._aslot():
+            started = loop.time()
+            deadline = started + timeout
+            if self.transport == 'rest':
+                chunks = self._stream_in_thread(prompt, timeout)
+            else:
+                chunks = self._stream_native(prompt, timeout)
+            try:
+                while True:
+                    try:
+                        text = await asyncio.wait_for(anext(chunks), deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    if text:
+                        parts.append(text)
+                        yield text
+            finally:
+                await chunks.aclose()
+        if self.cache is not None and parts:
+            await self.cache.aset(prompt, ''.join(parts), loop.time() - started)
+
+    def _slot(self):
+        return self.admission.slot() if self.admission is not None else nullcontext()
+
+    def _aslot(self):
+        return self.admission.aslot() if self.admission is not None else nullcontext()
+
+    async def _stream_native(self, prompt, timeout):
+        response = await self.model.generate_content_async(
+            prompt, stream=True, request_options={'timeout': timeout},
+        )
+        async for chunk in response:
+            yield chunk.text
+
+    async def _stream_in_thread(self, prompt, timeout):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # The event loop is gone; nobody is listening any more.
+                stopped.set()
+
+        def produce():
+            try:
+                response = self.model.generate_content(
+                    prompt, stream=True, request_options={'timeout': timeout},
+                )
+                for chunk in response:
+                    if stopped.is_set():
+                        break
+                    put(chunk.text)
+            except Exception as exc:
+                put(exc)
+            finally:
+                put(_DONE)
+
+        loop.run_in_executor(self._executor, produce)
+        try:
+            while (item := await queue.get()) is not _DONE:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Return the process-wide ChatClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                options = getattr(settings, 'CHATBOT_LLM', {})
+                _client = ChatClient(
+                    api_key=settings.GEMINI_API_KEY,
+                    model=options.get('MODEL', 'gemini-pro'),
+                    api_endpoint=options.get('API_ENDPOINT'),
+                    transport=options.get('TRANSPORT'),
+                    timeout=options.get('TIMEOUT', 30),
+                    stream_threads=options.get('STREAM_THREADS', 8),
+                    cache=cache_from_settings(namespace=options.get('MODEL', 'gemini-pro')),
+                    admission=admission_from_settings(),
+                )
+    return _client
+
+
+@receiver(setting_changed)
+def reset_llm_client(*, setting, **kwargs):
+    """Rebuild the client on next use when override_settings() changes its configuration."""
+    global _client
+    if setting in ('GEMINI_API_KEY', 'CHATBOT_LLM', 'CHATBOT_CACHE', 'CHATBOT_ADMISSION'):
+        with _client_lock:
+            _client = None
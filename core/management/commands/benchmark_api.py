@@ -0,0 +1,104 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmark import DEFAULT_THRESHOLD, compare_results, run_benchmark
+from core.sample_data import local_caches
+from core.synthetic_data import Scale
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every API endpoint as each role against a seeded throwaway test database '
+        '(offline; the chatbot uses a local fake LLM). Reports p50/p95/p99 latency, throughput, '
+        'SQL queries and peak memory, writes them as JSON and fails on regressions against a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--practitioners', type=int, default=20)
+        parser.add_argument('--patients', type=int, default=2000)
+        parser.add_argument('--appointments', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--iterations', type=int, default=20, help='Timed calls per endpoint and role.')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed calls before the timed ones.')
+        parser.add_argument(
+            '--rounds', type=int, default=5,
+            help='Passes over all endpoints that the timed calls are spread across.',
+        )
+        parser.add_argument(
+            '--only', action='append',
+            help='Only run endpoints whose name contains this text (repeatable), e.g. --only patients.',
+        )
+        parser.add_argument('--output', default='benchmark-results.json', help='Where to write the results.')
+        parser.add_argument('--baseline', help='Results file to compare against.')
+        parser.add_argument(
+            '--threshold', type=float, default=DEFAULT_THRESHOLD,
+            help=f'Allowed latency/memory growth over the baseline in percent (default {DEFAULT_THRESHOLD}).',
+        )
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help='Also write the results to --baseline instead of comparing against it.',
+        )
+
+    @local_caches()
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['rounds'] < 1:
+            raise CommandError('--iterations and --rounds must be at least 1.')
+        if options['update_baseline'] and not options['baseline']:
+            raise CommandError('--update-baseline needs --baseline.')
+        baseline = None
+        if options['baseline'] and not options['update_baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read baseline {options['baseline']}: {e}")
+
+        scale = Scale(
+            practitioners=options['practitioners'],
+            patients=options['patients'],
+            appointments=options['appointments'],
+        )
+        workdir = tempfile.TemporaryDirectory()
+        if connection.vendor == 'sqlite':
+            # A file rather than SQLite's in-memory test database: closer to
+            # production, and visible to the threads async views run ORM calls on.
+            connection.settings_dict['TEST']['NAME'] = str(Path(workdir.name) / 'benchmark.sqlite3')
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = run_benchmark(
+                scale,
+                seed=options['seed'],
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                rounds=min(options['rounds'], options['iterations']),
+                only=options['only'],
+                log=self.stdout.write,
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            workdir.cleanup()
+
+        document = json.dumps(results, indent=2)
+        Path(options['output']).write_text(document)
+        self.stdout.write(f"Wrote {len(results['results'])} results to {options['output']}.")
+        if options['update_baseline']:
+            Path(options['baseline']).write_text(document)
+            self.stdout.write(f"Updated baseline {options['baseline']}.")
+
+        failures = [
+            f"{key}: expected status {result['expected_status']}, got {', '.join(result['statuses'])}"
+            for key, result in results['results'].items() if not result['ok']
+        ]
+        if baseline is not None:
+            failures += compare_results(results, baseline, threshold=options['threshold'])
+        for failure in failures:
+            self.stdout.write(self.style.ERROR(failure))
+        if failures:
+            raise CommandError(f'{len(failures)} benchmark check(s) failed.')
+        self.stdout.write(self.style.SUCCESS('Benchmark passed.'))
@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from core.sample_data import create_role_users, create_clinic, local_caches
+
+# Maximum number of SQL queries each list endpoint may issue per role. These
+# numbers must not grow with the number of rows returned; raise them only
+# together with a change that genuinely needs another query. Each list costs
+# the ETag validator query (a primary-key lookup of the table versions, see
+# core/versions.py) plus the page query.
+QUERY_BUDGETS = {
+    '/api/patients/': {'admin': 2, 'doctor': 2, 'patient': 2},
+    '/api/practitioners/': {'admin': 2, 'doctor': 2, 'patient': 2},
+    '/api/treatment-plans/': {'admin': 2, 'doctor': 2, 'patient': 2},
+    '/api/treatment-plans/outstanding/': {'admin': 2, 'doctor': 2, 'patient': 2},
+    '/api/appointments/': {'admin': 2, 'doctor': 2, 'patient': 2},
+    '/api/notifications/': {'admin': 2, 'doctor': 2, 'patient': 2},
+    '/api/feedback/': {'admin': 2, 'doctor': 2, 'patient': 2},
+    '/api/feedback/summaries/': {'admin': 2, 'doctor': 2, 'patient': 2},
+    '/api/feedback/summaries/?by=treatment_plan': {'admin': 2, 'doctor': 2, 'patient': 2},
+}
+
+# A revalidation with a matching If-None-Match must be answered (304) by the
+# validator query alone.
+REVALIDATION_BUDGET = 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Run every core list endpoint as each role against a throwaway test database '
+        'and fail if any of them exceeds its query budget.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=25, help='Number of patients to seed.')
+
+    @local_caches()
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            failures = self.check_budgets(options['patients'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if failures:
+            raise CommandError(f'{failures} endpoint(s) exceeded their query budget.')
+        self.stdout.write(self.style.SUCCESS('All endpoints are within their query budget.'))
+
+    def check_budgets(self, patients):
+        users = create_role_users()
+        create_clinic(users, patients=patients)
+
+        failures = 0
+        for url, budgets in QUERY_BUDGETS.items():
+            for role, budget in budgets.items():
+                client = APIClient()
+                client.force_authenticate(user=users[role])
+                with CaptureQueriesContext(connection) as ctx:
+                    response = client.get(url)
+                count = len(ctx.captured_queries)
+                ok = response.status_code == 200 and count <= budget
+                line = f'{url:<44} {role:<8} {count:>3} queries (budget {budget}, status {response.status_code})'
+                if ok:
+                    self.stdout.write(line)
+                else:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(line))
+
+                with CaptureQueriesContext(connection) as ctx:
+                    revalidated = client.get(url, HTTP_IF_NONE_MATCH=response.get('ETag', ''))
+                count = len(ctx.captured_queries)
+                ok = revalidated.status_code == 304 and count <= REVALIDATION_BUDGET
+                line = (
+                    f'{url:<44} {role:<8} {count:>3} queries (budget {REVALIDATION_BUDGET}, '
+                    f'status {revalidated.status_code}, revalidated)'
+                )
+                if ok:
+                    self.stdout.write(line)
+                else:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(line))
+        return failures
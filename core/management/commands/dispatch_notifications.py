@@ -0,0 +1,76 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.dispatch import dispatch_batch, get_backend
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Deliver unsent notifications whose scheduled_for time has passed or is unset. Several workers '
+        'can run side by side; each notification is claimed by exactly one of them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=getattr(settings, 'NOTIFICATION_DISPATCH_BATCH_SIZE', 100),
+            help='Notifications claimed per batch.',
+        )
+        parser.add_argument(
+            '--lease', type=int, default=300,
+            help='Seconds before an undelivered claim expires and the row can be retried.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running and poll for new due notifications instead of exiting when idle.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Seconds to sleep between polls when --loop finds nothing to send.',
+        )
+        parser.add_argument('--backend', help='Dotted path overriding NOTIFICATION_BACKEND.')
+
+    def handle(self, *args, **options):
+        backend = get_backend(options['backend'])
+        batch_size, lease = options['batch_size'], options['lease']
+
+        claimed_total = sent_total = batches = 0
+        started = time.perf_counter()
+        backend.open()
+        try:
+            while True:
+                try:
+                    claimed, sent = dispatch_batch(backend, batch_size, lease)
+                except Exception:
+                    if not options['loop']:
+                        raise
+                    logger.exception('Notification batch failed; retrying after the lease expires.')
+                    time.sleep(options['interval'])
+                    continue
+
+                if claimed:
+                    batches += 1
+                    claimed_total += claimed
+                    sent_total += sent
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'Batch {batches}: claimed {claimed}, sent {sent}')
+                elif options['loop']:
+                    time.sleep(options['interval'])
+                else:
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            backend.close()
+
+        elapsed = time.perf_counter() - started
+        rate = sent_total / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {sent_total} of {claimed_total} claimed notifications in {batches} batches '
+            f'({elapsed:.2f}s, {rate:.1f} notifications/s).'
+        ))
@@ -0,0 +1,113 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.urls import router
+
+ROLES = ('admin', 'doctor', 'patient')
+
+# Lists that are meant to sort, and why. Anything else that sorts or scans fails.
+EXPECTED_SORTS = {
+    # A doctor's patients are looked up by id from their care relationships
+    # and sorted; they are bounded by the doctor's caseload, while walking
+    # patient_created_idx for them would read the whole clinic's patients.
+    ('patients', 'doctor'): "sorts the doctor's cared-for patients",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN QUERY PLAN on the list queries (ETag validator and pages) every router-registered viewset "
+        "issues for each role, and fail on full-table scans and whole-result sorts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--report-only', action='store_true',
+            help='Print the findings but exit successfully.',
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Print the full query plan for every query, not just flagged ones.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('explain_queries only understands SQLite query plans.')
+
+        failures = 0
+        for prefix, viewset, _basename in router.registry:
+            for role in ROLES:
+                for label, queryset in self.list_queries(viewset, prefix, role):
+                    plan = queryset.explain().splitlines()
+                    full_scans = [line for line in plan if self.is_full_scan(line)]
+                    sorts = [line for line in plan if 'USE TEMP B-TREE' in line]
+                    expected = EXPECTED_SORTS.get((prefix, role)) if sorts and not full_scans else None
+
+                    title = f'{prefix:<16} {role:<8} {label}'
+                    if full_scans:
+                        failures += 1
+                        self.stdout.write(self.style.ERROR(f'{title}: full-table scan'))
+                    elif expected:
+                        self.stdout.write(f'{title}: ok ({expected})')
+                    elif sorts:
+                        failures += 1
+                        self.stdout.write(self.style.ERROR(f'{title}: sorts via temp b-tree'))
+                    else:
+                        self.stdout.write(f'{title}: ok')
+                    if full_scans or (sorts and not expected) or options['verbose_plans']:
+                        for line in plan:
+                            self.stdout.write(f'    {line}')
+
+        if failures and not options['report_only']:
+            raise CommandError(f'Found {failures} full-table scan(s) or unexpected sort(s).')
+
+    @staticmethod
+    def is_full_scan(line):
+        # SQLite reports "SCAN <table>" for a table walk and
+        # "SCAN <table> USING [COVERING] INDEX ..." for an ordered index walk.
+        detail = line.split(None, 3)[-1] if line[:1].isdigit() else line
+        return detail.startswith('SCAN ') and ' USING ' not in detail
+
+    def list_queries(self, viewset, prefix, role):
+        """
+        Yield the ETag validator, first-page and next-page queries the
+        viewset's list action would run, built through the same
+        get_queryset/pagination code paths.
+        """
+        request = Request(APIRequestFactory().get(f'/api/{prefix}/'))
+        request.user = self.user_for_role(role)
+        view = viewset(request=request, format_kwarg=None, action='list', args=(), kwargs={})
+        queryset = view.get_queryset()
+        scoped = bool(queryset.query.where)
+        queryset = view.filter_queryset(queryset)
+        if hasattr(view, 'validator_queryset'):
+            yield 'validator', view.validator_queryset(queryset, scoped)
+
+        paginator = view.paginator
+        if paginator is None:
+            yield 'list', queryset
+            return
+
+        ordering = paginator.get_ordering(queryset)
+        page_size = paginator.page_size
+        ordered = queryset.order_by(*ordering)
+        yield 'first page', ordered[:page_size + 1]
+
+        boundary = ordered.first()
+        if boundary is not None:
+            paginator.ordering, paginator.reverse = ordering, False
+            values = [paginator._to_string(getattr(boundary, field.lstrip('-'))) for field in ordering]
+            seek = paginator.seek_filter(queryset, values)
+            yield 'next page', ordered.filter(seek)[:page_size + 1]
+
+    @staticmethod
+    def user_for_role(role):
+        User = get_user_model()
+        user = User.objects.filter(user_type=role).order_by('pk').first()
+        if user is None:
+            # An unsaved placeholder is enough to build the role-scoped filters.
+            user = User(pk=0, user_type=role)
+        return user
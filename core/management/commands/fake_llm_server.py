@@ -0,0 +1,103 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """
+    Answers the Gemini REST generateContent and streamGenerateContent calls.
+    The reply is sent one word at a time, ``delay`` seconds apart.
+    """
+
+    reply = None
+    delay = 0.05
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self.send_error(400, 'Request body is not JSON.')
+
+        path = self.path.split('?', 1)[0]
+        if path.endswith(':streamGenerateContent'):
+            self.stream(self.words(body))
+        elif path.endswith(':generateContent'):
+            time.sleep(self.delay * len(self.words(body)))
+            payload = json.dumps(self.candidate(''.join(self.words(body)))).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        else:
+            self.send_error(404, f'Unknown method {path}')
+
+    def stream(self, words):
+        # The REST transport reads a JSON array whose elements arrive over time.
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'[')
+        for index, word in enumerate(words):
+            time.sleep(self.delay)
+            prefix = b',\r\n' if index else b''
+            self.wfile.write(prefix + json.dumps(self.candidate(word)).encode())
+            self.wfile.flush()
+        self.wfile.write(b']')
+
+    def words(self, body):
+        if self.reply is not None:
+            text = self.reply
+        else:
+            prompt = ' '.join(
+                part.get('text', '')
+                for content in body.get('contents', [])
+                for part in content.get('parts', [])
+            )
+            text = f'You said: {prompt}'
+        words = text.split(' ')
+        return [word + ' ' for word in words[:-1]] + words[-1:]
+
+    @staticmethod
+    def candidate(text):
+        return {'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}, 'index': 0}]}
+
+    def log_message(self, format, *args):
+        if self.server.verbosity > 1:
+            super().log_message(format, *args)
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a local stand-in for the Gemini REST API for developing and load testing '
+        'the chatbot. Point the app at it with GEMINI_API_ENDPOINT=http://HOST:PORT '
+        'and GEMINI_TRANSPORT=rest.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--delay', type=float, default=0.05,
+            help='Seconds between streamed words (use a large value to exercise timeouts).',
+        )
+        parser.add_argument('--reply', help='Fixed reply text; by default the prompt is echoed back.')
+
+    def handle(self, *args, **options):
+        handler = type('Handler', (FakeGeminiHandler,), {
+            'reply': options['reply'],
+            'delay': options['delay'],
+        })
+        server = ThreadingHTTPServer((options['host'], options['port']), handler)
+        server.daemon_threads = True
+        server.verbosity = options['verbosity']
+        self.stdout.write(f"Fake LLM server listening on http://{options['host']}:{options['port']}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,34 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core.reminders import generate_appointment_reminders
+
+
+class Command(BaseCommand):
+    help = 'Queue appointment_reminder notifications for upcoming appointments that have none yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=float, default=24,
+            help='Remind about appointments starting within this many hours (default 24).',
+        )
+        parser.add_argument(
+            '--lead-hours', type=float, default=24,
+            help='Schedule each reminder this many hours before its appointment (default 24).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert.')
+        parser.add_argument('--dry-run', action='store_true', help='Count reminders without creating them.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        queued = generate_appointment_reminders(
+            window=timedelta(hours=options['hours']),
+            lead_time=timedelta(hours=options['lead_hours']),
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        elapsed = time.perf_counter() - started
+        verb = 'Would queue' if options['dry_run'] else 'Queued'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {queued} appointment reminders in {elapsed:.2f}s.'))
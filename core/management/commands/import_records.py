@@ -0,0 +1,43 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.imports import FORMATS, IMPORT_BATCH_SIZE, IMPORTERS, input_format, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Import patients or appointments from a CSV or JSON Lines file in batches, e.g. '
+        '`import_records patients clinic.csv`. Rejected rows are listed by line number and '
+        'do not stop the rest of the file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=IMPORTERS)
+        parser.add_argument('path')
+        parser.add_argument('--input', choices=FORMATS, help='File format (default: from the extension, else csv).')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Rows per batch.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            file = open(options['path'], 'rb')
+        except OSError as e:
+            raise CommandError(e)
+        with file:
+            importer = IMPORTERS[options['resource']](batch_size=options['batch_size'])
+            report = importer.run(read_rows(file, options['input'] or input_format(options['path'])))
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        if 'error' in report:
+            raise CommandError(
+                f"{report['error']} The import stopped there after importing {report['created']} "
+                f"{options['resource']} and rejecting {report['failed']} rows."
+            )
+        elapsed = time.perf_counter() - started
+        rows = report['created'] + report['failed']
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} {options['resource']} and rejected {report['failed']} rows "
+            f"in {elapsed:.2f}s ({rows / elapsed:.0f} rows/s)."
+        ))
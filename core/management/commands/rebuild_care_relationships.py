@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.care import REBUILD_BATCH_SIZE, rebuild_care_relationships
+from core.models import Practitioner
+from core.stats import invalidate_dashboard_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Regenerate the practitioner-patient CareRelationship table from treatment '
+        'plans and appointments, e.g. after loading data with bulk inserts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE, help='Rows per bulk insert.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_care_relationships(batch_size=options['batch_size'])
+        # Doctors' patient counts come from this table.
+        invalidate_dashboard_stats(Practitioner.objects.values_list('user_id', flat=True))
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {written} care relationships in {time.perf_counter() - started:.2f}s.'
+        ))
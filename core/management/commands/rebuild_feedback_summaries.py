@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.feedback_summary import REBUILD_BATCH_SIZE, rebuild_feedback_summaries
+from core.models import Practitioner
+from core.stats import invalidate_dashboard_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Regenerate the per-practitioner and per-treatment-plan feedback summaries '
+        'from the feedback table, e.g. after loading feedback with bulk inserts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE, help='Rows per bulk insert.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_feedback_summaries(batch_size=options['batch_size'])
+        # Admin and doctor dashboards read their feedback totals from the summaries.
+        invalidate_dashboard_stats(Practitioner.objects.values_list('user_id', flat=True))
+        counts = ', '.join(f'{rows} {model._meta.verbose_name_plural}' for model, rows in written.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {counts} in {time.perf_counter() - started:.2f}s.'
+        ))
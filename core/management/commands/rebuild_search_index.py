@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.search import INDEXES, ensure_search_indexes, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the full-text search indexes if they are missing and rebuild them from the '
+        'patient and treatment plan tables (e.g. after restoring a backup or editing rows with triggers off).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        if connections[options['database']].vendor != 'sqlite':
+            raise CommandError('Full-text search indexes exist only on SQLite; other databases search with icontains.')
+        ensure_search_indexes(options['database'])
+        for index in INDEXES.values():
+            rebuild_search_index(index, using=options['database'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS('Search indexes are up to date.'))
@@ -0,0 +1,51 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.db_routing import replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the default SQLite database into every configured replica file (see DATABASE_REPLICAS) '
+        'with SQLite\'s online backup, so it is consistent while the primary takes writes. '
+        'With --interval it keeps copying, which simulates replication lag locally.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='Repeat every this many seconds until interrupted (default: copy once).',
+        )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if primary['ENGINE'] not in ('django.db.backends.sqlite3', 'core.backends.sqlite3'):
+            raise CommandError('Only SQLite primaries can be copied; other databases replicate themselves.')
+        replicas = {alias: settings.DATABASES[alias]['NAME'] for alias in replica_aliases()}
+        if not replicas:
+            raise CommandError('No replicas configured; set DATABASE_REPLICAS to a comma-separated list of files.')
+
+        while True:
+            started = time.perf_counter()
+            source = sqlite3.connect(primary['NAME'])
+            try:
+                for alias, name in replicas.items():
+                    # Backing up into the live file, rather than replacing it,
+                    # lets connections that are already open see the new pages.
+                    target = sqlite3.connect(name)
+                    try:
+                        source.backup(target)
+                    finally:
+                        target.close()
+            finally:
+                source.close()
+            self.stdout.write(self.style.SUCCESS(
+                f'Copied {primary["NAME"]} to {len(replicas)} replica(s) in {time.perf_counter() - started:.2f}s.'
+            ))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,47 @@
+"""
+Response compression for the API.
+
+Prefers Brotli when the client accepts it and the optional ``brotli`` package
+is installed, and falls back to Django's gzip handling otherwise. Bodies
+shorter than COMPRESSION_MIN_LENGTH bytes and server-sent event streams are
+left as they are.
+"""
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+
+
+class CompressionMiddleware(GZipMiddleware):
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        if response.streaming:
+            return super().process_response(request, response)
+        if len(response.content) < getattr(settings, 'COMPRESSION_MIN_LENGTH', 200):
+            return response
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is None or not re_accepts_brotli.search(accept_encoding):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(response.content))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'br'
+        return response
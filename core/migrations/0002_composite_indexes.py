@@ -0,0 +1,67 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['created_at'], name='patient_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='practitioner',
+            index=models.Index(fields=['created_at'], name='practitioner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatmentplan',
+            index=models.Index(fields=['created_at'], name='plan_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatmentplan',
+            index=models.Index(fields=['practitioner', 'status'], name='plan_practitioner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatmentplan',
+            index=models.Index(fields=['patient', 'created_at'], name='plan_patient_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['appointment_date', 'appointment_time'], name='appt_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['practitioner', 'appointment_date', 'appointment_time'], name='appt_practitioner_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'appointment_date', 'appointment_time'], name='appt_patient_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['created_at'], name='notif_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['patient', 'status', 'created_at'], name='notif_patient_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['practitioner', 'status', 'created_at'], name='notif_practitioner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['created_at'], name='feedback_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['practitioner', 'created_at'], name='feedback_practitioner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['patient', 'created_at'], name='feedback_patient_idx'),
+        ),
+    ]
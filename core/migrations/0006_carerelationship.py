@@ -0,0 +1,35 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_care_relationships(apps, schema_editor):
+    CareRelationship = apps.get_model('core', 'CareRelationship')
+    plans = apps.get_model('core', 'TreatmentPlan').objects.order_by().values_list('practitioner_id', 'patient_id')
+    appointments = apps.get_model('core', 'Appointment').objects.order_by().values_list('practitioner_id', 'patient_id')
+    CareRelationship.objects.bulk_create(
+        [CareRelationship(practitioner_id=practitioner, patient_id=patient) for practitioner, patient in plans.union(appointments)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_cachedchatresponse'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CareRelationship',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='care_relationships', to='core.patient')),
+                ('practitioner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='care_relationships', to='core.practitioner')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('practitioner', 'patient'), name='unique_care_relationship')],
+            },
+        ),
+        migrations.RunPython(populate_care_relationships, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+import core.models
+
+
+def create_search_indexes(apps, schema_editor):
+    from core.search import ensure_search_indexes
+    ensure_search_indexes(schema_editor.connection.alias)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in ('core_patient_fts', 'core_treatmentplan_fts'):
+        for trigger in ('insert', 'delete', 'update'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_{trigger}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_carerelationship'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientSearchEntry',
+            fields=[
+                ('patient', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='core.patient')),
+                ('document', core.models.SearchDocumentField(db_column='core_patient_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'core_patient_fts',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TreatmentPlanSearchEntry',
+            fields=[
+                ('plan', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='core.treatmentplan')),
+                ('document', core.models.SearchDocumentField(db_column='core_treatmentplan_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'core_treatmentplan_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,92 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+# The feedback scores as of this migration; core.feedback_summary may change later.
+SCORES = ('treatment_effectiveness', 'practitioner_care', 'facility_cleanliness', 'overall_satisfaction')
+
+
+def summary_aggregates():
+    aggregates = {
+        'feedback_count': Count('pk'),
+        'rating_sum': Sum('rating'),
+        'would_recommend_count': Count('pk', filter=Q(would_recommend=True)),
+    }
+    for stars in range(1, 6):
+        aggregates[f'rating_{stars}'] = Count('pk', filter=Q(rating=stars))
+    for score in SCORES:
+        aggregates[f'{score}_sum'] = Coalesce(Sum(score), 0)
+        aggregates[f'{score}_count'] = Count(score)
+    return aggregates
+
+
+def populate_feedback_summaries(apps, schema_editor):
+    Feedback = apps.get_model('core', 'Feedback')
+    for name, column in (('PractitionerFeedbackSummary', 'practitioner_id'), ('TreatmentPlanFeedbackSummary', 'treatment_plan_id')):
+        model = apps.get_model('core', name)
+        rows = Feedback.objects.exclude(**{column: None}).order_by().values(column).annotate(**summary_aggregates())
+        model.objects.bulk_create([model(pk=row.pop(column), **row) for row in rows.iterator()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PractitionerFeedbackSummary',
+            fields=[
+                ('practitioner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feedback_summary', serialize=False, to='core.practitioner')),
+                ('feedback_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_1', models.IntegerField(default=0)),
+                ('rating_2', models.IntegerField(default=0)),
+                ('rating_3', models.IntegerField(default=0)),
+                ('rating_4', models.IntegerField(default=0)),
+                ('rating_5', models.IntegerField(default=0)),
+                ('treatment_effectiveness_sum', models.IntegerField(default=0)),
+                ('treatment_effectiveness_count', models.IntegerField(default=0)),
+                ('practitioner_care_sum', models.IntegerField(default=0)),
+                ('practitioner_care_count', models.IntegerField(default=0)),
+                ('facility_cleanliness_sum', models.IntegerField(default=0)),
+                ('facility_cleanliness_count', models.IntegerField(default=0)),
+                ('overall_satisfaction_sum', models.IntegerField(default=0)),
+                ('overall_satisfaction_count', models.IntegerField(default=0)),
+                ('would_recommend_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TreatmentPlanFeedbackSummary',
+            fields=[
+                ('treatment_plan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feedback_summary', serialize=False, to='core.treatmentplan')),
+                ('feedback_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_1', models.IntegerField(default=0)),
+                ('rating_2', models.IntegerField(default=0)),
+                ('rating_3', models.IntegerField(default=0)),
+                ('rating_4', models.IntegerField(default=0)),
+                ('rating_5', models.IntegerField(default=0)),
+                ('treatment_effectiveness_sum', models.IntegerField(default=0)),
+                ('treatment_effectiveness_count', models.IntegerField(default=0)),
+                ('practitioner_care_sum', models.IntegerField(default=0)),
+                ('practitioner_care_count', models.IntegerField(default=0)),
+                ('facility_cleanliness_sum', models.IntegerField(default=0)),
+                ('facility_cleanliness_count', models.IntegerField(default=0)),
+                ('overall_satisfaction_sum', models.IntegerField(default=0)),
+                ('overall_satisfaction_count', models.IntegerField(default=0)),
+                ('would_recommend_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(populate_feedback_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_feedback_summaries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='treatmentplan',
+            index=models.Index(models.F('practitioner'), models.Func(django.db.models.functions.comparison.Cast('start_date', models.CharField()), output_field=models.CharField(), template='SUBSTR(%(expressions)s, 1, 7)'), models.F('patient'), models.F('total_cost'), models.F('paid_amount'), models.F('start_date'), condition=models.Q(('total_cost__gt', models.F('paid_amount'))), name='plan_outstanding_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatmentplan',
+            index=models.Index(models.Func(django.db.models.functions.comparison.Cast('start_date', models.CharField()), output_field=models.CharField(), template='SUBSTR(%(expressions)s, 1, 7)'), models.F('patient'), models.F('total_cost'), models.F('paid_amount'), models.F('start_date'), condition=models.Q(('total_cost__gt', models.F('paid_amount'))), name='plan_outstanding_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatmentplan',
+            index=models.Index(models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(models.F('total_cost'), '-', models.F('paid_amount')), output_field=models.FloatField()), models.F('id'), condition=models.Q(('total_cost__gt', models.F('paid_amount'))), name='plan_remaining_idx'),
+        ),
+    ]
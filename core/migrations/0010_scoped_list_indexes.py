@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_plan_outstanding_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='treatmentplan',
+            index=models.Index(fields=['practitioner', 'created_at'], name='plan_practitioner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['patient', 'created_at'], name='notif_patient_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['practitioner', 'created_at'], name='notif_practitioner_created_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+def create_table_versions(apps, schema_editor):
+    from core.versions import ensure_table_versions
+    ensure_table_versions(schema_editor.connection.alias)
+
+
+def drop_table_versions(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from core.versions import EVENTS, VERSIONED_MODELS
+    for model in VERSIONED_MODELS:
+        for event in EVENTS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {model._meta.db_table}_version_{event}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_scoped_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_table_versions, drop_table_versions),
+    ]
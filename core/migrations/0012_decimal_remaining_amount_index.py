@@ -0,0 +1,20 @@
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_table_versions'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='treatmentplan',
+            name='plan_remaining_idx',
+        ),
+        migrations.AddIndex(
+            model_name='treatmentplan',
+            index=models.Index(django.db.models.expressions.CombinedExpression(models.F('total_cost'), '-', models.F('paid_amount')), models.F('id'), condition=models.Q(('total_cost__gt', models.F('paid_amount'))), name='plan_remaining_idx'),
+        ),
+    ]
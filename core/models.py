@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Cast
 from django.conf import settings
 
 class Practitioner(models.Model):
@@ -37,6 +38,9 @@ class Patient(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='patient_created_idx'),
+        ]
 
 
 class Practitioner(models.Model):
@@ -62,6 +66,43 @@ class Practitioner(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='practitioner_created_idx'),
+        ]
+
+
+# A plan owes money while this holds. The outstanding plan indexes are partial
+# on this condition, and queries must use it as written to be able to use them.
+OUTSTANDING = models.Q(total_cost__gt=models.F('paid_amount'))
+
+# The annotation and the index over it must compile to the same SQL for
+# SQLite to sort with the index. On SQLite each decimal expression is wrapped
+# in a CAST, the index's own wrapper included, so plan_remaining_idx indexes
+# the bare difference: both then come out as two CASTs around it.
+REMAINING_AMOUNT = models.ExpressionWrapper(
+    models.F('total_cost') - models.F('paid_amount'),
+    output_field=models.DecimalField(max_digits=10, decimal_places=2),
+)
+
+# 'YYYY-MM' of start_date, the month of the balance report. Plain SQL, so an
+# index can hold it (TruncMonth is a Python function on SQLite), with literal
+# arguments, since SQLite only matches an indexed expression without parameters.
+START_MONTH = models.Func(
+    Cast('start_date', models.CharField()), template='SUBSTR(%(expressions)s, 1, 7)',
+    output_field=models.CharField(),
+)
+
+
+class TreatmentPlanQuerySet(models.QuerySet):
+
+    def with_remaining_amount(self):
+        """ Annotate ``remaining_amount_db`` (total_cost - paid_amount) so it can be filtered and sorted on """
+        return self.annotate(remaining_amount_db=REMAINING_AMOUNT)
+
+    def outstanding(self):
+        """ Plans with something left to pay """
+        return self.filter(OUTSTANDING)
+
 
 class TreatmentPlan(models.Model):
     PLAN_STATUS_CHOICES = [
@@ -96,12 +137,37 @@ class TreatmentPlan(models.Model):
     def __str__(self):
         return f"{self.title} - {self.patient.first_name} {self.patient.last_name}"
 
+    objects = TreatmentPlanQuerySet.as_manager()
+
     @property
     def remaining_amount(self):
+        if hasattr(self, 'remaining_amount_db'):
+            return self.remaining_amount_db
         return self.total_cost - self.paid_amount
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='plan_created_idx'),
+            models.Index(fields=['practitioner', 'status'], name='plan_practitioner_status_idx'),
+            models.Index(fields=['practitioner', 'created_at'], name='plan_practitioner_created_idx'),
+            models.Index(fields=['patient', 'created_at'], name='plan_patient_created_idx'),
+            # Only plans with a balance: the balance report's groups in the
+            # order it returns them, with the amounts it sums (start_date makes
+            # them covering), and the largest-balance-first order of the
+            # outstanding list.
+            models.Index(
+                models.F('practitioner'), START_MONTH, models.F('patient'),
+                models.F('total_cost'), models.F('paid_amount'), models.F('start_date'),
+                name='plan_outstanding_idx', condition=OUTSTANDING,
+            ),
+            models.Index(
+                START_MONTH, models.F('patient'),
+                models.F('total_cost'), models.F('paid_amount'), models.F('start_date'),
+                name='plan_outstanding_month_idx', condition=OUTSTANDING,
+            ),
+            models.Index(REMAINING_AMOUNT.expression, models.F('id'), name='plan_remaining_idx', condition=OUTSTANDING),
+        ]
 
 
 class Appointment(models.Model):
@@ -132,6 +198,11 @@ class Appointment(models.Model):
 
     class Meta:
         ordering = ['-appointment_date', '-appointment_time']
+        indexes = [
+            models.Index(fields=['appointment_date', 'appointment_time'], name='appt_date_time_idx'),
+            models.Index(fields=['practitioner', 'appointment_date', 'appointment_time'], name='appt_practitioner_date_idx'),
+            models.Index(fields=['patient', 'appointment_date', 'appointment_time'], name='appt_patient_date_idx'),
+        ]
 
 
 class Notification(models.Model):
@@ -159,6 +230,9 @@ class Notification(models.Model):
     status = models.CharField(max_length=20, choices=NOTIFICATION_STATUS, default='unread')
     scheduled_for = models.DateTimeField(null=True, blank=True)
     sent_at = models.DateTimeField(null=True, blank=True)
+    # Set by the dispatcher while a worker owns the row; see core.dispatch.
+    claim_token = models.CharField(max_length=32, blank=True, default='')
+    claimed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -167,6 +241,23 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='notif_created_idx'),
+            models.Index(fields=['patient', 'status', 'created_at'], name='notif_patient_status_idx'),
+            models.Index(fields=['practitioner', 'status', 'created_at'], name='notif_practitioner_status_idx'),
+            models.Index(fields=['patient', 'created_at'], name='notif_patient_created_idx'),
+            models.Index(fields=['practitioner', 'created_at'], name='notif_practitioner_created_idx'),
+            models.Index(fields=['scheduled_for'], name='notif_due_idx', condition=models.Q(sent_at__isnull=True)),
+            models.Index(fields=['claim_token'], name='notif_claim_idx', condition=~models.Q(claim_token='')),
+        ]
+        constraints = [
+            # One reminder per appointment; also the index behind the reminder job's
+            # "already reminded?" check.
+            models.UniqueConstraint(
+                fields=['appointment'], condition=models.Q(notification_type='appointment_reminder'),
+                name='unique_appointment_reminder',
+            ),
+        ]
 
 
 class Feedback(models.Model):
@@ -200,4 +291,154 @@ class Feedback(models.Model):
         return f"{self.title} - {self.rating} stars by {self.patient}"
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='feedback_created_idx'),
+            models.Index(fields=['practitioner', 'created_at'], name='feedback_practitioner_idx'),
+            models.Index(fields=['patient', 'created_at'], name='feedback_patient_idx'),
+        ]
+
+class FeedbackSummary(models.Model):
+    """
+    Running feedback totals for one practitioner or treatment plan, maintained
+    by core.feedback_summary. Averages and the rating histogram are read from
+    these columns instead of the feedback rows.
+    """
+    feedback_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    rating_1 = models.IntegerField(default=0)
+    rating_2 = models.IntegerField(default=0)
+    rating_3 = models.IntegerField(default=0)
+    rating_4 = models.IntegerField(default=0)
+    rating_5 = models.IntegerField(default=0)
+    # The optional scores are averaged over the feedback that gave them.
+    treatment_effectiveness_sum = models.IntegerField(default=0)
+    treatment_effectiveness_count = models.IntegerField(default=0)
+    practitioner_care_sum = models.IntegerField(default=0)
+    practitioner_care_count = models.IntegerField(default=0)
+    facility_cleanliness_sum = models.IntegerField(default=0)
+    facility_cleanliness_count = models.IntegerField(default=0)
+    overall_satisfaction_sum = models.IntegerField(default=0)
+    overall_satisfaction_count = models.IntegerField(default=0)
+    would_recommend_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    SCORES = ('treatment_effectiveness', 'practitioner_care', 'facility_cleanliness', 'overall_satisfaction')
+
+    class Meta:
+        abstract = True
+
+    def average(self, score):
+        total, count = getattr(self, f'{score}_sum'), getattr(self, f'{score}_count')
+        return round(total / count, 2) if count else None
+
+    @property
+    def average_rating(self):
+        return round(self.rating_sum / self.feedback_count, 2) if self.feedback_count else None
+
+    @property
+    def rating_histogram(self):
+        return {str(stars): getattr(self, f'rating_{stars}') for stars in range(1, 6)}
+
+    @property
+    def score_averages(self):
+        return {score: self.average(score) for score in self.SCORES}
+
+    @property
+    def would_recommend_rate(self):
+        return round(self.would_recommend_count / self.feedback_count, 4) if self.feedback_count else None
+
+
+class PractitionerFeedbackSummary(FeedbackSummary):
+    practitioner = models.OneToOneField(
+        Practitioner, on_delete=models.CASCADE, primary_key=True, related_name='feedback_summary'
+    )
+
+    def __str__(self):
+        return f"Feedback summary for {self.practitioner}"
+
+
+class TreatmentPlanFeedbackSummary(FeedbackSummary):
+    treatment_plan = models.OneToOneField(
+        TreatmentPlan, on_delete=models.CASCADE, primary_key=True, related_name='feedback_summary'
+    )
+
+    def __str__(self):
+        return f"Feedback summary for plan {self.treatment_plan_id}"
+
+
+class CareRelationship(models.Model):
+    """ One row per practitioner treating a patient (through a plan or an appointment), maintained by core.care """
+    practitioner = models.ForeignKey(Practitioner, on_delete=models.CASCADE, related_name='care_relationships')
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='care_relationships')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.practitioner} - {self.patient}"
+
+    class Meta:
+        constraints = [
+            # Also the index behind doctor-scoped "patient_id IN (...)" lookups.
+            models.UniqueConstraint(fields=['practitioner', 'patient'], name='unique_care_relationship'),
+        ]
+
+
+class CachedChatResponse(models.Model):
+    """ Chatbot replies persisted by core.chat_cache when CHATBOT_CACHE['PERSIST'] is on """
+    key = models.CharField(max_length=64, unique=True)
+    prompt = models.TextField()
+    response = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.prompt[:50]
+
+
+class TableVersion(models.Model):
+    """ Change counter of one table, bumped by triggers on every write to it; see core.versions """
+    name = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class SearchDocumentField(models.TextField):
+    """ The hidden column an FTS5 table shares its name with; ``__match`` runs a full-text query """
+
+
+@SearchDocumentField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class PatientSearchEntry(models.Model):
+    """ Row of the FTS5 index over patients, created and kept in sync by core.search """
+    patient = models.OneToOneField(
+        Patient, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_entry'
+    )
+    document = SearchDocumentField(db_column='core_patient_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'core_patient_fts'
+
+
+class TreatmentPlanSearchEntry(models.Model):
+    """ Row of the FTS5 index over treatment plans, created and kept in sync by core.search """
+    plan = models.OneToOneField(
+        TreatmentPlan, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_entry'
+    )
+    document = SearchDocumentField(db_column='core_treatmentplan_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'core_treatmentplan_fts'
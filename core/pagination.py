@@ -0,0 +1,197 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over the queryset ordering.
+
+    The ordering comes from the queryset (or the model's Meta.ordering) with the
+    primary key appended as a tie-breaker, and the cursor stores the ordering
+    values of the row at the page boundary. Each page is fetched with a
+    ``WHERE (a, b, id) < (x, y, z)``-style filter instead of an OFFSET, so page N
+    costs the same as page 1 as long as an index covers the ordering.
+    """
+    page_size = api_settings.PAGE_SIZE or 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset)
+
+        cursor = self.decode_cursor(request)
+        self.reverse = cursor['reverse'] if cursor else False
+
+        if self.reverse:
+            queryset = queryset.order_by(*[self._invert(field) for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self.seek_filter(queryset, cursor['values']))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        page = results[:self.page_size]
+        if self.reverse:
+            page.reverse()
+
+        # Going forwards, a cursor means there is something before this page;
+        # going backwards, we came from a page that follows this one.
+        if self.reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering or [])
+        if isinstance(queryset.query.group_by, tuple):
+            # values().annotate() rows have no pk; the caller orders them by
+            # the grouped values, which identify each row.
+            return ordering
+        pk_name = queryset.model._meta.pk.name
+        if not any(self._is_unique(queryset, field.lstrip('-')) for field in ordering):
+            descending = bool(ordering) and ordering[0].startswith('-')
+            ordering.append(f'-{pk_name}' if descending else pk_name)
+        return ordering
+
+    @staticmethod
+    def _is_unique(queryset, name):
+        """Whether ordering on ``name`` alone already gives every row its own place."""
+        if name == 'pk':
+            return True
+        if name in queryset.query.annotations:
+            # A plain column annotation, e.g. the rowid of a joined search index.
+            field = getattr(queryset.query.annotations[name], 'target', None)
+        else:
+            try:
+                field = queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return False
+        return field is not None and field.unique and not field.null
+
+    def seek_filter(self, queryset, values):
+        """
+        Build ``a >= x AND ((a > x) OR (a = x AND b > y) OR ...)`` for the
+        current ordering, flipping each comparison for descending fields and for
+        backward paging. The redundant leading range lets the database seek into
+        the index and keep walking it in order instead of merging OR branches
+        and re-sorting.
+        """
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = {}
+        leading = None
+        for field, raw in zip(self.ordering, values):
+            name = field.lstrip('-')
+            value = self._to_python(queryset, name, raw)
+            descending = field.startswith('-') != self.reverse
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            if leading is None:
+                leading = Q(**{f'{lookup}e': value})
+            condition |= Q(**equal, **{lookup: value})
+            equal[name] = value
+        return leading & condition
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        values = [self._to_string(self._value(instance, field.lstrip('-'))) for field in self.ordering]
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            return {'values': list(payload['v']), 'reverse': bool(payload.get('r'))}
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _to_python(self, queryset, name, raw):
+        model = queryset.model
+        if name == 'pk':
+            name = model._meta.pk.name
+        if name in queryset.query.annotations:
+            # Ordering on an annotation, e.g. a search rank.
+            field = queryset.query.annotations[name].output_field
+        else:
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return raw
+        try:
+            return field.to_python(raw)
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _value(instance, name):
+        if isinstance(instance, dict):
+            return instance[name]
+        return getattr(instance, name)
+
+    @staticmethod
+    def _to_string(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
@@ -0,0 +1,82 @@
+"""
+Small, deterministic datasets used by the query-budget and benchmark commands.
+"""
+
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+
+from .models import Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback
+
+
+def local_caches():
+    """
+    Replace every cache with a per-process LocMemCache (as a decorator or
+    context manager). Cache keys hold user ids, so a throwaway database's users
+    must neither read nor fill the real, shared caches.
+    """
+    return override_settings(CACHES={
+        alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'local-{alias}'}
+        for alias in settings.CACHES
+    })
+
+
+def create_role_users(prefix='budget'):
+    """Create one admin, doctor and patient user and return them keyed by role."""
+    User = get_user_model()
+    return {
+        'admin': User.objects.create_user(f'{prefix}_admin', f'{prefix}_admin@ayursutra.test', 'x', user_type='admin'),
+        'doctor': User.objects.create_user(f'{prefix}_doctor', f'{prefix}_doctor@ayursutra.test', 'x', user_type='doctor'),
+        'patient': User.objects.create_user(f'{prefix}_patient', f'{prefix}_patient@ayursutra.test', 'x', user_type='patient'),
+    }
+
+
+def create_clinic(users, patients=25, prefix='budget'):
+    """
+    Populate a practitioner owned by ``users['doctor']`` and ``patients`` patients,
+    the first of which belongs to ``users['patient']``. Every patient gets a
+    treatment plan, an appointment, a notification and a feedback entry so each
+    list endpoint returns rows with both related objects set.
+    """
+    User = get_user_model()
+    practitioner = Practitioner.objects.create(
+        user=users['doctor'], first_name='Raj', last_name='Sharma',
+        specialization='Panchakarma Specialist', qualification='BAMS',
+        phone=f'{prefix}-doc-phone', email=f'{prefix}_doctor@clinic.test',
+        license_number=f'{prefix}-LIC-1', consultation_fee=Decimal('1500.00'),
+    )
+    today = date.today()
+    for index in range(patients):
+        if index == 0:
+            patient_user = users['patient']
+        else:
+            patient_user = User.objects.create_user(f'{prefix}_patient_{index}', password='x')
+        patient = Patient.objects.create(
+            user=patient_user, first_name='Patient', last_name=str(index),
+            date_of_birth=date(1985, 1, 1), phone=f'{prefix}-phone-{index}',
+            email=f'{prefix}_patient_{index}@clinic.test', prakriti='Vata',
+        )
+        plan = TreatmentPlan.objects.create(
+            patient=patient, practitioner=practitioner, title='Panchakarma Detox',
+            description='Detox', primary_diagnosis='Ama', treatment_type='Panchakarma',
+            start_date=today, end_date=today + timedelta(days=21), total_sessions=21,
+            total_cost=Decimal('50000.00'), paid_amount=Decimal('25000.00'), status='active',
+        )
+        appointment = Appointment.objects.create(
+            patient=patient, practitioner=practitioner, treatment_plan=plan,
+            appointment_date=today + timedelta(days=index % 7),
+            appointment_time=time(9 + index % 8, 0),
+        )
+        Notification.objects.create(
+            title='Appointment Reminder', message='See you soon',
+            notification_type='appointment_reminder', patient=patient,
+            practitioner=practitioner, appointment=appointment,
+        )
+        Feedback.objects.create(
+            patient=patient, practitioner=practitioner, treatment_plan=plan,
+            appointment=appointment, rating=5, title='Great care', comment='Feeling better',
+        )
+    return practitioner
@@ -0,0 +1,292 @@
+"""
+Practitioner availability and appointment conflict detection.
+
+``Practitioner.available_days`` and ``consultation_hours`` are free text, so
+they are parsed into a :class:`WorkingSchedule`. Booked appointments for a
+practitioner are loaded with one query over the (practitioner, appointment_date,
+appointment_time) index into an :class:`IntervalIndex`, which answers overlap
+questions with a binary search instead of walking every appointment.
+"""
+
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from itertools import accumulate
+
+from django.db import connections, router
+from django.utils import timezone
+
+from .models import Appointment, Practitioner
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+EVERY_DAY = ('daily', 'everyday', 'every day', 'all days', 'all week', 'all week days')
+
+# Appointments in these states no longer hold their slot.
+INACTIVE_STATUSES = ('cancelled', 'no_show')
+
+_DAY_RANGE = re.compile(r'^(\w+)\s*(?:to|-|–|through|till|until)\s*(\w+)$')
+_TIME = re.compile(r'^(\d{1,2})(?:[:.](\d{2}))?\s*([ap])?\.?\s*m?\.?$')
+_TIME_RANGE_SEPARATOR = re.compile(r'\s*(?:-|–|to)\s*')
+
+
+def _weekday(token):
+    token = token.strip().lower()
+    for index, name in enumerate(WEEKDAYS):
+        if len(token) >= 3 and name.startswith(token):
+            return index
+    raise ValueError(f'Unrecognised day "{token}".')
+
+
+def parse_days(text):
+    """
+    Parse strings such as "Monday to Saturday", "Mon-Fri", "Tuesday, Thursday
+    and Saturday" or "Daily" into a frozenset of weekday numbers (Monday is 0).
+    """
+    text = (text or '').strip().lower()
+    if not text:
+        raise ValueError('No available days given.')
+    if text in EVERY_DAY:
+        return frozenset(range(7))
+
+    days = set()
+    for part in re.split(r'\s*(?:,|&|/|\band\b)\s*', text):
+        if not part:
+            continue
+        match = _DAY_RANGE.match(part)
+        if match:
+            first, last = _weekday(match.group(1)), _weekday(match.group(2))
+            # Ranges may wrap around the week, e.g. "Saturday to Tuesday".
+            span = (last - first) % 7
+            days.update((first + offset) % 7 for offset in range(span + 1))
+        else:
+            days.add(_weekday(part))
+    return frozenset(days)
+
+
+def _parse_time(text):
+    match = _TIME.match(text.strip().lower())
+    if not match:
+        raise ValueError(f'Unrecognised time "{text}".')
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f'Unrecognised time "{text}".')
+        hour = hour % 12 + (12 if meridiem == 'p' else 0)
+    if hour > 23 or minute > 59:
+        raise ValueError(f'Unrecognised time "{text}".')
+    return time(hour, minute)
+
+
+def parse_hours(text):
+    """
+    Parse "9:00 AM - 5:00 PM", "10 AM to 1 PM, 3 PM to 7 PM" or "09:00-17:00"
+    into a sorted list of (start, end) time pairs.
+    """
+    ranges = []
+    for part in (text or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        bounds = _TIME_RANGE_SEPARATOR.split(part)
+        if len(bounds) != 2:
+            raise ValueError(f'Unrecognised hours "{part}".')
+        start, end = _parse_time(bounds[0]), _parse_time(bounds[1])
+        if start >= end:
+            raise ValueError(f'Hours "{part}" end before they start.')
+        ranges.append((start, end))
+    if not ranges:
+        raise ValueError('No consultation hours given.')
+    return sorted(ranges)
+
+
+@dataclass(frozen=True)
+class WorkingSchedule:
+    weekdays: frozenset
+    hours: tuple
+
+    @classmethod
+    def for_practitioner(cls, practitioner):
+        return cls(
+            weekdays=parse_days(practitioner.available_days),
+            hours=tuple(parse_hours(practitioner.consultation_hours)),
+        )
+
+    def working_periods(self, day):
+        """Yield the (start, end) datetimes the practitioner works on ``day``."""
+        if day.weekday() not in self.weekdays:
+            return
+        for start, end in self.hours:
+            yield datetime.combine(day, start), datetime.combine(day, end)
+
+
+class IntervalIndex:
+    """
+    Booked intervals sorted by start time, with a running maximum of end
+    times. An interval [start, end) overlaps a booking iff some booking starts
+    before ``end`` and the latest end among those bookings is after ``start``.
+    Both halves of that test are a binary search plus an array lookup.
+    """
+
+    def __init__(self, intervals=()):
+        intervals = sorted(intervals, key=lambda interval: interval[0])
+        self.starts = [start for start, _end, _key in intervals]
+        self.ends = [end for _start, end, _key in intervals]
+        self.keys = [key for _start, _end, key in intervals]
+        self.max_ends = list(accumulate(self.ends, max))
+
+    def __len__(self):
+        return len(self.starts)
+
+    @classmethod
+    def for_practitioner(cls, practitioner, start_date, end_date, exclude=None):
+        """Load the practitioner's active bookings between two dates (inclusive)."""
+        appointments = Appointment.objects.filter(
+            practitioner=practitioner,
+            appointment_date__range=(start_date, end_date),
+        ).exclude(status__in=INACTIVE_STATUSES)
+        if exclude is not None:
+            appointments = appointments.exclude(pk=exclude)
+        rows = appointments.order_by('appointment_date', 'appointment_time').values_list(
+            'pk', 'appointment_date', 'appointment_time', 'duration_minutes',
+        )
+        return cls(
+            (start, start + timedelta(minutes=duration), pk)
+            for pk, day, at, duration in rows
+            for start in [datetime.combine(day, at)]
+        )
+
+    @classmethod
+    def for_practitioners(cls, practitioners, dates, exclude=()):
+        """
+        Load the active bookings of several practitioners on the given dates
+        with one query, as ``{practitioner_id: IntervalIndex}``.
+        """
+        appointments = Appointment.objects.filter(
+            practitioner__in=practitioners, appointment_date__in=dates,
+        ).exclude(status__in=INACTIVE_STATUSES)
+        if exclude:
+            appointments = appointments.exclude(pk__in=exclude)
+        rows = appointments.values_list(
+            'practitioner_id', 'pk', 'appointment_date', 'appointment_time', 'duration_minutes',
+        )
+        intervals = {}
+        for practitioner_id, pk, day, at, duration in rows:
+            start = datetime.combine(day, at)
+            intervals.setdefault(practitioner_id, []).append((start, start + timedelta(minutes=duration), pk))
+        return {practitioner_id: cls(bookings) for practitioner_id, bookings in intervals.items()}
+
+    def overlaps(self, start, end):
+        position = bisect_left(self.starts, end)
+        return position > 0 and self.max_ends[position - 1] > start
+
+    def conflict(self, start, end):
+        """Return the key of a booking overlapping [start, end), or None."""
+        position = bisect_left(self.starts, end)
+        if position == 0 or self.max_ends[position - 1] <= start:
+            return None
+        for index in range(position - 1, -1, -1):
+            if self.ends[index] > start:
+                return self.keys[index]
+        return None
+
+
+def lock_schedules(practitioners):
+    """
+    Keep other bookings for ``practitioners`` out until the current
+    transaction ends, so that an overlap check and the write relying on it
+    cannot interleave with another booking. Databases with row locks lock the
+    practitioner rows (SELECT ... FOR UPDATE). SQLite locks the whole
+    database instead: with transaction_mode IMMEDIATE (the production profile)
+    BEGIN takes the write lock and bookings queue behind each other; in the
+    default mode a transaction that read before another one wrote fails its
+    own write with "database is locked" rather than commit a stale check.
+    Does nothing outside a transaction.
+    """
+    connection = connections[router.db_for_write(Appointment)]
+    if not connection.in_atomic_block or not connection.features.has_select_for_update:
+        return
+    pks = sorted({practitioner.pk for practitioner in practitioners})
+    list(Practitioner.objects.using(connection.alias).select_for_update().filter(pk__in=pks).values_list('pk'))
+
+
+def find_conflict(practitioner, appointment_date, appointment_time, duration_minutes, exclude=None):
+    """
+    Return the pk of an active appointment overlapping the proposed booking,
+    if any. Call it in the transaction that saves the booking; see
+    lock_schedules().
+    """
+    lock_schedules([practitioner])
+    # A booking from the day before can run past midnight into this one.
+    index = IntervalIndex.for_practitioner(
+        practitioner, appointment_date - timedelta(days=1), appointment_date, exclude=exclude,
+    )
+    start = datetime.combine(appointment_date, appointment_time)
+    return index.conflict(start, start + timedelta(minutes=duration_minutes))
+
+
+def free_slots(practitioner, start_date=None, days=14, duration_minutes=60):
+    """
+    Return ``{date: [time, ...]}`` of bookable start times for the practitioner
+    over ``days`` days from ``start_date``, stepping through each working period
+    in ``duration_minutes`` increments. Raises ValueError if the practitioner's
+    schedule text cannot be parsed.
+    """
+    schedule = WorkingSchedule.for_practitioner(practitioner)
+    now = timezone.localtime().replace(tzinfo=None)
+    start_date = start_date or now.date()
+    end_date = start_date + timedelta(days=days - 1)
+    index = IntervalIndex.for_practitioner(practitioner, start_date - timedelta(days=1), end_date)
+    step = timedelta(minutes=duration_minutes)
+
+    slots = {}
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        for period_start, period_end in schedule.working_periods(day):
+            slot = period_start
+            while slot + step <= period_end:
+                if slot >= now and not index.overlaps(slot, slot + step):
+                    slots.setdefault(day, []).append(slot.time())
+                slot += step
+    return slots
+
+
+def find_conflicts(bookings, exclude=()):
+    """
+    Check a batch of proposed bookings in one pass. ``bookings`` is a list of
+    (key, practitioner, appointment_date, appointment_time, duration_minutes).
+    Loads the stored bookings of the batch's practitioners on the batch's
+    dates with one query, leaving out the appointments whose pks are in
+    ``exclude``, and returns ``{key: (kind, ref)}``:
+    ``('appointment', pk)`` for a clash with a stored appointment,
+    ``('batch', key)`` for a clash with another booking in the same batch.
+    Like find_conflict(), call it in the transaction that saves the bookings.
+    """
+    if not bookings:
+        return {}
+    lock_schedules({practitioner for _key, practitioner, _day, _at, _duration in bookings})
+    by_practitioner = {}
+    dates = set()
+    for key, practitioner, day, at, duration in bookings:
+        start = datetime.combine(day, at)
+        end = start + timedelta(minutes=duration)
+        by_practitioner.setdefault(practitioner, []).append((start, end, key))
+        # Every day the booking covers, and the day before for stored bookings
+        # that run past midnight into it.
+        dates.update(day + timedelta(days=offset) for offset in range(-1, (end.date() - day).days + 1))
+    indexes = IntervalIndex.for_practitioners(by_practitioner, dates, exclude=exclude)
+
+    conflicts = {}
+    for practitioner, intervals in by_practitioner.items():
+        intervals.sort(key=lambda interval: interval[0])
+        index = indexes.get(practitioner.pk, IntervalIndex())
+        latest_end, latest_key = None, None
+        for start, end, key in intervals:
+            existing = index.conflict(start, end)
+            if existing is not None:
+                conflicts[key] = ('appointment', existing)
+            elif latest_end is not None and latest_end > start:
+                conflicts[key] = ('batch', latest_key)
+            if latest_end is None or end > latest_end:
+                latest_end, latest_key = end, key
+    return conflicts
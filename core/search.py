@@ -0,0 +1,235 @@
+"""
+Full-text search over patients and treatment plans.
+
+On SQLite each searchable table has an external-content FTS5 index
+(``<table>_fts``) that stores only the inverted index, not a second copy of
+the text. Triggers on the content table keep it in step with every INSERT,
+UPDATE and DELETE, including the raw and bulk ones that send no signals.
+ensure_search_indexes() creates the indexes and triggers after migrate and
+fills a new index from the existing rows.
+
+search() turns the query text into a prefix match on every word ("ram sha"
+finds "Ram Sharma"). It joins the index to the caller's queryset, so role
+scoping still applies, and orders by bm25 with per-column weights; only a
+query matching a large part of a table that is unscoped, or filtered on its
+own columns alone, is returned newest first, since scoring every match would
+dominate its cost. The
+PatientSearchEntry and TreatmentPlanSearchEntry models map the index tables.
+On other databases, or before the index exists, search() falls back to an
+unranked icontains filter.
+"""
+
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.db import connections
+from django.db.models import F, Func, IntegerField, Q
+from django.db.models.sql import Query
+
+from .models import Patient, PatientSearchEntry, TreatmentPlan, TreatmentPlanSearchEntry
+
+_TERM = re.compile(r'\w+')
+MAX_TERMS = 8
+MIN_PREFIX = 2  # shorter words match whole tokens only
+RANK_MAX_MATCHES = 10000  # unscoped matches above this come newest first, unranked
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    model: type
+    entry_model: type
+    # (field name, bm25 weight); names and contact details outrank free text.
+    fields: tuple
+
+    @property
+    def table(self):
+        return self.model._meta.db_table
+
+    @property
+    def fts_table(self):
+        return self.entry_model._meta.db_table
+
+    @property
+    def triggers(self):
+        return [f'{self.fts_table}_{event}' for event in ('insert', 'delete', 'update')]
+
+    @property
+    def columns(self):
+        return [self.model._meta.get_field(name).column for name, _ in self.fields]
+
+    def create_sql(self):
+        columns = ', '.join(self.columns)
+        pk = self.model._meta.pk.column
+        new = ', '.join(f'new.{column}' for column in self.columns)
+        old = ', '.join(f'old.{column}' for column in self.columns)
+        delete_old = (
+            f"INSERT INTO {self.fts_table} ({self.fts_table}, rowid, {columns}) "
+            f"VALUES ('delete', old.{pk}, {old});"
+        )
+        insert_new = f'INSERT INTO {self.fts_table} (rowid, {columns}) VALUES (new.{pk}, {new});'
+        on_insert, on_delete, on_update = self.triggers
+        return [
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5('
+            f"{columns}, content='{self.table}', content_rowid='{pk}', "
+            f"prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+            f'CREATE TRIGGER IF NOT EXISTS {on_insert} AFTER INSERT ON {self.table} '
+            f'BEGIN {insert_new} END',
+            f'CREATE TRIGGER IF NOT EXISTS {on_delete} AFTER DELETE ON {self.table} '
+            f'BEGIN {delete_old} END',
+            f'CREATE TRIGGER IF NOT EXISTS {on_update} AFTER UPDATE OF {columns} ON {self.table} '
+            f'BEGIN {delete_old} {insert_new} END',
+        ]
+
+    def rank_sql(self):
+        weights = ', '.join(str(float(weight)) for _, weight in self.fields)
+        return f"INSERT INTO {self.fts_table} ({self.fts_table}, rank) VALUES ('rank', 'bm25({weights})')"
+
+
+INDEXES = {
+    Patient: SearchIndex(Patient, PatientSearchEntry, (
+        ('first_name', 10), ('last_name', 10), ('phone', 5), ('email', 5),
+        ('prakriti', 2), ('medical_history', 1),
+    )),
+    TreatmentPlan: SearchIndex(TreatmentPlan, TreatmentPlanSearchEntry, (
+        ('title', 5), ('primary_diagnosis', 5), ('description', 1),
+    )),
+}
+
+
+def _table_exists(cursor, name):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [name])
+    return cursor.fetchone() is not None
+
+
+def ensure_search_indexes(using='default', log=None):
+    """Create missing indexes and triggers; new indexes are built from the existing rows."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for index in INDEXES.values():
+            if not _table_exists(cursor, index.table):
+                continue
+            created = not _table_exists(cursor, index.fts_table)
+            for statement in index.create_sql():
+                cursor.execute(statement)
+            if created:
+                cursor.execute(index.rank_sql())
+                rebuild_search_index(index, using=using, log=log)
+
+
+def rebuild_search_index(index, using='default', log=None):
+    """Re-read every row of the content table into the index, then merge its segments."""
+    started = time.perf_counter()
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"INSERT INTO {index.fts_table} ({index.fts_table}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {index.fts_table} ({index.fts_table}) VALUES ('optimize')")
+    if log:
+        log(f'Indexed {index.table} for search in {time.perf_counter() - started:.1f}s.')
+
+
+@contextmanager
+def deferred_search_indexing(using='default', log=None):
+    """
+    Drop the sync triggers around a bulk load and rebuild the indexes after
+    it, which is several times faster than updating them row by row. Rows
+    other connections write in the meantime are picked up by the rebuild.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        existing = [index for index in INDEXES.values() if _table_exists(cursor, index.fts_table)]
+        for index in existing:
+            for trigger in index.triggers:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    try:
+        yield
+    finally:
+        ensure_search_indexes(using, log=log)
+        for index in existing:
+            rebuild_search_index(index, using=using, log=log)
+
+
+def match_expression(text):
+    """'Ram  Sh!' -> '"ram"* "sh"*': every word must match, words of two or more characters as prefixes."""
+    terms = _TERM.findall(text.lower())[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' if len(term) >= MIN_PREFIX else f'"{term}"' for term in terms)
+
+
+def _index_ready(connection, index):
+    # Cached per connection once found, so only a database that has not been
+    # migrated yet pays for the lookup on every search.
+    ready = getattr(connection, '_search_indexes_ready', set())
+    if index.fts_table not in ready:
+        with connection.cursor() as cursor:
+            if not _table_exists(cursor, index.fts_table):
+                return False
+        connection._search_indexes_ready = ready | {index.fts_table}
+    return True
+
+
+def _filters_own_columns(queryset):
+    """Whether the queryset's filters only test columns of its own table (no joins or subqueries)."""
+    query = queryset.query
+    if sum(1 for alias in query.alias_map if query.alias_refcount[alias]) != 1:
+        return False
+    nodes = [query.where]
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, Query):
+            return False
+        nodes.extend(getattr(node, 'children', ()))
+        if hasattr(node, 'get_source_expressions'):
+            nodes.extend(node.get_source_expressions())
+    return True
+
+
+class Unpushed(Func):
+    """
+    ``+column``: the same value, but SQLite no longer hands constraints on it to
+    the FTS5 table. An IN list on the index rowid would otherwise run the MATCH
+    again for every value in it.
+    """
+    template = '+%(expressions)s'
+
+
+def search(queryset, text):
+    """
+    Filter ``queryset`` to rows matching ``text``, best matches first, with
+    the bm25 score as ``search_rank``. Searches matching more than
+    RANK_MAX_MATCHES rows come newest first (``search_rowid``) instead, unless
+    the queryset is scoped through another table or a subquery.
+    """
+    index = INDEXES[queryset.model]
+    expression = match_expression(text)
+    if not expression:
+        return queryset.none()
+    connection = connections[queryset.db]
+    if connection.vendor != 'sqlite' or not _index_ready(connection, index):
+        condition = Q()
+        for term in _TERM.findall(text)[:MAX_TERMS]:
+            condition &= Q.create([(f'{name}__icontains', term) for name, _ in index.fields], connector=Q.OR)
+        return queryset.filter(condition)
+
+    if queryset.query.where and not _filters_own_columns(queryset):
+        # Scoped through a join or subquery: the scope becomes a list of ids
+        # checked as index rows are read, and is the only other condition, so
+        # SQLite always drives the query from the MATCH. With the scope's own
+        # filters left in, it may start from the few scoped rows instead and
+        # run the whole MATCH again for each of them.
+        matches = queryset.model._default_manager.alias(
+            search_scope=Unpushed(F('search_entry__pk'), output_field=IntegerField()),
+        ).filter(search_entry__document__match=expression, search_scope__in=queryset.values('pk'))
+        matches.query.select_related = queryset.query.select_related
+    else:
+        matches = queryset.filter(search_entry__document__match=expression)
+        match_count = index.entry_model.objects.using(queryset.db).filter(document__match=expression).count()
+        if match_count > RANK_MAX_MATCHES:
+            # Scoring this many rows takes longer than the page is worth; the
+            # index returns them newest first without sorting.
+            return matches.annotate(search_rowid=F('search_entry__pk')).order_by('-search_rowid')
+    return matches.annotate(search_rank=F('search_entry__rank')).order_by('search_rank', 'pk')
@@ -1,24 +1,177 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
 from rest_framework import serializers
-from .models import Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback
+from .models import (
+    Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback,
+    PractitionerFeedbackSummary, TreatmentPlanFeedbackSummary,
+)
+from .scheduling import find_conflict, find_conflicts, INACTIVE_STATUSES
 
-class PatientSerializer(serializers.ModelSerializer):
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves primary keys from the objects a BulkListSerializer pre-loaded for
+    the whole batch, falling back to one query per value otherwise.
+    """
+
+    def to_internal_value(self, data):
+        cache = getattr(self.root, 'related_cache', {}).get(self.field_name)
+        if cache is None:
+            return super().to_internal_value(data)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in cache:
+            self.fail('does_not_exist', pk_value=data)
+        return cache[pk]
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    Validates a list in one pass: every related object referenced by the batch
+    is loaded with one in_bulk() per field before the items are validated, and
+    the validated items are written with a single bulk_create().
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.related_cache = self.load_related(data)
+        return super().to_internal_value(data)
+
+    def load_related(self, data):
+        cache = {}
+        for name, field in self.child.fields.items():
+            if not isinstance(field, CachedPrimaryKeyRelatedField) or field.read_only:
+                continue
+            pk_field = field.get_queryset().model._meta.pk
+            pks = set()
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                try:
+                    pks.add(pk_field.to_python(value))
+                except (TypeError, ValueError, DjangoValidationError):
+                    pass
+            pks.discard(None)
+            cache[name] = field.get_queryset().in_bulk(pks) if pks else {}
+        return cache
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return model.objects.bulk_create([model(**attrs) for attrs in validated_data])
+
+class AppointmentListSerializer(BulkListSerializer):
+
+    def to_internal_value(self, data):
+        # Runs after every item validated on its own, and raises per-item errors
+        # (ListSerializer.validate() would fold them into non_field_errors).
+        attrs = super().to_internal_value(data)
+        default_duration = Appointment._meta.get_field('duration_minutes').default
+        conflicts = find_conflicts([
+            (index, item['practitioner'], item['appointment_date'], item['appointment_time'],
+             item.get('duration_minutes') or default_duration)
+            for index, item in enumerate(attrs)
+            if item.get('status') not in INACTIVE_STATUSES
+        ])
+        if conflicts:
+            errors = [{} for _ in attrs]
+            for index, (kind, ref) in conflicts.items():
+                practitioner = attrs[index]['practitioner']
+                if kind == 'appointment':
+                    message = f"{practitioner} already has appointment {ref} at this time."
+                else:
+                    message = f"Overlaps item {ref} of this batch for {practitioner}."
+                errors[index] = {"appointment_time": [message]}
+            raise serializers.ValidationError(errors)
+        return attrs
+
+class SparseFieldsetMixin:
+    """
+    Accepts ``fields`` / ``omit`` keyword arguments that drop fields from the
+    output. Meta.list_fields is the compact set list views render by default,
+    and Meta.field_columns names the model columns behind fields that are not
+    plain model fields, so views can defer every other column.
+    """
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        unknown = set(fields or ()) | set(omit or ())
+        unknown -= set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({"fields": [f"Unknown field(s): {', '.join(sorted(unknown))}."]})
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+    def model_columns(self):
+        """
+        Columns needed to render the remaining fields, or None if some field's
+        columns are unknown (the queryset should then be left unpruned).
+        """
+        model = self.Meta.model
+        field_columns = getattr(self.Meta, 'field_columns', {})
+        columns = set()
+        for name, field in self.fields.items():
+            if name in field_columns:
+                columns.update(field_columns[name])
+                continue
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete:
+                return None
+            if model_field.is_relation and not isinstance(field, serializers.PrimaryKeyRelatedField):
+                return None
+            columns.add(model_field.name)
+        return columns
+
+NAME_COLUMNS = {
+    'patient_name': ('patient__first_name', 'patient__last_name'),
+    'practitioner_name': ('practitioner__first_name', 'practitioner__last_name'),
+}
+
+class PatientSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Patient
         fields = '__all__'
         read_only_fields = ('created_at', 'updated_at')
+        list_fields = (
+            'id', 'first_name', 'last_name', 'date_of_birth', 'gender', 'phone', 'email',
+            'prakriti', 'status', 'created_at',
+        )
+
+
+class PatientImportSerializer(PatientSerializer):
+    """
+    A patient row of a bulk import (core/imports.py). There is no user field;
+    the import creates the account. Phone and email are not checked with a query
+    per row; the import checks them with one set lookup per batch.
+    """
+
+    class Meta(PatientSerializer.Meta):
+        fields = None
+        exclude = ('user',)
+        extra_kwargs = {'phone': {'validators': []}, 'email': {'validators': []}}
+        list_serializer_class = BulkListSerializer
+
 
-class PractitionerSerializer(serializers.ModelSerializer):
+class PractitionerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
 
     class Meta:
         model = Practitioner
         fields = '__all__'
         read_only_fields = ('created_at', 'updated_at')
+        list_fields = (
+            'id', 'full_name', 'first_name', 'last_name', 'specialization', 'phone', 'email',
+            'consultation_fee', 'available_days', 'consultation_hours', 'status', 'created_at',
+        )
+        field_columns = {'full_name': ('first_name', 'last_name')}
 
     def get_full_name(self, obj):
         return f"Dr. {obj.first_name} {obj.last_name}"
 
-class TreatmentPlanSerializer(serializers.ModelSerializer):
+class TreatmentPlanSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     patient_name = serializers.StringRelatedField(source='patient')
     practitioner_name = serializers.StringRelatedField(source='practitioner')
     remaining_amount = serializers.ReadOnlyField()
@@ -27,8 +180,15 @@ class TreatmentPlanSerializer(serializers.ModelSerializer):
         model = TreatmentPlan
         fields = '__all__'
         read_only_fields = ('created_at', 'updated_at', 'remaining_amount')
+        list_fields = (
+            'id', 'patient', 'patient_name', 'practitioner', 'practitioner_name', 'title',
+            'treatment_type', 'start_date', 'end_date', 'total_sessions', 'completed_sessions',
+            'total_cost', 'paid_amount', 'remaining_amount', 'status', 'created_at',
+        )
+        field_columns = {**NAME_COLUMNS, 'remaining_amount': ('total_cost', 'paid_amount')}
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    serializer_related_field = CachedPrimaryKeyRelatedField
     patient_name = serializers.StringRelatedField(source='patient')
     practitioner_name = serializers.StringRelatedField(source='practitioner')
 
@@ -36,21 +196,106 @@ class AppointmentSerializer(serializers.ModelSerializer):
         model = Appointment
         fields = '__all__'
         read_only_fields = ('created_at', 'updated_at')
+        list_serializer_class = AppointmentListSerializer
+        field_columns = NAME_COLUMNS
 
-class NotificationSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        def current(field):
+            return attrs.get(field, getattr(self.instance, field, None))
+
+        practitioner = current('practitioner')
+        appointment_date = current('appointment_date')
+        appointment_time = current('appointment_time')
+        duration = current('duration_minutes') or Appointment._meta.get_field('duration_minutes').default
+        if current('status') in INACTIVE_STATUSES or None in (practitioner, appointment_date, appointment_time):
+            return attrs
+        if isinstance(self.parent, serializers.ListSerializer):
+            # AppointmentListSerializer checks the whole batch at once.
+            return attrs
+
+        conflict = find_conflict(
+            practitioner, appointment_date, appointment_time, duration,
+            exclude=self.instance.pk if self.instance else None,
+        )
+        if conflict is not None:
+            raise serializers.ValidationError(
+                {"appointment_time": f"{practitioner} already has appointment {conflict} at this time."}
+            )
+        return attrs
+
+class NotificationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     patient_name = serializers.StringRelatedField(source='patient')
     practitioner_name = serializers.StringRelatedField(source='practitioner')
 
     class Meta:
         model = Notification
-        fields = '__all__'
+        # The dispatcher's claim on the row is internal to core.dispatch.
+        exclude = ('claim_token', 'claimed_at')
         read_only_fields = ('created_at', 'updated_at')
+        field_columns = NAME_COLUMNS
 
-class FeedbackSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        def current(field):
+            return attrs.get(field, getattr(self.instance, field, None))
+
+        # The unique_appointment_reminder constraint, reported as a field error
+        # instead of an IntegrityError.
+        appointment = current('appointment')
+        if appointment is not None and current('notification_type') == 'appointment_reminder':
+            reminders = Notification.objects.filter(appointment=appointment, notification_type='appointment_reminder')
+            if self.instance is not None:
+                reminders = reminders.exclude(pk=self.instance.pk)
+            if reminders.exists():
+                raise serializers.ValidationError({"appointment": "This appointment already has a reminder."})
+        return attrs
+
+class FeedbackSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     patient_name = serializers.StringRelatedField(source='patient')
     practitioner_name = serializers.StringRelatedField(source='practitioner')
 
     class Meta:
         model = Feedback
         fields = '__all__'
-        read_only_fields = ('created_at', 'updated_at')
\ No newline at end of file
+        read_only_fields = ('created_at', 'updated_at')
+        field_columns = NAME_COLUMNS
+
+class FeedbackSummarySerializer(serializers.ModelSerializer):
+    """ Read-only view of a FeedbackSummary row: averages, histogram and counts """
+    average_rating = serializers.FloatField(read_only=True)
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    score_averages = serializers.DictField(child=serializers.FloatField(allow_null=True), read_only=True)
+    would_recommend_rate = serializers.FloatField(read_only=True)
+
+    class Meta:
+        fields = (
+            'feedback_count', 'average_rating', 'rating_histogram', 'score_averages',
+            'would_recommend_count', 'would_recommend_rate', 'updated_at',
+        )
+        read_only_fields = fields
+
+class PractitionerFeedbackSummarySerializer(FeedbackSummarySerializer):
+    practitioner_name = serializers.StringRelatedField(source='practitioner')
+
+    class Meta(FeedbackSummarySerializer.Meta):
+        model = PractitionerFeedbackSummary
+        fields = ('practitioner', 'practitioner_name', *FeedbackSummarySerializer.Meta.fields)
+        read_only_fields = fields
+
+class TreatmentPlanFeedbackSummarySerializer(FeedbackSummarySerializer):
+
+    class Meta(FeedbackSummarySerializer.Meta):
+        model = TreatmentPlanFeedbackSummary
+        fields = ('treatment_plan', *FeedbackSummarySerializer.Meta.fields)
+        read_only_fields = fields
+
+class OutstandingBalanceSerializer(serializers.Serializer):
+    """ One group of the outstanding-balance report; only the grouped-by keys are present """
+    practitioner = serializers.IntegerField(source='group_practitioner', required=False)
+    practitioner_name = serializers.CharField(required=False)
+    month = serializers.CharField(source='group_month', required=False)
+    patient = serializers.IntegerField(source='group_patient', required=False)
+    patient_name = serializers.CharField(required=False)
+    plans = serializers.IntegerField()
+    total_cost = serializers.DecimalField(max_digits=16, decimal_places=2, source='billed')
+    paid_amount = serializers.DecimalField(max_digits=16, decimal_places=2, source='paid')
+    remaining_amount = serializers.DecimalField(max_digits=16, decimal_places=2, source='outstanding')
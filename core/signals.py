@@ -0,0 +1,99 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback
+from .care import add_care_relationships, prune_care_relationships
+from .feedback_summary import apply_feedback_change
+from .search import ensure_search_indexes
+from .versions import ensure_table_versions
+from .stats import invalidate_dashboard_stats
+
+
+def _affected_user_ids(instance):
+    """Return the user ids whose dashboards include ``instance``."""
+    if isinstance(instance, (Patient, Practitioner)):
+        return [instance.user_id]
+    user_ids = []
+    for relation in ('patient', 'practitioner'):
+        try:
+            related = getattr(instance, relation)
+        except ObjectDoesNotExist:
+            # The parent row is already gone during a cascading delete.
+            continue
+        if related is not None:
+            user_ids.append(related.user_id)
+    return user_ids
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_save, sender=Practitioner)
+@receiver(post_save, sender=TreatmentPlan)
+@receiver(post_save, sender=Appointment)
+@receiver(post_save, sender=Notification)
+@receiver(post_save, sender=Feedback)
+@receiver(post_delete, sender=Patient)
+@receiver(post_delete, sender=Practitioner)
+@receiver(post_delete, sender=TreatmentPlan)
+@receiver(post_delete, sender=Appointment)
+@receiver(post_delete, sender=Notification)
+@receiver(post_delete, sender=Feedback)
+def invalidate_dashboard_stats_on_change(sender, instance, **kwargs):
+    invalidate_dashboard_stats(_affected_user_ids(instance))
+
+
+@receiver(pre_save, sender=TreatmentPlan)
+@receiver(pre_save, sender=Appointment)
+def remember_care_pair(sender, instance, **kwargs):
+    instance._previous_care_pair = None
+    if not instance._state.adding and instance.pk is not None:
+        instance._previous_care_pair = (
+            sender.objects.filter(pk=instance.pk).values_list('practitioner_id', 'patient_id').first()
+        )
+
+
+@receiver(post_save, sender=TreatmentPlan)
+@receiver(post_save, sender=Appointment)
+def update_care_relationships(sender, instance, **kwargs):
+    pair = (instance.practitioner_id, instance.patient_id)
+    add_care_relationships([pair])
+    previous = getattr(instance, '_previous_care_pair', None)
+    if previous is not None and previous != pair:
+        prune_care_relationships([previous])
+
+
+@receiver(post_delete, sender=TreatmentPlan)
+@receiver(post_delete, sender=Appointment)
+def prune_care_relationships_on_delete(sender, instance, **kwargs):
+    prune_care_relationships([(instance.practitioner_id, instance.patient_id)])
+
+
+@receiver(pre_save, sender=Feedback)
+def remember_feedback(sender, instance, **kwargs):
+    instance._previous_feedback = None
+    if not instance._state.adding and instance.pk is not None:
+        instance._previous_feedback = sender.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Feedback)
+def update_feedback_summaries(sender, instance, **kwargs):
+    apply_feedback_change(old=getattr(instance, '_previous_feedback', None), new=instance)
+
+
+@receiver(post_delete, sender=Feedback)
+def update_feedback_summaries_on_delete(sender, instance, **kwargs):
+    apply_feedback_change(old=instance)
+
+
+@receiver(post_migrate)
+def create_search_indexes(sender, using, **kwargs):
+    # The FTS5 tables and their triggers are not models syncdb can create.
+    if sender.label == 'core':
+        ensure_search_indexes(using)
+
+
+@receiver(post_migrate)
+def create_table_version_triggers(sender, using, **kwargs):
+    # Triggers, like the FTS5 ones, are not something syncdb creates.
+    if sender.label == 'core':
+        ensure_table_versions(using)
@@ -0,0 +1,206 @@
+"""
+Concurrent write stress test for the SQLite connection profiles.
+
+Each profile gets a fresh database file and its own connection alias. Writer
+threads then run request-sized transactions against it for a fixed time:
+read an account balance, update it and append an event row, all inside one
+atomic() block, the read-then-write shape most of our views have. Reader
+threads meanwhile run aggregate queries over the event table. After every
+unit of work a thread does what request_finished does, so a profile with
+CONN_MAX_AGE=0 reconnects for every "request" and a persistent one does not.
+
+Failed transactions ("database is locked") are counted, not retried, since
+a request that hits one returns a 500.
+"""
+
+import random
+import threading
+import time
+from statistics import median
+
+from django.db import OperationalError, connections, transaction
+
+ACCOUNTS = 100
+
+SCHEMA = [
+    'CREATE TABLE stress_account (id INTEGER PRIMARY KEY, balance INTEGER NOT NULL)',
+    'CREATE TABLE stress_event ('
+    'id INTEGER PRIMARY KEY AUTOINCREMENT, account_id INTEGER NOT NULL, '
+    'worker INTEGER NOT NULL, created REAL NOT NULL, payload TEXT NOT NULL)',
+    'CREATE INDEX stress_event_account ON stress_event (account_id)',
+]
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class StressRun:
+    """Hammer one database alias with writer and reader threads."""
+
+    def __init__(self, alias, writers=8, readers=4, seconds=5.0, seed=0):
+        self.alias = alias
+        self.writers = writers
+        self.readers = readers
+        self.seconds = seconds
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.write_latencies = []
+        self.reads = 0
+        self.failed_writes = 0
+        self.failed_reads = 0
+        self.errors = {}
+        self.deadline = 0.0
+
+    def setup(self):
+        connection = connections[self.alias]
+        with connection.cursor() as cursor:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            cursor.executemany(
+                'INSERT INTO stress_account (id, balance) VALUES (%s, 0)',
+                [(i,) for i in range(1, ACCOUNTS + 1)],
+            )
+        connection.close()
+
+    def _finish_request(self):
+        # What django.db.close_old_connections does on request_finished.
+        connections[self.alias].close_if_unusable_or_obsolete()
+
+    def _failed(self, exc, kind):
+        with self.lock:
+            if kind == 'write':
+                self.failed_writes += 1
+            else:
+                self.failed_reads += 1
+            message = str(exc)
+            self.errors[message] = self.errors.get(message, 0) + 1
+
+    def _write(self, worker, rng):
+        account = rng.randint(1, ACCOUNTS)
+        with transaction.atomic(using=self.alias):
+            with connections[self.alias].cursor() as cursor:
+                cursor.execute('SELECT balance FROM stress_account WHERE id = %s', [account])
+                balance = cursor.fetchone()[0]
+                cursor.execute(
+                    'UPDATE stress_account SET balance = %s WHERE id = %s', [balance + 1, account]
+                )
+                cursor.execute(
+                    'INSERT INTO stress_event (account_id, worker, created, payload) '
+                    'VALUES (%s, %s, %s, %s)',
+                    [account, worker, time.time(), 'x' * rng.randint(50, 500)],
+                )
+
+    def _read(self, rng):
+        first = rng.randint(1, ACCOUNTS)
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute(
+                'SELECT account_id, COUNT(*), SUM(LENGTH(payload)) FROM stress_event '
+                'WHERE account_id BETWEEN %s AND %s GROUP BY account_id',
+                [first, first + 10],
+            )
+            cursor.fetchall()
+
+    def _writer(self, worker, start):
+        rng = random.Random(self.seed * 1000 + worker)
+        latencies = []
+        start.wait()
+        try:
+            while time.monotonic() < self.deadline:
+                began = time.perf_counter()
+                try:
+                    self._write(worker, rng)
+                except OperationalError as exc:
+                    self._failed(exc, 'write')
+                else:
+                    latencies.append(time.perf_counter() - began)
+                self._finish_request()
+        finally:
+            connections[self.alias].close()
+            with self.lock:
+                self.write_latencies.extend(latencies)
+
+    def _reader(self, worker, start):
+        rng = random.Random(self.seed * 1000 + self.writers + worker)
+        reads = 0
+        start.wait()
+        try:
+            while time.monotonic() < self.deadline:
+                try:
+                    self._read(rng)
+                except OperationalError as exc:
+                    self._failed(exc, 'read')
+                else:
+                    reads += 1
+                self._finish_request()
+        finally:
+            connections[self.alias].close()
+            with self.lock:
+                self.reads += reads
+
+    def run(self):
+        start = threading.Event()
+        threads = [
+            threading.Thread(target=self._writer, args=(i, start), daemon=True)
+            for i in range(self.writers)
+        ] + [
+            threading.Thread(target=self._reader, args=(i, start), daemon=True)
+            for i in range(self.readers)
+        ]
+        for thread in threads:
+            thread.start()
+        began = time.perf_counter()
+        self.deadline = time.monotonic() + self.seconds
+        start.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+        return self.summary(elapsed)
+
+    def check(self):
+        """Every committed write bumped exactly one balance and added one event."""
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('SELECT SUM(balance) FROM stress_account')
+            balances = cursor.fetchone()[0]
+            cursor.execute('SELECT COUNT(*) FROM stress_event')
+            events = cursor.fetchone()[0]
+        connections[self.alias].close()
+        return balances == events == len(self.write_latencies)
+
+    def summary(self, elapsed):
+        latencies_ms = [latency * 1000 for latency in self.write_latencies]
+        return {
+            'seconds': round(elapsed, 2),
+            'writers': self.writers,
+            'readers': self.readers,
+            'writes': len(latencies_ms),
+            'writes_per_second': round(len(latencies_ms) / elapsed, 1),
+            'failed_writes': self.failed_writes,
+            'reads_per_second': round(self.reads / elapsed, 1),
+            'failed_reads': self.failed_reads,
+            'write_p50_ms': round(median(latencies_ms), 2) if latencies_ms else 0.0,
+            'write_p95_ms': round(percentile(latencies_ms, 0.95), 2),
+            'write_max_ms': round(max(latencies_ms, default=0.0), 2),
+            'errors': dict(self.errors),
+            'consistent': self.check(),
+        }
+
+
+def run_profile(name, database, path, **options):
+    """Stress a fresh database at ``path`` configured like ``database``."""
+    alias = f'sqlite_stress_{name}'
+    connections.settings[alias] = connections.configure_settings({
+        'default': connections.settings['default'],
+        alias: {**database, 'NAME': str(path), 'TEST': {}},
+    })[alias]
+    try:
+        stress = StressRun(alias, **options)
+        stress.setup()
+        return stress.run()
+    finally:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
@@ -0,0 +1,125 @@
+"""
+Role-scoped dashboard statistics.
+
+Every figure for a model is computed in a single aggregate query, and the whole
+payload is cached per user for DASHBOARD_STATS_CACHE_TIMEOUT seconds. The
+signal handlers in core.signals drop the cached payloads that a write affects.
+The payloads live in the 'shared' cache, so an invalidation in one worker
+reaches all of them.
+"""
+
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+from .models import (
+    Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback, CareRelationship,
+    PractitionerFeedbackSummary,
+)
+
+CACHE_ALIAS = 'shared'
+CACHE_KEY = 'dashboard-stats:{version}:{user_id}'
+ADMIN_VERSION_KEY = 'dashboard-stats:admin-version'
+
+
+def get_dashboard_stats(user):
+    cache = caches[CACHE_ALIAS]
+    key = _cache_key(user)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(user)
+        cache.set(key, stats, getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 60))
+    return stats
+
+
+def invalidate_dashboard_stats(user_ids=()):
+    """
+    Drop the cached stats for ``user_ids`` and for every admin. Admin payloads
+    cover the whole clinic, so they are invalidated by moving them to a new
+    cache-key version rather than by enumerating admin users.
+    """
+    cache = caches[CACHE_ALIAS]
+    cache.set(ADMIN_VERSION_KEY, time.time_ns(), None)
+    keys = [CACHE_KEY.format(version=0, user_id=user_id) for user_id in user_ids if user_id]
+    if keys:
+        cache.delete_many(keys)
+
+
+def _cache_key(user):
+    version = caches[CACHE_ALIAS].get(ADMIN_VERSION_KEY, 0) if user.is_admin else 0
+    return CACHE_KEY.format(version=version, user_id=user.pk)
+
+
+def _scoped(queryset, user):
+    if user.is_admin:
+        return queryset
+    elif user.is_doctor:
+        return queryset.filter(practitioner__user=user)
+    else:
+        return queryset.filter(patient__user=user)
+
+
+def compute_dashboard_stats(user):
+    today = timezone.localdate()
+    stats = {}
+
+    if user.is_admin:
+        stats['patients'] = Patient.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='Active')),
+        )
+        stats['practitioners'] = Practitioner.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='Active')),
+        )
+
+    plans = _scoped(TreatmentPlan.objects.all(), user).aggregate(
+        total=Count('id'),
+        draft=Count('id', filter=Q(status='draft')),
+        active=Count('id', filter=Q(status='active')),
+        completed=Count('id', filter=Q(status='completed')),
+        cancelled=Count('id', filter=Q(status='cancelled')),
+        total_cost=Sum('total_cost', default=Decimal('0')),
+        paid_amount=Sum('paid_amount', default=Decimal('0')),
+    )
+    plans['remaining_amount'] = plans['total_cost'] - plans['paid_amount']
+    if user.is_doctor:
+        stats['patients'] = {'total': CareRelationship.objects.filter(practitioner__user=user).count()}
+    stats['treatment_plans'] = plans
+
+    stats['appointments'] = _scoped(Appointment.objects.all(), user).aggregate(
+        total=Count('id'),
+        today=Count('id', filter=Q(appointment_date=today)),
+        upcoming=Count('id', filter=Q(appointment_date__gte=today, status__in=['scheduled', 'confirmed'])),
+        completed=Count('id', filter=Q(status='completed')),
+        cancelled=Count('id', filter=Q(status='cancelled')),
+        no_show=Count('id', filter=Q(status='no_show')),
+    )
+    stats['notifications'] = _scoped(Notification.objects.all(), user).aggregate(
+        total=Count('id'),
+        unread=Count('id', filter=Q(status='unread')),
+    )
+    if user.is_admin or user.is_doctor:
+        # Every feedback names a practitioner, so the running totals kept by
+        # core.feedback_summary cover it without reading feedback rows.
+        totals = _scoped(PractitionerFeedbackSummary.objects.all(), user).aggregate(
+            total=Sum('feedback_count', default=0),
+            rating_sum=Sum('rating_sum', default=0),
+            would_recommend=Sum('would_recommend_count', default=0),
+        )
+        stats['feedback'] = {
+            'total': totals['total'],
+            'average_rating': totals['rating_sum'] / totals['total'] if totals['total'] else None,
+            'would_recommend': totals['would_recommend'],
+        }
+    else:
+        stats['feedback'] = _scoped(Feedback.objects.all(), user).aggregate(
+            total=Count('id'),
+            average_rating=Avg('rating'),
+            would_recommend=Count('id', filter=Q(would_recommend=True)),
+        )
+    return stats
@@ -0,0 +1,405 @@
+"""
+Reproducible synthetic datasets at production scale.
+
+Every value is drawn from a ``random.Random(seed)``, so the same arguments and
+anchor date always produce the same rows. Primary keys are assigned up front
+(continuing after the current maximum), so every table is written with batched
+executemany() INSERTs without reading ids back; building model instances and
+compiling them through bulk_create() costs several times more than the INSERT
+itself at this volume. created_at/updated_at are spread over the simulated
+history instead of all being "now".
+
+Each practitioner works Monday to Saturday, 9 AM to 5 PM, in one-hour slots,
+and never has two appointments in the same slot. Patients belong to one
+practitioner, whose plans and appointments they appear in.
+
+The raw INSERTs send no signals, so generate() rebuilds the care-relationship
+table and the feedback summaries and drops cached dashboard stats itself. When the load is most of the
+patient table, it also drops the full-text search triggers while patients and
+plans are written and rebuilds the search indexes afterwards.
+"""
+
+import random
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .bulk_insert import insert_rows
+from .care import rebuild_care_relationships
+from .feedback_summary import rebuild_feedback_summaries
+from .models import Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback
+from .search import deferred_search_indexing
+from .stats import invalidate_dashboard_stats
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Amit', 'Ananya', 'Arjun', 'Deepa', 'Divya', 'Gaurav', 'Isha', 'Kavya',
+    'Kiran', 'Lakshmi', 'Manish', 'Meera', 'Neha', 'Nikhil', 'Pooja', 'Priya', 'Rahul', 'Raj',
+    'Ravi', 'Rohan', 'Sanjay', 'Seema', 'Shreya', 'Sneha', 'Sunita', 'Suresh', 'Vikram', 'Vivek',
+]
+LAST_NAMES = [
+    'Agarwal', 'Bhat', 'Chopra', 'Das', 'Desai', 'Gupta', 'Iyer', 'Joshi', 'Kapoor', 'Kumar',
+    'Menon', 'Mishra', 'Nair', 'Patel', 'Pillai', 'Rao', 'Reddy', 'Sharma', 'Singh', 'Verma',
+]
+CITIES = [
+    'Chandigarh', 'Ludhiana', 'Patiala', 'Amritsar', 'Jaipur', 'Pune', 'Kochi', 'Mysuru',
+    'Varanasi', 'Dehradun', 'Bhopal', 'Nagpur',
+]
+PRAKRITI = ['Vata', 'Pitta', 'Kapha', 'Vata-Pitta', 'Pitta-Kapha', 'Vata-Kapha']
+SPECIALIZATIONS = [
+    'Panchakarma Specialist', 'Rejuvenation Therapy', 'Herbal Medicine', 'Kayachikitsa',
+    'Shalya Tantra', 'Ayurvedic Dietetics',
+]
+QUALIFICATIONS = ['BAMS', 'BAMS, MD (Ayurveda)', 'BAMS, PhD (Ayurveda)', 'BAMS, MS (Ayurveda)']
+TREATMENTS = [
+    ('Panchakarma', 'Panchakarma Detox', 'Ama accumulation'),
+    ('Rasayana', 'Rejuvenation Program', 'Ojas depletion'),
+    ('Virechana', 'Pitta Cleanse', 'Pitta aggravation'),
+    ('Basti', 'Vata Balancing', 'Chronic back pain'),
+    ('Nasya', 'Sinus Therapy', 'Chronic sinusitis'),
+    ('Abhyanga', 'Stress Relief', 'Anxiety and insomnia'),
+]
+APPOINTMENT_TYPES = ['Consultation', 'Follow-up', 'Therapy Session', 'Panchakarma Session']
+FEEDBACK_TITLES = {
+    1: 'Disappointing', 2: 'Below expectations', 3: 'Mixed experience',
+    4: 'Good progress', 5: 'Excellent care',
+}
+SLOTS_PER_DAY = 8  # 9 AM to 5 PM in one-hour slots
+WORKING_DAYS_PER_WEEK = 6  # Monday to Saturday
+SQLITE_CACHE_KIB = 256 * 1024
+
+
+@dataclass
+class Scale:
+    practitioners: int = 50
+    patients: int = 5000
+    plans: int = None  # defaults to one per patient
+    appointments: int = 50000
+    notifications: int = None  # defaults to a reminder for every fifth appointment
+    feedback: int = None  # defaults to one per five patients
+
+    def __post_init__(self):
+        if self.practitioners < 1 or self.patients < 1:
+            raise ValueError('At least one practitioner and one patient are needed.')
+        if self.plans is None:
+            self.plans = self.patients
+        if self.notifications is None:
+            self.notifications = self.appointments // 5
+        if self.feedback is None:
+            self.feedback = self.patients // 5
+        self.notifications = min(self.notifications, self.appointments)
+
+
+def _next_id(model):
+    return (model.objects.aggregate(highest=Max('pk'))['highest'] or 0) + 1
+
+
+class SyntheticDataGenerator:
+
+    def __init__(self, scale, seed=0, batch_size=5000, prefix='syn', password='password',
+                 anchor=None, log=None):
+        self.scale = scale
+        self.seed = seed
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.password = password
+        self.anchor = anchor or timezone.localdate()
+        self.log = log or (lambda message: None)
+        self.random = random.Random(seed)
+        self.timezone = timezone.get_default_timezone()
+        self.now = timezone.now()
+        self.counts = {}
+
+    def generate(self):
+        """Write the whole dataset and return the number of rows per model."""
+        User = get_user_model()
+        self.ids = {
+            model: _next_id(model)
+            for model in (User, Practitioner, Patient, TreatmentPlan, Appointment, Notification, Feedback)
+        }
+        self._write(User, self.users())
+        self._write(Practitioner, self.practitioners())
+        # One index rebuild beats per-row trigger updates unless the table
+        # already holds more rows than this load adds.
+        if self.scale.patients >= self.ids[Patient] - 1:
+            indexing = deferred_search_indexing(router.db_for_write(Patient), log=self.log)
+        else:
+            indexing = nullcontext()
+        with indexing:
+            self._write(Patient, self.patients())
+            self._write(TreatmentPlan, self.plans())
+        self._write_appointments_and_reminders()
+        self._write(Feedback, self.feedback())
+
+        started = time.perf_counter()
+        relationships = rebuild_care_relationships(batch_size=self.batch_size)
+        self.log(f'CareRelationship: {relationships} rows rebuilt in {time.perf_counter() - started:.1f}s')
+        started = time.perf_counter()
+        summaries = sum(rebuild_feedback_summaries(batch_size=self.batch_size).values())
+        self.log(f'Feedback summaries: {summaries} rows rebuilt in {time.perf_counter() - started:.1f}s')
+        invalidate_dashboard_stats()
+        return self.counts
+
+    # --- helpers ---------------------------------------------------------
+
+    def _write(self, model, rows):
+        """INSERT ``rows`` (dicts of field name to value) in batches; see insert_rows()."""
+        label = model.__name__
+        connection = connections[router.db_for_write(model)]
+        started = time.perf_counter()
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                if connection.vendor == 'sqlite':
+                    # Keep the growing indexes in memory instead of re-reading pages.
+                    cursor.execute('PRAGMA cache_size = %d' % -SQLITE_CACHE_KIB)
+            written = insert_rows(model, rows, batch_size=self.batch_size, using=connection.alias)
+            with connection.cursor() as cursor:
+                for statement in connection.ops.sequence_reset_sql(no_style(), [model]):
+                    cursor.execute(statement)
+        elapsed = time.perf_counter() - started
+        rate = written / elapsed if elapsed else 0.0
+        self.log(f'{label}: {written} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)')
+        self.counts[label] = self.counts.get(label, 0) + written
+
+    def _moment(self, day, earliest_days=0, latest_days=0):
+        """An aware datetime on ``day`` shifted back by a random number of days."""
+        shift = timedelta(days=self.random.randint(earliest_days, latest_days),
+                          minutes=self.random.randint(0, 24 * 60 - 1))
+        moment = datetime.combine(day, dtime.min, tzinfo=self.timezone) - shift
+        return min(moment, self.now)
+
+    def _name(self):
+        return self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+
+    def _user_id(self, index):
+        return self.ids[get_user_model()] + index
+
+    def _patient_practitioner(self, patient_index):
+        return patient_index % self.scale.practitioners
+
+    def _first_plan_id(self, patient_index):
+        if patient_index < self.scale.plans:
+            return self.ids[TreatmentPlan] + patient_index
+        return None
+
+    # --- rows ------------------------------------------------------------
+
+    def users(self):
+        User = get_user_model()
+        password = make_password(self.password)
+        history_start = self.anchor - timedelta(days=3 * 365)
+        scale = self.scale
+        for index in range(scale.practitioners + scale.patients):
+            is_doctor = index < scale.practitioners
+            number = index if is_doctor else index - scale.practitioners
+            role = 'doctor' if is_doctor else 'patient'
+            first_name, last_name = self._name()
+            yield dict(
+                id=self._user_id(index),
+                username=f'{self.prefix}_{role}_{number}',
+                email=f'{self.prefix}_{role}_{number}@synthetic.ayursutra.test',
+                password=password,
+                first_name=first_name,
+                last_name=last_name,
+                user_type=role,
+                is_verified=True,
+                license_number=f'{self.prefix.upper()}-{number:06d}' if is_doctor else None,
+                date_joined=self._moment(history_start, 0, 30),
+            )
+
+    def practitioners(self):
+        history_start = self.anchor - timedelta(days=3 * 365)
+        for index in range(self.scale.practitioners):
+            first_name, last_name = self._name()
+            created_at = self._moment(history_start, 0, 30)
+            yield dict(
+                id=self.ids[Practitioner] + index,
+                user_id=self._user_id(index),
+                first_name=first_name,
+                last_name=last_name,
+                specialization=self.random.choice(SPECIALIZATIONS),
+                qualification=self.random.choice(QUALIFICATIONS),
+                experience_years=self.random.randint(1, 35),
+                phone=f'{self.prefix[:8]}-7{index:09d}',
+                email=f'{self.prefix}_doctor_{index}@clinic.ayursutra.test',
+                address=self.random.choice(CITIES),
+                license_number=f'{self.prefix.upper()}-{index:06d}',
+                consultation_fee=Decimal(self.random.choice([500, 800, 1000, 1200, 1500, 2000])),
+                available_days='Monday to Saturday',
+                consultation_hours='9:00 AM - 5:00 PM',
+                status='Active' if self.random.random() < 0.95 else 'Inactive',
+                created_at=created_at,
+                updated_at=created_at,
+            )
+
+    def patients(self):
+        offset = self.scale.practitioners
+        for index in range(self.scale.patients):
+            first_name, last_name = self._name()
+            created_at = self._moment(self.anchor, 0, 3 * 365)
+            yield dict(
+                id=self.ids[Patient] + index,
+                user_id=self._user_id(offset + index),
+                first_name=first_name,
+                last_name=last_name,
+                date_of_birth=date(1940, 1, 1) + timedelta(days=self.random.randint(0, 65 * 365)),
+                gender=self.random.choice(['Male', 'Female']),
+                phone=f'{self.prefix[:8]}-8{index:09d}',
+                email=f'{self.prefix}_patient_{index}@mail.ayursutra.test',
+                address=self.random.choice(CITIES),
+                prakriti=self.random.choice(PRAKRITI),
+                medical_history=self.random.choice(['', 'Hypertension', 'Diabetes type 2', 'Chronic back pain', 'Insomnia']),
+                emergency_contact_name=' '.join(self._name()),
+                emergency_contact_phone=f'+91-6{index:09d}',
+                status='Active' if self.random.random() < 0.9 else 'Inactive',
+                created_at=created_at,
+                updated_at=created_at,
+            )
+
+    def plans(self):
+        scale = self.scale
+        for index in range(scale.plans):
+            patient_index = index % scale.patients
+            treatment_type, title, diagnosis = self.random.choice(TREATMENTS)
+            start_date = self.anchor - timedelta(days=self.random.randint(-30, 2 * 365))
+            length = self.random.choice([7, 14, 21, 28, 42])
+            end_date = start_date + timedelta(days=length)
+            if end_date < self.anchor:
+                plan_status = self.random.choices(['completed', 'cancelled'], weights=[9, 1])[0]
+            elif start_date > self.anchor:
+                plan_status = self.random.choices(['draft', 'active'], weights=[1, 2])[0]
+            else:
+                plan_status = 'active'
+            total_sessions = length // 2
+            completed = total_sessions if plan_status == 'completed' else self.random.randint(0, total_sessions)
+            total_cost = Decimal(self.random.randrange(5000, 80000, 500))
+            paid = (total_cost * Decimal(self.random.choice([0, 25, 50, 75, 100])) / 100).quantize(Decimal('0.01'))
+            created_at = self._moment(start_date, 1, 14)
+            yield dict(
+                id=self.ids[TreatmentPlan] + index,
+                patient_id=self.ids[Patient] + patient_index,
+                practitioner_id=self.ids[Practitioner] + self._patient_practitioner(patient_index),
+                title=title,
+                description=f'{title} for {diagnosis.lower()}.',
+                primary_diagnosis=diagnosis,
+                treatment_type=treatment_type,
+                start_date=start_date,
+                end_date=end_date,
+                total_sessions=total_sessions,
+                completed_sessions=completed,
+                total_cost=total_cost,
+                paid_amount=paid,
+                status=plan_status,
+                created_at=created_at,
+                updated_at=created_at,
+            )
+
+    def _write_appointments_and_reminders(self):
+        reminders = []
+        self._write(Appointment, self.appointments(reminders))
+        self._write(Notification, reminders)
+
+    def appointments(self, reminders):
+        """
+        Appointment rows, appending the reminder Notification row for every
+        ``appointments / notifications``-th one to ``reminders``.
+        """
+        scale = self.scale
+        per_practitioner = -(-scale.appointments // scale.practitioners)
+        # A quarter of the slots stay free; the calendar ends two months ahead.
+        weeks = -(-int(per_practitioner * 1.25) // (SLOTS_PER_DAY * WORKING_DAYS_PER_WEEK)) + 1
+        last_day = self.anchor + timedelta(days=60)
+        calendar_start = last_day - timedelta(days=last_day.weekday() + 7 * weeks)
+        next_slot = [0] * scale.practitioners
+        emitted = 0
+
+        for index in range(scale.appointments):
+            practitioner_index = index % scale.practitioners
+            slot = next_slot[practitioner_index]
+            next_slot[practitioner_index] += 1 + (self.random.random() < 0.25)
+            day_number, slot_in_day = divmod(slot, SLOTS_PER_DAY)
+            week, weekday = divmod(day_number, WORKING_DAYS_PER_WEEK)
+            day = calendar_start + timedelta(days=7 * week + weekday)
+            at = dtime(9 + slot_in_day)
+
+            # One of this practitioner's own patients (patient % practitioners == practitioner).
+            owned = -(-(scale.patients - practitioner_index) // scale.practitioners)
+            if owned > 0:
+                patient_index = practitioner_index + scale.practitioners * self.random.randrange(owned)
+            else:
+                patient_index = self.random.randrange(scale.patients)
+
+            if day < self.anchor:
+                appointment_status = self.random.choices(['completed', 'cancelled', 'no_show'], weights=[16, 2, 2])[0]
+            else:
+                appointment_status = self.random.choices(['scheduled', 'confirmed'], weights=[3, 2])[0]
+            created_at = self._moment(day, 1, 30)
+            appointment_id = self.ids[Appointment] + index
+            patient_id = self.ids[Patient] + patient_index
+            practitioner_id = self.ids[Practitioner] + practitioner_index
+            yield dict(
+                id=appointment_id,
+                patient_id=patient_id,
+                practitioner_id=practitioner_id,
+                treatment_plan_id=self._first_plan_id(patient_index),
+                appointment_date=day,
+                appointment_time=at,
+                duration_minutes=60,
+                appointment_type=self.random.choice(APPOINTMENT_TYPES),
+                status=appointment_status,
+                created_at=created_at,
+                updated_at=created_at,
+            )
+
+            if (index + 1) * scale.notifications // scale.appointments > emitted:
+                emitted += 1
+                starts_at = datetime.combine(day, at, tzinfo=self.timezone)
+                scheduled_for = starts_at - timedelta(hours=24)
+                sent = scheduled_for <= self.now
+                reminders.append(dict(
+                    id=self.ids[Notification] + emitted - 1,
+                    title='Appointment Reminder',
+                    message=f'You have an appointment on {day:%d %b %Y} at {at:%I:%M %p}',
+                    notification_type='appointment_reminder',
+                    patient_id=patient_id,
+                    practitioner_id=practitioner_id,
+                    appointment_id=appointment_id,
+                    status='read' if sent and self.random.random() < 0.8 else 'unread',
+                    scheduled_for=scheduled_for,
+                    sent_at=scheduled_for if sent else None,
+                    created_at=created_at,
+                    updated_at=created_at,
+                ))
+
+    def feedback(self):
+        scale = self.scale
+        for index in range(scale.feedback):
+            patient_index = self.random.randrange(scale.patients)
+            rating = self.random.choices([1, 2, 3, 4, 5], weights=[2, 5, 13, 40, 40])[0]
+            created_at = self._moment(self.anchor, 0, 2 * 365)
+            yield dict(
+                id=self.ids[Feedback] + index,
+                patient_id=self.ids[Patient] + patient_index,
+                practitioner_id=self.ids[Practitioner] + self._patient_practitioner(patient_index),
+                treatment_plan_id=self._first_plan_id(patient_index),
+                rating=rating,
+                title=FEEDBACK_TITLES[rating],
+                comment=f'{FEEDBACK_TITLES[rating]}. The treatment was rated {rating} out of 5.',
+                treatment_effectiveness=max(1, min(5, rating + self.random.randint(-1, 1))),
+                practitioner_care=max(1, min(5, rating + self.random.randint(-1, 1))),
+                facility_cleanliness=self.random.randint(3, 5),
+                overall_satisfaction=rating,
+                would_recommend=rating >= 4,
+                is_public=self.random.random() < 0.5,
+                created_at=created_at,
+                updated_at=created_at,
+            )
@@ -0,0 +1,74 @@
+import copy
+
+from django.test import SimpleTestCase, TestCase
+
+from core.benchmark import compare_results, run_benchmark
+from core.sample_data import local_caches
+from core.synthetic_data import Scale
+
+from .utils import fast_password_hashing
+
+
+def document(calibration_ms=10.0, **result):
+    return {
+        'meta': {'calibration_ms': calibration_ms},
+        'results': {'patients-list:doctor': {'p50_ms': 10.0, 'queries': 3, 'peak_memory_kib': 500.0, **result}},
+    }
+
+
+class CompareResultsTests(SimpleTestCase):
+
+    def test_unchanged(self):
+        self.assertEqual(compare_results(document(), document()), [])
+
+    def test_slower_median(self):
+        self.assertEqual(
+            compare_results(document(p50_ms=14.0), document()), ['patients-list:doctor: p50_ms 10.00 -> 14.00'],
+        )
+        # Within the threshold.
+        self.assertEqual(compare_results(document(p50_ms=12.0), document()), [])
+        self.assertEqual(compare_results(document(p50_ms=12.0), document(), threshold=10), [
+            'patients-list:doctor: p50_ms 10.00 -> 12.00',
+        ])
+
+    def test_small_latencies_have_a_noise_floor(self):
+        self.assertEqual(compare_results(document(p50_ms=1.5), document(p50_ms=0.8)), [])
+
+    def test_latency_is_scaled_by_calibration(self):
+        # The whole machine got twice as slow; the endpoint did not.
+        self.assertEqual(compare_results(document(calibration_ms=20.0, p50_ms=20.0), document()), [])
+        self.assertEqual(len(compare_results(document(calibration_ms=5.0, p50_ms=10.0), document())), 1)
+
+    def test_any_extra_query_is_a_regression(self):
+        self.assertEqual(compare_results(document(queries=4), document()), ['patients-list:doctor: queries 3 -> 4'])
+
+    def test_peak_memory(self):
+        self.assertEqual(len(compare_results(document(peak_memory_kib=800.0), document())), 1)
+        self.assertEqual(compare_results(document(peak_memory_kib=550.0), document()), [])
+
+    def test_endpoints_missing_from_the_current_run_are_skipped(self):
+        current = copy.deepcopy(document())
+        current['results'].clear()
+        self.assertEqual(compare_results(current, document()), [])
+
+
+@fast_password_hashing
+@local_caches()
+class RunBenchmarkTests(TestCase):
+
+    def test_selected_endpoints(self):
+        results = run_benchmark(
+            Scale(practitioners=2, patients=20, appointments=60),
+            iterations=2, warmup=0, rounds=1, only=['patients-list', 'patients-detail'],
+        )
+        self.assertEqual(results['meta']['scale']['Patient'], 20)
+        self.assertEqual(
+            set(results['results']),
+            {f'{endpoint}:{role}' for endpoint in ('patients-list', 'patients-detail')
+             for role in ('admin', 'doctor', 'patient')},
+        )
+        for key, result in results['results'].items():
+            with self.subTest(key):
+                self.assertTrue(result['ok'], result['statuses'])
+                self.assertEqual(result['requests'], 2)
+        self.assertEqual(compare_results(results, results), [])
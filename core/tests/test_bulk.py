@@ -0,0 +1,95 @@
+from datetime import date, time, timedelta
+
+from core.models import Appointment, Notification, Patient
+
+from .utils import ClinicTestCase, client_for
+
+
+class BulkAppointmentTests(ClinicTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.patient = Patient.objects.get(user=cls.users['patient'])
+        cls.day = date.today() + timedelta(days=30)
+
+    def appointment(self, at, **fields):
+        return {
+            'patient': self.patient.pk, 'practitioner': self.practitioner.pk,
+            'appointment_date': self.day.isoformat(), 'appointment_time': at, **fields,
+        }
+
+    def post(self, action, data):
+        return client_for(self.users['admin']).post(f'/api/appointments/{action}/', data, format='json')
+
+    def test_bulk_create(self):
+        response = self.post('bulk_create', [self.appointment('10:00'), self.appointment('11:00')])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(Appointment.objects.filter(appointment_date=self.day).count(), 2)
+
+    def test_bulk_create_is_all_or_nothing(self):
+        Appointment.objects.create(
+            patient=self.patient, practitioner=self.practitioner,
+            appointment_date=self.day, appointment_time=time(10, 0),
+        )
+        response = self.post('bulk_create', [self.appointment('12:00'), self.appointment('10:30')])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Appointment.objects.filter(appointment_date=self.day).count(), 1)
+        self.assertEqual(self.post('bulk_create', {'not': 'a list'}).status_code, 400)
+
+    def test_bulk_status(self):
+        ids = list(Appointment.objects.values_list('pk', flat=True)[:2])
+        response = self.post('bulk_status', {'updates': [{'id': pk, 'status': 'confirmed'} for pk in ids]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(Appointment.objects.filter(pk__in=ids).values_list('status', flat=True)), {'confirmed'})
+
+        response = self.post('bulk_status', {'updates': [{'id': 0, 'status': 'confirmed'}]})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['ids'], [0])
+
+    def test_reactivating_a_taken_slot_is_rejected(self):
+        cancelled = Appointment.objects.create(
+            patient=self.patient, practitioner=self.practitioner, status='cancelled',
+            appointment_date=self.day, appointment_time=time(10, 0),
+        )
+        taken = Appointment.objects.create(
+            patient=self.patient, practitioner=self.practitioner,
+            appointment_date=self.day, appointment_time=time(10, 30),
+        )
+        other = Appointment.objects.exclude(pk__in=[cancelled.pk, taken.pk]).first()
+        response = self.post('bulk_status', {'updates': [
+            {'id': other.pk, 'status': 'confirmed'},
+            {'id': cancelled.pk, 'status': 'scheduled'},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn(f'appointment {taken.pk}', response.data[1]['status'][0])
+        self.assertEqual(Appointment.objects.get(pk=other.pk).status, 'scheduled')
+
+        # Cancelling the booking that took the slot in the same request frees it.
+        response = self.post('bulk_status', {'updates': [
+            {'id': taken.pk, 'status': 'cancelled'},
+            {'id': cancelled.pk, 'status': 'scheduled'},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Appointment.objects.get(pk=cancelled.pk).status, 'scheduled')
+
+
+class MarkReadTests(ClinicTestCase):
+
+    def test_mark_read_only_touches_visible_notifications(self):
+        own = Notification.objects.get(patient__user=self.users['patient'])
+        others = list(Notification.objects.exclude(pk=own.pk).values_list('pk', flat=True))
+        response = client_for(self.users['patient']).post(
+            '/api/notifications/mark_read/', {'ids': [own.pk, *others]}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'updated': 1})
+        self.assertEqual(Notification.objects.get(pk=own.pk).status, 'read')
+        self.assertFalse(Notification.objects.filter(pk__in=others, status='read').exists())
+
+    def test_mark_all_read(self):
+        client = client_for(self.users['doctor'])
+        self.assertEqual(client.post('/api/notifications/mark_all_read/').data, {'updated': self.patients})
+        self.assertEqual(client.post('/api/notifications/mark_all_read/').data, {'updated': 0})
@@ -0,0 +1,77 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from core.care import rebuild_care_relationships
+from core.models import Appointment, CareRelationship, Patient, Practitioner, TreatmentPlan
+
+from .utils import ClinicTestCase, client_for
+
+
+class CareRelationshipTests(ClinicTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.patient = Patient.objects.get(user=cls.users['patient'])
+        cls.other_doctor = get_user_model().objects.create_user('care_doctor', password='x', user_type='doctor')
+        cls.other = Practitioner.objects.create(
+            user=cls.other_doctor, first_name='Meera', last_name='Iyer',
+            specialization='Nadi Pariksha', qualification='BAMS', phone='care-doc-phone',
+            email='care_doctor@clinic.test', license_number='CARE-LIC-1', consultation_fee=Decimal('900.00'),
+        )
+
+    def pairs(self):
+        return set(CareRelationship.objects.values_list('practitioner_id', 'patient_id'))
+
+    def visible_patients(self, user):
+        response = client_for(user).get('/api/patients/')
+        return {row['id'] for row in response.data['results']}
+
+    def book(self, practitioner, **fields):
+        return Appointment.objects.create(
+            patient=self.patient, practitioner=practitioner,
+            appointment_date=date.today() + timedelta(days=40), appointment_time=time(10), **fields,
+        )
+
+    def test_sample_clinic_rows(self):
+        self.assertEqual(self.pairs(), {(self.practitioner.pk, pk) for pk in Patient.objects.values_list('pk', flat=True)})
+
+    def test_appointment_adds_and_its_deletion_prunes(self):
+        appointment = self.book(self.other)
+        self.assertIn((self.other.pk, self.patient.pk), self.pairs())
+        self.assertEqual(self.visible_patients(self.other_doctor), {self.patient.pk})
+
+        appointment.delete()
+        self.assertNotIn((self.other.pk, self.patient.pk), self.pairs())
+        self.assertEqual(self.visible_patients(self.other_doctor), set())
+
+    def test_reassignment_keeps_pairs_something_still_links(self):
+        plan = TreatmentPlan.objects.get(patient=self.patient)
+        plan.practitioner = self.other
+        plan.save()
+        # The patient's appointment still links them to the first practitioner.
+        self.assertIn((self.practitioner.pk, self.patient.pk), self.pairs())
+        self.assertIn((self.other.pk, self.patient.pk), self.pairs())
+
+        appointment = Appointment.objects.get(patient=self.patient, practitioner=self.practitioner)
+        appointment.practitioner = self.other
+        appointment.save()
+        self.assertNotIn((self.practitioner.pk, self.patient.pk), self.pairs())
+        self.assertNotIn(self.patient.pk, self.visible_patients(self.users['doctor']))
+
+    def test_bulk_created_appointments_add_pairs(self):
+        response = client_for(self.users['admin']).post('/api/appointments/bulk_create/', [{
+            'patient': self.patient.pk, 'practitioner': self.other.pk,
+            'appointment_date': (date.today() + timedelta(days=40)).isoformat(), 'appointment_time': '10:00',
+        }], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn((self.other.pk, self.patient.pk), self.pairs())
+
+    def test_rebuild(self):
+        self.book(self.other)
+        expected = self.pairs()
+        CareRelationship.objects.all().delete()
+        self.assertEqual(rebuild_care_relationships(batch_size=2), len(expected))
+        self.assertEqual(self.pairs(), expected)
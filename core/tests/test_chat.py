@@ -0,0 +1,67 @@
+import json
+
+from django.test import AsyncClient
+
+from .utils import ClinicTestCase, client_for, fake_llm
+
+NO_CACHE = {'ENABLED': False}
+
+
+def parse_events(body):
+    """The (event, data) pairs of a text/event-stream body."""
+    events = []
+    for block in body.decode().split('\n\n'):
+        if not block:
+            continue
+        event, data = 'message', None
+        for line in block.split('\n'):
+            if line.startswith('event: '):
+                event = line[len('event: '):]
+            elif line.startswith('data: '):
+                data = json.loads(line[len('data: '):])
+        events.append((event, data))
+    return events
+
+
+class ChatStreamTests(ClinicTestCase):
+
+    async def stream(self, message, user='patient'):
+        client = AsyncClient()
+        if user:
+            await client.aforce_login(self.users[user])
+        response = await client.post('/api/chat/stream/', {'message': message}, content_type='application/json')
+        if not response.streaming:
+            return response, None
+        return response, parse_events(b''.join([chunk async for chunk in response.streaming_content]))
+
+    async def test_reply_is_streamed_as_server_sent_events(self):
+        with fake_llm(CHATBOT_CACHE=NO_CACHE):
+            response, events = await self.stream('what is vata')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(events[-1], ('done', {}))
+        chunks = [data['text'] for event, data in events[:-1]]
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), 'You said: what is vata')
+
+    async def test_slow_model_is_a_gateway_timeout(self):
+        with fake_llm(delay=2, timeout=0.2, CHATBOT_CACHE=NO_CACHE):
+            response, _ = await self.stream('hello')
+        self.assertEqual(response.status_code, 504)
+
+    async def test_bad_requests(self):
+        with fake_llm(CHATBOT_CACHE=NO_CACHE):
+            response, _ = await self.stream('')
+            self.assertEqual(response.status_code, 400)
+            response, _ = await self.stream('hello', user=None)
+            self.assertEqual(response.status_code, 401)
+
+
+class ChatTests(ClinicTestCase):
+
+    def test_reply(self):
+        with fake_llm(reply='Drink warm water.', CHATBOT_CACHE=NO_CACHE):
+            response = client_for(self.users['patient']).post('/api/chat/', {'message': 'hi'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'text': 'Drink warm water.'})
+        self.assertEqual(client_for(self.users['patient']).post('/api/chat/', {}, format='json').status_code, 400)
@@ -0,0 +1,74 @@
+from django.test import SimpleTestCase, TestCase
+
+from core.chat_cache import ResponseCache, normalize_prompt
+
+from .utils import ClinicTestCase, client_for, fake_llm
+
+
+class ResponseCacheTests(SimpleTestCase):
+
+    def test_normalized_prompts_share_an_entry(self):
+        self.assertEqual(normalize_prompt('  What is VATA dosha?! '), 'what is vata dosha')
+        cache = ResponseCache()
+        cache.set('What is Vata dosha?', 'Air and space.')
+        self.assertEqual(cache.get('what is vata  dosha'), 'Air and space.')
+        self.assertIsNone(cache.get('what is pitta dosha'))
+        self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (1, 1))
+
+    def test_namespaces_are_separate(self):
+        cache = ResponseCache(namespace='gemini-pro')
+        cache.set('hello', 'Hi.')
+        self.assertIsNone(ResponseCache(namespace='other').get('hello'))
+        self.assertNotEqual(cache.key('hello'), ResponseCache(namespace='other').key('hello'))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set('a', '1')
+        cache.set('b', '2')
+        cache.get('a')
+        cache.set('c', '3')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), '1')
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_expired_entries_are_misses(self):
+        cache = ResponseCache(ttl=0)
+        cache.set('a', '1')
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_saved_time_is_estimated_from_misses(self):
+        cache = ResponseCache()
+        cache.get('a')
+        cache.set('a', '1', latency=2.0)
+        cache.get('a')
+        cache.get('a')
+        stats = cache.stats()
+        self.assertEqual(stats['average_miss_seconds'], 2.0)
+        self.assertEqual(stats['estimated_seconds_saved'], 4.0)
+
+
+class PersistedResponseCacheTests(TestCase):
+
+    def test_a_new_process_falls_back_to_the_database(self):
+        ResponseCache(persist=True).set('hello', 'Hi.')
+        restarted = ResponseCache(persist=True)
+        self.assertEqual(restarted.get('Hello!'), 'Hi.')
+        self.assertEqual(restarted.get('Hello!'), 'Hi.')
+        self.assertEqual(restarted.stats()['database_hits'], 1)
+        self.assertIsNone(ResponseCache(persist=True, ttl=-1).get('hello'))
+
+
+class ChatResponseCacheTests(ClinicTestCase):
+
+    def test_repeated_question_is_answered_from_the_cache(self):
+        client = client_for(self.users['patient'])
+        with fake_llm(reply='Drink warm water.') as server:
+            self.assertEqual(client.post('/api/chat/', {'message': 'How to sleep?'}, format='json').status_code, 200)
+            server.shutdown()
+            response = client.post('/api/chat/', {'message': 'how to sleep'}, format='json')
+            self.assertEqual(response.data, {'text': 'Drink warm water.'})
+
+            stats = client_for(self.users['admin']).get('/api/chat/cache-stats/').data
+            self.assertEqual((stats['enabled'], stats['hits'], stats['misses']), (True, 1, 1))
+        self.assertEqual(client.get('/api/chat/cache-stats/').status_code, 403)
@@ -0,0 +1,127 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from core.admission import AdmissionController, Overloaded
+from core.llm import get_llm_client
+from core.throttling import ChatRateThrottle
+
+from .utils import ClinicTestCase, client_for, fake_llm
+
+
+class ChatRateThrottleTests(ClinicTestCase):
+
+    def setUp(self):
+        request = APIRequestFactory().post('/api/chat/')
+        request.user = self.users['patient']
+        self.request = request
+        self.now = 600.0  # the start of a window
+
+    def allow(self):
+        # DRF reads the rates when the module is imported.
+        with mock.patch.object(ChatRateThrottle, 'THROTTLE_RATES', {'chatbot': '5/min'}):
+            throttle = ChatRateThrottle()
+        throttle.timer = lambda: self.now
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_burst_then_sliding_window(self):
+        self.assertTrue(all(self.allow()[0] for _ in range(5)))
+        allowed, throttle = self.allow()
+        self.assertFalse(allowed)
+        # All five were sent at the start of this window: wait for the next
+        # one, then for 1/5 of the burst to slide out.
+        self.assertAlmostEqual(throttle.wait(), 60 + 12)
+
+        self.now += 72
+        self.assertEqual([self.allow()[0] for _ in range(2)], [True, False])
+        self.now += 12
+        self.assertTrue(self.allow()[0])
+
+    def test_refused_messages_do_not_count(self):
+        for _ in range(20):
+            self.allow()
+        self.now += 72
+        self.assertTrue(self.allow()[0])
+
+    def test_reset(self):
+        for _ in range(5):
+            _, throttle = self.allow()
+        throttle.reset(self.users['patient'].pk)
+        self.assertTrue(self.allow()[0])
+
+
+class ChatLimitTests(ClinicTestCase):
+
+    def test_too_many_messages_are_refused(self):
+        client = client_for(self.users['patient'])
+        with fake_llm(reply='Rest.'), mock.patch.object(ChatRateThrottle, 'THROTTLE_RATES', {'chatbot': '2/min'}):
+            self.assertEqual(client.post('/api/chat/', {'message': 'a'}, format='json').status_code, 200)
+            self.assertEqual(client.post('/api/chat/', {'message': 'a'}, format='json').status_code, 200)
+            response = client.post('/api/chat/', {'message': 'a'}, format='json')
+            self.assertEqual(response.status_code, 429)
+            self.assertIn('Retry-After', response)
+            # The limit is per user.
+            other = client_for(self.users['doctor'])
+            self.assertEqual(other.post('/api/chat/', {'message': 'a'}, format='json').status_code, 200)
+
+    def test_busy_model_is_service_unavailable(self):
+        admission = {'MAX_CONCURRENT': 1, 'MAX_QUEUE': 0, 'MAX_WAIT': 1}
+        with fake_llm(CHATBOT_CACHE={'ENABLED': False}, CHATBOT_ADMISSION=admission):
+            with get_llm_client().admission.slot():
+                response = client_for(self.users['patient']).post('/api/chat/', {'message': 'a'}, format='json')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '1')
+            stats = client_for(self.users['admin']).get('/api/chat/admission-stats/').data
+            self.assertEqual(stats['rejected_queue_full'], 1)
+
+
+class AdmissionControllerTests(SimpleTestCase):
+
+    def test_full_queue_is_refused(self):
+        admission = AdmissionController(max_concurrent=1, max_queue=0)
+        with admission.slot():
+            with self.assertRaises(Overloaded):
+                with admission.slot():
+                    pass
+        with admission.slot():
+            self.assertEqual(admission.stats()['active'], 1)
+        self.assertEqual(admission.stats()['active'], 0)
+
+    def test_waiter_times_out(self):
+        admission = AdmissionController(max_concurrent=1, max_queue=1, max_wait=0.05)
+        with admission.slot():
+            with self.assertRaisesMessage(Overloaded, 'Timed out'):
+                with admission.slot():
+                    pass
+        self.assertEqual(admission.stats()['rejected_wait_timeout'], 1)
+        self.assertEqual(admission.stats()['queue_depth'], 0)
+
+    def test_released_slot_goes_to_the_oldest_waiter(self):
+        admission = AdmissionController(max_concurrent=1, max_queue=2, max_wait=5)
+        order = []
+        held = threading.Event()
+        release = threading.Event()
+
+        def call(name):
+            with admission.slot():
+                order.append(name)
+                held.set()
+                release.wait()
+
+        first = threading.Thread(target=call, args=('first',))
+        first.start()
+        held.wait()
+        waiters = []
+        for name in ('second', 'third'):
+            thread = threading.Thread(target=call, args=(name,))
+            thread.start()
+            waiters.append(thread)
+            while admission.stats()['queue_depth'] < len(waiters):
+                pass
+        release.set()
+        for thread in [first, *waiters]:
+            thread.join()
+        self.assertEqual(order, ['first', 'second', 'third'])
+        self.assertEqual(admission.stats()['queued'], 2)
@@ -0,0 +1,107 @@
+from django.core.cache import caches
+from django.core.signals import request_finished
+from django.db import DEFAULT_DB_ALIAS
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.db_routing import (
+    CACHE_ALIAS, PrimaryReplicaRouter, ReplicaRoutingMiddleware, _state, _sticky_key, client_key,
+)
+from core.models import Patient
+from core.sample_data import local_caches
+
+
+class ReplicaView:
+    replica_reads = True
+
+
+class PrimaryView:
+    pass
+
+
+def view(view_class):
+    def handler(request):
+        pass
+    handler.cls = view_class
+    return handler
+
+
+@local_caches()
+@override_settings(DATABASE_REPLICA_ROUTING={'REPLICAS': ['replica_1'], 'STICKY_SECONDS': 5})
+class ReplicaRoutingTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.middleware = ReplicaRoutingMiddleware(lambda request: None)
+        self.addCleanup(_state.set, None)
+
+    def start(self, method='get', view_class=ReplicaView, token='client-a'):
+        headers = {'HTTP_AUTHORIZATION': f'Token {token}'} if token else {}
+        request = getattr(RequestFactory(), method)('/api/patients/', **headers)
+        self.middleware.process_request(request)
+        self.middleware.process_view(request, view(view_class), (), {})
+        return request
+
+    def finish(self):
+        request_finished.send(sender=self.__class__)
+
+    def marked(self, request):
+        return caches[CACHE_ALIAS].get(_sticky_key(client_key(request)), False)
+
+    def read_alias(self):
+        return self.router.db_for_read(Patient)
+
+    def test_outside_requests_read_the_primary(self):
+        self.assertEqual(self.read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_safe_requests_to_opted_in_views_read_a_replica(self):
+        self.start()
+        self.assertEqual(self.read_alias(), 'replica_1')
+        self.finish()
+        self.assertEqual(self.read_alias(), DEFAULT_DB_ALIAS)
+
+        for method, view_class in [('post', ReplicaView), ('get', PrimaryView)]:
+            with self.subTest(method=method, view=view_class.__name__):
+                self.start(method, view_class)
+                self.assertEqual(self.read_alias(), DEFAULT_DB_ALIAS)
+                self.finish()
+
+    def test_a_write_pins_the_request_and_the_client(self):
+        request = self.start()
+        self.assertEqual(self.router.db_for_write(Patient), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.read_alias(), DEFAULT_DB_ALIAS)
+        self.finish()
+
+        # Every worker sees the mark, not just the one that handled the write.
+        self.assertTrue(self.marked(request))
+        self.assertFalse(caches['default'].get(_sticky_key(client_key(request))))
+        self.start()
+        self.assertEqual(self.read_alias(), DEFAULT_DB_ALIAS)
+        self.finish()
+
+        self.start(token='client-b')
+        self.assertEqual(self.read_alias(), 'replica_1')
+        self.finish()
+
+        caches[CACHE_ALIAS].clear()
+        self.start()
+        self.assertEqual(self.read_alias(), 'replica_1')
+        self.finish()
+
+    def test_reads_leave_no_mark(self):
+        request = self.start()
+        self.read_alias()
+        self.finish()
+        self.assertFalse(self.marked(request))
+
+    def test_anonymous_writes_pin_only_their_request(self):
+        self.start(token=None)
+        self.router.db_for_write(Patient)
+        self.assertEqual(self.read_alias(), DEFAULT_DB_ALIAS)
+        self.finish()
+        self.start(token=None)
+        self.assertEqual(self.read_alias(), 'replica_1')
+        self.finish()
+
+    def test_replicas_take_no_migrations(self):
+        self.assertFalse(self.router.allow_migrate('replica_1', 'core'))
+        self.assertIsNone(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'core'))
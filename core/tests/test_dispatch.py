@@ -0,0 +1,92 @@
+import io
+import threading
+from datetime import timedelta
+
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from core.dispatch import ConsoleBackend, claim_batch, dispatch_batch, mark_sent
+from core.models import Notification
+from core.sample_data import create_clinic, create_role_users, local_caches
+
+from .utils import fast_password_hashing
+
+
+@fast_password_hashing
+@local_caches()
+class ClaimBatchTests(TransactionTestCase):
+
+    def setUp(self):
+        users = create_role_users()
+        create_clinic(users, patients=40)
+        Notification.objects.update(scheduled_for=timezone.now() - timedelta(minutes=1))
+
+    def test_a_claimed_notification_is_not_claimed_again(self):
+        first = {notification.pk for notification in claim_batch(25)}
+        second = {notification.pk for notification in claim_batch(25)}
+        self.assertEqual(len(first), 25)
+        self.assertEqual(len(second), 15)
+        self.assertFalse(first & second)
+        self.assertEqual(claim_batch(25), [])
+
+    def test_unscheduled_notifications_are_due(self):
+        Notification.objects.update(scheduled_for=None)
+        self.assertEqual(len(claim_batch(100)), 40)
+
+    def test_future_and_sent_notifications_are_not_due(self):
+        now = timezone.now()
+        Notification.objects.filter(pk__in=Notification.objects.values('pk')[:10]).update(
+            scheduled_for=now + timedelta(hours=1),
+        )
+        Notification.objects.filter(pk__in=Notification.objects.values('pk')[10:20]).update(sent_at=now)
+        self.assertEqual(len(claim_batch(100)), 20)
+
+    def test_an_expired_claim_is_taken_over(self):
+        first = claim_batch(5)
+        Notification.objects.update(claimed_at=timezone.now() - timedelta(minutes=10))
+        second = claim_batch(5, lease_seconds=60)
+        self.assertEqual({n.pk for n in first}, {n.pk for n in second})
+
+        # The first worker's claim is gone; only the second may mark them sent.
+        self.assertEqual(mark_sent(first), 0)
+        self.assertEqual(mark_sent(second), 5)
+        self.assertEqual(Notification.objects.filter(sent_at__isnull=False).count(), 5)
+
+    def test_dispatch_batch(self):
+        backend = ConsoleBackend(stream=io.StringIO())
+        self.assertEqual(dispatch_batch(backend, 30), (30, 30))
+        self.assertEqual(dispatch_batch(backend, 30), (10, 10))
+        self.assertEqual(dispatch_batch(backend, 30), (0, 0))
+        self.assertEqual(backend.stream.getvalue().count('[appointment_reminder]'), 40)
+
+    def test_concurrent_workers_never_claim_the_same_notification(self):
+        claims = []
+        start = threading.Barrier(4)
+
+        def worker():
+            claimed = []
+            try:
+                start.wait()
+                while True:
+                    try:
+                        batch = claim_batch(3)
+                    except OperationalError:
+                        # The other workers hold the database's write lock; try again.
+                        continue
+                    if not batch:
+                        break
+                    claimed.extend(notification.pk for notification in batch)
+            finally:
+                connection.close()
+                claims.append(claimed)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        claimed = [pk for worker_claims in claims for pk in worker_claims]
+        self.assertEqual(len(claimed), len(set(claimed)))
+        self.assertEqual(set(claimed), set(Notification.objects.values_list('pk', flat=True)))
@@ -0,0 +1,68 @@
+from django.utils import timezone
+
+from core.management.commands.check_query_budget import REVALIDATION_BUDGET
+from core.models import Appointment, Notification, Patient
+
+from .utils import ClinicTestCase, client_for
+
+
+class ConditionalGetTests(ClinicTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.patient = Patient.objects.get(user=cls.users['patient'])
+        cls.other_patient = Patient.objects.exclude(pk=cls.patient.pk).first()
+
+    def etag(self, role, url):
+        response = client_for(self.users[role]).get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_unchanged_list_is_not_modified(self):
+        for role in ('admin', 'doctor', 'patient'):
+            with self.subTest(role=role):
+                client = client_for(self.users[role])
+                etag = self.etag(role, '/api/appointments/')
+                with self.assertNumQueries(REVALIDATION_BUDGET):
+                    response = client.get('/api/appointments/', HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+    def test_renaming_a_patient_changes_lists_that_show_the_name(self):
+        before = {role: self.etag(role, '/api/appointments/') for role in ('admin', 'doctor', 'patient')}
+        self.patient.last_name = 'Renamed'
+        self.patient.save()
+        for role, etag in before.items():
+            with self.subTest(role=role):
+                self.assertNotEqual(self.etag(role, '/api/appointments/'), etag)
+
+    def test_other_users_writes_leave_a_scoped_list_alone(self):
+        etag = self.etag('patient', '/api/notifications/')
+        Notification.objects.filter(patient=self.other_patient).update(status='read', updated_at=timezone.now())
+        Notification.objects.filter(patient=self.other_patient).delete()
+        self.assertEqual(self.etag('patient', '/api/notifications/'), etag)
+
+        Notification.objects.filter(patient=self.patient).update(status='read', updated_at=timezone.now())
+        self.assertNotEqual(self.etag('patient', '/api/notifications/'), etag)
+
+    def test_rows_leaving_a_scoped_list_change_it(self):
+        etag = self.etag('doctor', '/api/appointments/')
+        Appointment.objects.filter(patient=self.other_patient).delete()
+        self.assertNotEqual(self.etag('doctor', '/api/appointments/'), etag)
+
+    def test_detail(self):
+        appointment = Appointment.objects.get(patient=self.patient)
+        url = f'/api/appointments/{appointment.pk}/'
+        etag = self.etag('patient', url)
+        response = client_for(self.users['patient']).get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.patient.last_name = 'Renamed'
+        self.patient.save()
+        self.assertNotEqual(self.etag('patient', url), etag)
+
+    def test_sparse_fields_have_their_own_etag(self):
+        self.assertNotEqual(
+            self.etag('doctor', '/api/appointments/'), self.etag('doctor', '/api/appointments/?fields=id'),
+        )
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+
+from django.db import connection
+from django.test import AsyncClient, RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from core.exports import _csv_value, export_response
+from core.models import Patient
+from core.serializers import PatientSerializer
+
+from .utils import ClinicTestCase, client_for
+
+
+class ExportTests(ClinicTestCase):
+
+    def export(self, url, role='admin', **params):
+        response = client_for(self.users[role]).get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def csv_rows(self, body):
+        return list(csv.DictReader(io.StringIO(body)))
+
+    def test_csv(self):
+        response, body = self.export('/api/patients/export/')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertRegex(response['Content-Disposition'], r'^attachment; filename="patients-\d{4}-\d\d-\d\d\.csv"$')
+        rows = self.csv_rows(body)
+        self.assertEqual(list(rows[0]), list(PatientSerializer().fields))
+        self.assertEqual([row['last_name'] for row in rows], ['0', '1', '2'])
+
+    def test_ndjson_with_sparse_fields_and_search(self):
+        response, body = self.export('/api/treatment-plans/export/', output='ndjson', fields='id,remaining_amount')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), self.patients)
+        self.assertEqual(set(rows[0]), {'id', 'remaining_amount'})
+
+        _, body = self.export('/api/patients/export/', output='ndjson', q='phone-1')
+        self.assertEqual([json.loads(line)['phone'] for line in body.splitlines()], ['budget-phone-1'])
+
+    def test_exports_are_role_scoped(self):
+        _, body = self.export('/api/patients/export/', role='patient')
+        own = Patient.objects.get(user=self.users['patient'])
+        self.assertEqual([row['id'] for row in self.csv_rows(body)], [str(own.pk)])
+
+    def test_unknown_output(self):
+        response = client_for(self.users['admin']).get('/api/patients/export/', {'output': 'xlsx'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_formula_cells_are_neutralised(self):
+        for value, expected in [
+            ('=HYPERLINK("http://x")', '\'=HYPERLINK("http://x")'), ('+91 98', "'+91 98"), ('-cmd', "'-cmd"),
+            ('@SUM(A1)', "'@SUM(A1)"), ('-250.00', '-250.00'), ('-7', '-7'), ('Vata', 'Vata'), (None, ''),
+            ({'a': 1}, '{"a": 1}'),
+        ]:
+            with self.subTest(value=value):
+                self.assertEqual(_csv_value(value), expected)
+
+        Patient.objects.filter(user=self.users['patient']).update(first_name='=1+2')
+        _, body = self.export('/api/patients/export/', role='patient')
+        self.assertEqual(self.csv_rows(body)[0]['first_name'], "'=1+2")
+
+    def test_rows_are_read_in_keyset_chunks(self):
+        request = RequestFactory().get('/api/patients/export/')
+        response = export_response(
+            request, Patient.objects.all(), lambda rows: PatientSerializer(rows, many=True), chunk_size=2,
+        )
+        with CaptureQueriesContext(connection) as queries:
+            body = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(self.csv_rows(body)), self.patients)
+        page_queries = [query['sql'] for query in queries if 'FROM "core_patient"' in query['sql']]
+        self.assertEqual(len(page_queries), 2)
+        self.assertIn('LIMIT 2', page_queries[0])
+        self.assertIn('"core_patient"."id" >', page_queries[1])
+
+    async def test_asgi_export_is_streamed(self):
+        client = AsyncClient()
+        await client.aforce_login(self.users['admin'])
+        response = await client.get('/api/patients/export/', {'output': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.splitlines()), self.patients)
@@ -0,0 +1,98 @@
+from django.forms.models import model_to_dict
+
+from core.feedback_summary import rebuild_feedback_summaries
+from core.models import Feedback, Patient, PractitionerFeedbackSummary, TreatmentPlan, TreatmentPlanFeedbackSummary
+
+from .utils import ClinicTestCase, client_for
+
+
+class FeedbackSummaryTests(ClinicTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.patient = Patient.objects.get(user=cls.users['patient'])
+        cls.plan = TreatmentPlan.objects.get(patient=cls.patient)
+        cls.other_plan = TreatmentPlan.objects.exclude(pk=cls.plan.pk).first()
+
+    def summary(self):
+        return PractitionerFeedbackSummary.objects.get(practitioner=self.practitioner)
+
+    def plan_summary(self, plan):
+        return TreatmentPlanFeedbackSummary.objects.get(treatment_plan=plan)
+
+    def snapshot(self):
+        # Running totals leave a zeroed row behind when the last feedback goes; a rebuild writes none.
+        return {
+            model: [
+                model_to_dict(row, exclude=['updated_at'])
+                for row in model.objects.filter(feedback_count__gt=0).order_by('pk')
+            ]
+            for model in (PractitionerFeedbackSummary, TreatmentPlanFeedbackSummary)
+        }
+
+    def add_feedback(self, **fields):
+        return Feedback.objects.create(
+            patient=self.patient, practitioner=self.practitioner, title='Okay', comment='Fine',
+            **{'treatment_plan': self.plan, 'rating': 2, **fields},
+        )
+
+    def test_sample_clinic_totals(self):
+        summary = self.summary()
+        self.assertEqual(summary.feedback_count, self.patients)
+        self.assertEqual(summary.average_rating, 5)
+        self.assertEqual(summary.rating_histogram, {'1': 0, '2': 0, '3': 0, '4': 0, '5': self.patients})
+        self.assertEqual(self.plan_summary(self.plan).feedback_count, 1)
+
+    def test_saves_and_deletes_move_the_totals(self):
+        feedback = self.add_feedback(practitioner_care=4, would_recommend=False)
+        summary = self.summary()
+        self.assertEqual(summary.feedback_count, 4)
+        self.assertEqual(summary.average_rating, 4.25)
+        self.assertEqual(summary.rating_2, 1)
+        self.assertEqual(summary.score_averages['practitioner_care'], 4)
+        self.assertIsNone(summary.score_averages['facility_cleanliness'])
+        self.assertEqual(summary.would_recommend_rate, 0.75)
+
+        feedback.rating = 3
+        feedback.treatment_plan = self.other_plan
+        feedback.save()
+        self.assertEqual((self.summary().rating_2, self.summary().rating_3), (0, 1))
+        self.assertEqual(self.plan_summary(self.plan).feedback_count, 1)
+        self.assertEqual(self.plan_summary(self.other_plan).feedback_count, 2)
+
+        feedback.delete()
+        self.assertEqual(self.summary().feedback_count, self.patients)
+        self.assertEqual(self.summary().practitioner_care_count, 0)
+        self.assertEqual(self.plan_summary(self.other_plan).feedback_count, 1)
+
+    def test_running_totals_match_a_rebuild(self):
+        first = self.add_feedback(rating=1, overall_satisfaction=2)
+        self.add_feedback(rating=4, treatment_plan=None, facility_cleanliness=5)
+        first.rating = 3
+        first.save()
+        Feedback.objects.filter(patient__last_name='2').delete()
+        maintained = self.snapshot()
+
+        written = rebuild_feedback_summaries(batch_size=1)
+        self.assertEqual(self.snapshot(), maintained)
+        self.assertEqual(written[TreatmentPlanFeedbackSummary], len(maintained[TreatmentPlanFeedbackSummary]))
+        self.assertEqual(written[PractitionerFeedbackSummary], 1)
+
+    def test_deleting_the_plan_drops_its_summary(self):
+        self.plan.delete()
+        self.assertFalse(TreatmentPlanFeedbackSummary.objects.filter(treatment_plan_id=self.plan.pk).exists())
+        self.assertEqual(self.summary().feedback_count, self.patients - 1)
+
+    def test_api(self):
+        response = client_for(self.users['patient']).get(f'/api/practitioners/{self.practitioner.pk}/feedback_summary/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['feedback_count'], self.patients)
+        self.assertEqual(response.data['practitioner_name'], str(self.practitioner))
+
+        response = client_for(self.users['patient']).get('/api/feedback/summaries/', {'by': 'treatment_plan'})
+        self.assertEqual([row['treatment_plan'] for row in response.data['results']], [self.plan.pk])
+        response = client_for(self.users['admin']).get('/api/feedback/summaries/', {'by': 'treatment_plan'})
+        self.assertEqual(len(response.data['results']), self.patients)
+        response = client_for(self.users['admin']).get('/api/feedback/summaries/', {'by': 'patient'})
+        self.assertEqual(response.status_code, 400)
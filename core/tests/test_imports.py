@@ -0,0 +1,111 @@
+import csv
+import io
+import tempfile
+from datetime import date, timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+
+from core.imports import PatientImporter, read_rows
+from core.models import Appointment, CareRelationship, Patient
+
+from .utils import ClinicTestCase, client_for
+
+HEADER = 'first_name,last_name,date_of_birth,phone,email\n'
+
+
+class ImportTests(ClinicTestCase):
+    patients = 1
+
+    def upload(self, name, content, role='admin', **params):
+        upload = SimpleUploadedFile(name, content if isinstance(content, bytes) else content.encode())
+        url = '/api/patients/import/' if name.startswith('patients') else '/api/appointments/import/'
+        if params:
+            url += '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        return client_for(self.users[role]).post(url, {'file': upload}, format='multipart')
+
+    def imported(self):
+        return set(Patient.objects.filter(phone__startswith='import-').values_list('email', flat=True))
+
+    def test_bad_rows_are_reported_and_the_rest_imported(self):
+        response = self.upload('patients.csv', HEADER + (
+            'Asha,Rao,1990-04-01,import-1,asha@clinic.test\n'
+            'Bad,Date,not-a-date,import-2,bad@clinic.test\n'
+            'Taken,Phone,1991-05-02,budget-phone-0,taken@clinic.test\n'
+            'Vikram,Nair,1988-11-30,import-3,vikram@clinic.test\n'
+            'Same,Phone,1988-11-30,import-3,same@clinic.test\n'
+        ))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 3))
+        errors = {error['row']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(set(errors), {3, 4, 6})
+        self.assertIn('date_of_birth', errors[3])
+        self.assertIn('phone', errors[4])
+        self.assertEqual(errors[6]['phone'], ['Row 5 has the same phone.'])
+        self.assertEqual(self.imported(), {'asha@clinic.test', 'vikram@clinic.test'})
+        self.assertFalse(Patient.objects.get(email='asha@clinic.test').user.has_usable_password())
+
+    def test_json_lines(self):
+        response = self.upload('patients.jsonl', (
+            '{"first_name": "Asha", "last_name": "Rao", "date_of_birth": "1990-04-01", '
+            '"phone": "import-1", "email": "asha@clinic.test"}\n'
+            '\n'
+            'not json\n'
+            '[1, 2]\n'
+        ))
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 2))
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 4])
+
+    def test_rows_span_batches(self):
+        rows = ''.join(f'P,{i},1990-01-01,import-{i},p{i}@clinic.test\n' for i in range(5))
+        report = PatientImporter(batch_size=2).run(read_rows(io.BytesIO((HEADER + rows).encode())))
+        self.assertEqual((report['created'], report['failed']), (5, 0))
+        self.assertEqual(len(self.imported()), 5)
+
+    def test_undecodable_line_stops_the_import(self):
+        response = self.upload('patients.csv', HEADER.encode() + (
+            b'Asha,Rao,1990-04-01,import-1,asha@clinic.test\n'
+            b'Bad,\xff\xfe,1990-04-01,import-2,bad@clinic.test\n'
+            b'Vikram,Nair,1988-11-30,import-3,vikram@clinic.test\n'
+        ))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['line'], 3)
+        self.assertEqual(response.data['error'], 'Line 3: not valid UTF-8 text.')
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(self.imported(), {'asha@clinic.test'})
+
+    def test_malformed_csv_record_stops_the_import(self):
+        oversized = 'x' * (csv.field_size_limit() + 1)
+        response = self.upload('patients.csv', f'{HEADER}Asha,Rao,1990-04-01,import-1,{oversized}\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['line'], 2)
+        self.assertIn('field larger than field limit', response.data['error'])
+
+    def test_appointments_by_reference(self):
+        patient = Patient.objects.get()
+        day = (date.today() + timedelta(days=30)).isoformat()
+        response = self.upload('appointments.csv', (
+            'patient_phone,practitioner_license_number,appointment_date,appointment_time\n'
+            f'{patient.phone},{self.practitioner.license_number},{day},10:00\n'
+            f'{patient.phone},{self.practitioner.license_number},{day},10:30\n'
+            f'nobody,{self.practitioner.license_number},{day},12:00\n'
+        ))
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 2))
+        errors = {error['row']: error['errors'] for error in response.data['errors']}
+        self.assertIn('Overlaps row 2', errors[3]['appointment_time'][0])
+        self.assertIn('patient_phone', errors[4])
+        self.assertTrue(Appointment.objects.filter(appointment_date=day).exists())
+        self.assertTrue(CareRelationship.objects.filter(patient=patient, practitioner=self.practitioner).exists())
+
+    def test_only_admins_can_import(self):
+        response = self.upload('patients.csv', b'first_name\nAsha\n', role='doctor')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.upload('patients.csv', HEADER, input='xlsx').status_code, 400)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile(suffix='.csv') as file:
+            file.write(HEADER.encode() + b'Asha,Rao,1990-04-01,import-1,asha@clinic.test\n\xff\n')
+            file.flush()
+            with self.assertRaisesMessage(CommandError, 'Line 3: not valid UTF-8 text. The import stopped there'):
+                call_command('import_records', 'patients', file.name, stdout=io.StringIO())
+        self.assertEqual(self.imported(), {'asha@clinic.test'})
@@ -0,0 +1,21 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from core.management.commands.explain_queries import Command as ExplainQueries
+
+from .utils import ClinicTestCase
+
+
+class ExplainQueriesTests(ClinicTestCase):
+
+    def test_list_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        self.assertNotIn('full-table scan', out.getvalue())
+        self.assertIn('appointments     doctor   first page: ok', out.getvalue())
+
+    def test_full_scan_detection(self):
+        self.assertTrue(ExplainQueries.is_full_scan('2 0 0 SCAN core_appointment'))
+        self.assertFalse(ExplainQueries.is_full_scan('2 0 0 SCAN core_appointment USING INDEX appt_date_idx'))
+        self.assertFalse(ExplainQueries.is_full_scan('2 0 0 SEARCH core_appointment USING INDEX appt_patient_idx (patient_id=?)'))
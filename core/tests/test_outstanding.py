@@ -0,0 +1,96 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from core.models import Patient, Practitioner, TreatmentPlan
+
+from .utils import ClinicTestCase, client_for
+
+
+class OutstandingBalanceTests(ClinicTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.paid_up, cls.owing, cls.old = TreatmentPlan.objects.order_by('patient__last_name')
+        TreatmentPlan.objects.filter(pk=cls.paid_up.pk).update(paid_amount=Decimal('50000.00'))
+        TreatmentPlan.objects.filter(pk=cls.owing.pk).update(paid_amount=Decimal('9999.50'))
+        TreatmentPlan.objects.filter(pk=cls.old.pk).update(start_date=date(2020, 3, 1))
+        other_doctor = get_user_model().objects.create_user('balance_doctor', password='x', user_type='doctor')
+        cls.other = Practitioner.objects.create(
+            user=other_doctor, first_name='Meera', last_name='Iyer',
+            specialization='Nadi Pariksha', qualification='BAMS', phone='balance-doc-phone',
+            email='balance_doctor@clinic.test', license_number='BALANCE-LIC-1', consultation_fee=Decimal('900.00'),
+        )
+        cls.second = TreatmentPlan.objects.create(
+            patient=cls.paid_up.patient, practitioner=cls.other, title='Follow-up', description='',
+            primary_diagnosis='Vata', treatment_type='Shamana', start_date=date(2020, 3, 15),
+            end_date=date(2020, 4, 15), total_sessions=4,
+            total_cost=Decimal('1000.00'), paid_amount=Decimal('0.00'), status='active',
+        )
+
+    def get(self, url, role='admin', **params):
+        response = client_for(self.users[role]).get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['results']
+
+    def test_remaining_amount_db(self):
+        plans = TreatmentPlan.objects.with_remaining_amount()
+        self.assertEqual(plans.get(pk=self.owing.pk).remaining_amount_db, Decimal('40000.50'))
+        self.assertEqual(
+            [plan.pk for plan in plans.outstanding().filter(remaining_amount_db__lt=30000).order_by('remaining_amount_db')],
+            [self.second.pk, self.old.pk],
+        )
+        for plan in plans:
+            with self.subTest(plan=plan.pk):
+                self.assertEqual(plan.remaining_amount, plan.total_cost - plan.paid_amount)
+
+    def test_outstanding_plans_largest_first(self):
+        rows = self.get('/api/treatment-plans/outstanding/', fields='id,remaining_amount')
+        self.assertEqual(rows, [
+            {'id': self.owing.pk, 'remaining_amount': Decimal('40000.50')},
+            {'id': self.old.pk, 'remaining_amount': Decimal('25000.00')},
+            {'id': self.second.pk, 'remaining_amount': Decimal('1000.00')},
+        ])
+        rows = self.get('/api/treatment-plans/outstanding/', role='doctor')
+        self.assertEqual([row['id'] for row in rows], [self.owing.pk, self.old.pk])
+
+    def test_balances_per_practitioner(self):
+        rows = self.get('/api/treatment-plans/outstanding_balances/')
+        self.assertEqual(rows, [
+            {
+                'practitioner': self.practitioner.pk, 'practitioner_name': str(self.practitioner), 'plans': 2,
+                'total_cost': '100000.00', 'paid_amount': '34999.50', 'remaining_amount': '65000.50',
+            },
+            {
+                'practitioner': self.other.pk, 'practitioner_name': str(self.other), 'plans': 1,
+                'total_cost': '1000.00', 'paid_amount': '0.00', 'remaining_amount': '1000.00',
+            },
+        ])
+
+    def test_balances_per_month_and_patient(self):
+        rows = self.get('/api/treatment-plans/outstanding_balances/', group_by='month,patient')
+        this_month = date.today().isoformat()[:7]
+        self.assertEqual(
+            [(row['month'], row['patient'], row['remaining_amount']) for row in rows],
+            sorted([
+                ('2020-03', self.old.patient_id, '25000.00'),
+                ('2020-03', self.second.patient_id, '1000.00'),
+                (this_month, self.owing.patient_id, '40000.50'),
+            ]),
+        )
+        self.assertEqual(rows[0]['patient_name'], str(Patient.objects.get(pk=rows[0]['patient'])))
+        self.assertNotIn('practitioner', rows[0])
+
+    def test_balances_are_scoped(self):
+        rows = self.get('/api/treatment-plans/outstanding_balances/', role='patient')
+        self.assertEqual([(row['practitioner'], row['remaining_amount']) for row in rows], [(self.other.pk, '1000.00')])
+
+    def test_unknown_group(self):
+        for group_by in ('plan', ',', 'practitioner,plan'):
+            with self.subTest(group_by=group_by):
+                response = client_for(self.users['admin']).get(
+                    '/api/treatment-plans/outstanding_balances/', {'group_by': group_by},
+                )
+                self.assertEqual(response.status_code, 400)
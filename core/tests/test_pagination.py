@@ -0,0 +1,50 @@
+from datetime import date, time
+
+from core.models import Patient, Appointment
+
+from .utils import ClinicTestCase, client_for
+
+
+class CursorPaginationTests(ClinicTestCase):
+    patients = 23
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Every row ties on the ordering, so pages are split on the pk alone.
+        Appointment.objects.update(appointment_date=date.today(), appointment_time=time(9, 0))
+
+    def walk(self, url, link='next'):
+        client = client_for(self.users['admin'])
+        ids, pages = [], []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data[link]
+        return ids, pages
+
+    def test_walk_returns_every_row_once_in_order(self):
+        ids, pages = self.walk('/api/appointments/?page_size=5')
+        expected = list(Appointment.objects.order_by('-appointment_date', '-appointment_time', '-pk')
+                        .values_list('pk', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual([len(page['results']) for page in pages], [5, 5, 5, 5, 3])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_walk_back_from_the_last_page(self):
+        forward, pages = self.walk('/api/patients/?page_size=4')
+        _, earlier = self.walk(pages[-1]['previous'], link='previous')
+        # Each page keeps its own order; pages come back last to first.
+        backward = [row['id'] for page in reversed(earlier) for row in page['results']]
+        self.assertEqual(backward + [row['id'] for row in pages[-1]['results']], forward)
+        self.assertIsNone(earlier[-1]['previous'])
+
+    def test_walk_with_sparse_fields(self):
+        ids, _ = self.walk('/api/patients/?page_size=4&fields=id')
+        self.assertEqual(ids, list(Patient.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)))
+
+    def test_invalid_cursor(self):
+        response = client_for(self.users['admin']).get('/api/patients/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,21 @@
+from core.management.commands.check_query_budget import QUERY_BUDGETS
+
+from .utils import ClinicTestCase, client_for
+
+
+class ListQueryBudgetTests(ClinicTestCase):
+    patients = 10
+
+    def test_lists_stay_within_their_query_budget(self):
+        for url, budgets in QUERY_BUDGETS.items():
+            for role, budget in budgets.items():
+                with self.subTest(url=url, role=role):
+                    client = client_for(self.users[role])
+                    with self.assertNumQueries(budget):
+                        response = client.get(url)
+                    self.assertEqual(response.status_code, 200)
+
+    def test_names_come_from_the_page_query(self):
+        response = client_for(self.users['admin']).get('/api/appointments/')
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['results'][0]['practitioner_name'], 'Dr. Raj Sharma')
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.models import Appointment, Notification, Patient
+from core.reminders import _flush, appointments_needing_reminders, build_reminder, generate_appointment_reminders
+
+from .utils import ClinicTestCase, client_for
+
+
+class ReminderTests(ClinicTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        starts_at = timezone.localtime() + timedelta(hours=2)
+        cls.appointment = Appointment.objects.create(
+            patient=Patient.objects.get(user=cls.users['patient']), practitioner=cls.practitioner,
+            appointment_date=starts_at.date(), appointment_time=starts_at.time().replace(microsecond=0),
+        )
+
+    def reminders(self):
+        return Notification.objects.filter(appointment=self.appointment, notification_type='appointment_reminder')
+
+    def test_running_twice_creates_one_reminder(self):
+        self.assertEqual(generate_appointment_reminders(dry_run=True), 1)
+        self.assertFalse(self.reminders().exists())
+        self.assertEqual(generate_appointment_reminders(), 1)
+        self.assertEqual(generate_appointment_reminders(), 0)
+        self.assertEqual(self.reminders().count(), 1)
+
+    def test_reminders_created_meanwhile_are_not_counted(self):
+        now = timezone.now()
+        rows = list(appointments_needing_reminders(now, now + timedelta(hours=24)))
+        self.assertEqual(len(rows), 1)
+        batch = [build_reminder(rows[0], timedelta(hours=24), now)]
+        # Another run reminds the appointment between our select and insert.
+        Notification.objects.create(
+            title='Appointment Reminder', message='Soon', notification_type='appointment_reminder',
+            patient=self.appointment.patient, appointment=self.appointment,
+        )
+        self.assertEqual(_flush(batch, dry_run=False), 0)
+        self.assertEqual(self.reminders().count(), 1)
+
+    def test_second_reminder_through_the_api_is_a_validation_error(self):
+        generate_appointment_reminders()
+        response = client_for(self.users['admin']).post('/api/notifications/', {
+            'title': 'Reminder', 'message': 'Again', 'notification_type': 'appointment_reminder',
+            'patient': self.appointment.patient_id, 'appointment': self.appointment.pk,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('appointment', response.data)
+        self.assertEqual(self.reminders().count(), 1)
@@ -0,0 +1,110 @@
+from datetime import date, datetime, time, timedelta
+
+from django.test import SimpleTestCase
+
+from core.models import Appointment, Patient
+from core.scheduling import IntervalIndex, find_conflict, free_slots, parse_days, parse_hours
+
+from .utils import ClinicTestCase, client_for
+
+
+class ScheduleParsingTests(SimpleTestCase):
+
+    def test_days(self):
+        self.assertEqual(parse_days('Monday to Saturday'), frozenset(range(6)))
+        self.assertEqual(parse_days('Tue, Thu and Sat'), frozenset({1, 3, 5}))
+        self.assertEqual(parse_days('Saturday to Tuesday'), frozenset({5, 6, 0, 1}))
+        self.assertEqual(parse_days('Daily'), frozenset(range(7)))
+        with self.assertRaises(ValueError):
+            parse_days('Someday')
+
+    def test_hours(self):
+        self.assertEqual(parse_hours('10 AM to 1 PM, 3 PM to 7 PM'), [(time(10), time(13)), (time(15), time(19))])
+        self.assertEqual(parse_hours('09:00-17:00'), [(time(9), time(17))])
+        with self.assertRaises(ValueError):
+            parse_hours('5 PM - 9 AM')
+
+
+class IntervalIndexTests(SimpleTestCase):
+
+    def test_conflicts(self):
+        day = datetime(2030, 1, 7)
+        index = IntervalIndex([
+            (day.replace(hour=9), day.replace(hour=12), 'long'),
+            (day.replace(hour=10), day.replace(hour=11), 'short'),
+        ])
+        # The long booking still covers 11:30 although a later one ends at 11.
+        self.assertEqual(index.conflict(day.replace(hour=11, minute=30), day.replace(hour=13)), 'long')
+        self.assertIsNone(index.conflict(day.replace(hour=12), day.replace(hour=13)))
+        self.assertIsNone(index.conflict(day.replace(hour=8), day.replace(hour=9)))
+
+
+class AppointmentOverlapTests(ClinicTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.patient = Patient.objects.get(user=cls.users['patient'])
+        cls.day = date.today() + timedelta(days=30)
+        cls.booked = Appointment.objects.create(
+            patient=cls.patient, practitioner=cls.practitioner,
+            appointment_date=cls.day, appointment_time=time(10, 0), duration_minutes=60,
+        )
+
+    def book(self, at, day=None):
+        return client_for(self.users['admin']).post('/api/appointments/', {
+            'patient': self.patient.pk, 'practitioner': self.practitioner.pk,
+            'appointment_date': (day or self.day).isoformat(), 'appointment_time': at,
+        }, format='json')
+
+    def test_overlapping_booking_is_rejected(self):
+        response = self.book('10:30')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(f'appointment {self.booked.pk}', response.data['appointment_time'][0])
+        self.assertEqual(Appointment.objects.filter(appointment_date=self.day).count(), 1)
+
+    def test_booking_starting_when_another_ends_is_accepted(self):
+        self.assertEqual(self.book('11:00').status_code, 201)
+
+    def test_booking_overlapping_one_from_the_day_before(self):
+        Appointment.objects.create(
+            patient=self.patient, practitioner=self.practitioner,
+            appointment_date=self.day + timedelta(days=1), appointment_time=time(23, 30), duration_minutes=90,
+        )
+        self.assertIsNotNone(find_conflict(self.practitioner, self.day + timedelta(days=2), time(0, 30), 30))
+        self.assertEqual(self.book('00:30', day=self.day + timedelta(days=2)).status_code, 400)
+        self.assertEqual(self.book('01:00', day=self.day + timedelta(days=2)).status_code, 201)
+
+    def test_cancelled_appointments_free_their_slot(self):
+        Appointment.objects.filter(pk=self.booked.pk).update(status='cancelled')
+        self.assertEqual(self.book('10:30').status_code, 201)
+
+
+class AvailableSlotsTests(ClinicTestCase):
+
+    def slots(self, **params):
+        return client_for(self.users['patient']).get(
+            f'/api/practitioners/{self.practitioner.pk}/available_slots/', params,
+        )
+
+    def test_booked_slots_are_left_out(self):
+        monday = date.today() + timedelta(days=7 - date.today().weekday())
+        Appointment.objects.create(
+            patient=Patient.objects.first(), practitioner=self.practitioner,
+            appointment_date=monday, appointment_time=time(10, 0),
+        )
+        slots = free_slots(self.practitioner, start_date=monday, days=7)
+        self.assertEqual(len(slots), 6)  # Monday to Saturday
+        self.assertNotIn(time(10, 0), slots[monday])
+        self.assertEqual(slots[monday], [time(9), *(time(hour) for hour in range(11, 17))])
+
+        response = self.slots(start=monday.isoformat(), days=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['slots'][monday.isoformat()][:2], ['09:00', '11:00'])
+
+    def test_invalid_parameters(self):
+        response = self.slots(days='x')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'days must be a whole number.'})
+        self.assertEqual(self.slots(duration='1.5').data, {'error': 'duration must be a whole number.'})
+        self.assertEqual(self.slots(start='soon').status_code, 400)
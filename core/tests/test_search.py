@@ -0,0 +1,83 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+
+from core.models import Patient, TreatmentPlan
+from core.search import match_expression, search
+
+from .utils import ClinicTestCase, client_for
+
+
+class SearchTests(ClinicTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.by_name = cls.add_patient('fts_1', 'Ramesh', 'Sharma')
+        cls.by_history = cls.add_patient('fts_2', 'Kamala', 'Devi', medical_history='Referred by Dr. Sharma')
+
+    @classmethod
+    def add_patient(cls, username, first_name, last_name, **fields):
+        user = get_user_model().objects.create_user(username, password='x')
+        return Patient.objects.create(
+            user=user, first_name=first_name, last_name=last_name, date_of_birth=date(1990, 1, 1),
+            phone=f'{username}-phone', email=f'{username}@clinic.test', **fields,
+        )
+
+    def found(self, text, queryset=None):
+        return list(search(Patient.objects.all() if queryset is None else queryset, text))
+
+    def api_ids(self, role, text):
+        response = client_for(self.users[role]).get('/api/patients/', {'q': text})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_match_expression(self):
+        self.assertEqual(match_expression('Ram  Sh!'), '"ram"* "sh"*')
+        self.assertEqual(match_expression('a b'), '"a" "b"')
+        self.assertEqual(match_expression('"); DROP'), '"drop"*')
+        self.assertEqual(match_expression('  '), '')
+        self.assertEqual(self.found('!!'), [])
+
+    def test_every_word_matches_as_a_prefix(self):
+        self.assertEqual(self.found('ram sha'), [self.by_name])
+        self.assertEqual(self.found('kam'), [self.by_history])
+        self.assertEqual(self.found('ramesh devi'), [])
+
+    def test_names_outrank_free_text(self):
+        self.assertEqual(self.found('sharma'), [self.by_name, self.by_history])
+
+    def test_index_follows_writes(self):
+        self.by_name.first_name = 'Suresh'
+        self.by_name.save()
+        self.assertEqual(self.found('ramesh'), [])
+        self.assertEqual(self.found('suresh'), [self.by_name])
+
+        # Queryset updates send no signals; the triggers still see them.
+        Patient.objects.filter(pk=self.by_history.pk).update(last_name='Nair')
+        self.assertEqual(self.found('nair'), [self.by_history])
+        Patient.objects.filter(pk=self.by_history.pk).delete()
+        self.assertEqual(self.found('nair'), [])
+
+    def test_treatment_plans(self):
+        plan = TreatmentPlan.objects.first()
+        plan.title = 'Shirodhara course'
+        plan.save()
+        self.assertEqual(list(search(TreatmentPlan.objects.all(), 'shiro')), [plan])
+
+    def test_api_search_keeps_role_scoping(self):
+        self.assertEqual(self.api_ids('admin', 'sharma'), [self.by_name.pk, self.by_history.pk])
+        # Neither patient has seen the doctor, so neither is in their list.
+        self.assertEqual(self.api_ids('doctor', 'sharma'), [])
+        self.assertEqual(len(self.api_ids('doctor', 'patient')), self.patients)
+        own = Patient.objects.get(user=self.users['patient'])
+        self.assertEqual(self.api_ids('patient', 'patient'), [own.pk])
+        self.assertEqual(self.api_ids('patient', 'sharma'), [])
+
+    def test_large_unscoped_matches_come_newest_first(self):
+        with mock.patch('core.search.RANK_MAX_MATCHES', 1):
+            self.assertEqual(self.found('sharma'), [self.by_history, self.by_name])
+            # A scope through another table is always ranked.
+            scoped = Patient.objects.filter(user__is_active=True)
+            self.assertEqual(self.found('sharma', scoped), [self.by_name, self.by_history])
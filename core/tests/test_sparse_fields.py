@@ -0,0 +1,59 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Patient
+from core.serializers import PatientSerializer
+
+from .utils import ClinicTestCase, client_for
+
+
+class SparseFieldsTests(ClinicTestCase):
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = client_for(self.users['admin']).get(url, params)
+        return response, [query['sql'] for query in queries]
+
+    def page_query(self, queries, table):
+        return next(sql for sql in queries if sql.startswith('SELECT') and f'FROM "{table}"' in sql)
+
+    def test_lists_default_to_the_compact_fields(self):
+        response, queries = self.get('/api/patients/')
+        self.assertEqual(set(response.data['results'][0]), set(PatientSerializer.Meta.list_fields))
+        self.assertNotIn('"medical_history"', self.page_query(queries, 'core_patient'))
+
+        patient = Patient.objects.first()
+        response, _ = self.get(f'/api/patients/{patient.pk}/')
+        self.assertIn('medical_history', response.data)
+
+    def test_fields_prune_columns_and_joins(self):
+        response, queries = self.get('/api/treatment-plans/', fields='id,practitioner_name,remaining_amount')
+        self.assertEqual(response.status_code, 200)
+        row = response.data['results'][0]
+        self.assertEqual(row, {'id': row['id'], 'practitioner_name': 'Dr. Raj Sharma', 'remaining_amount': 25000})
+        sql = self.page_query(queries, 'core_treatmentplan')
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('"core_patient"', sql)
+        self.assertIn('"core_practitioner"."first_name"', sql)
+        # Every value came from the page query; nothing was loaded per row.
+        tables = ('FROM "core_treatmentplan"', 'FROM "core_practitioner"', 'FROM "core_patient"')
+        self.assertEqual(len([sql for sql in queries if any(table in sql for table in tables)]), 1)
+
+    def test_omit(self):
+        response, queries = self.get('/api/appointments/', omit='notes,patient_name')
+        row = response.data['results'][0]
+        self.assertNotIn('notes', row)
+        self.assertNotIn('patient_name', row)
+        self.assertIn('practitioner_name', row)
+        self.assertNotIn('"notes"', self.page_query(queries, 'core_appointment'))
+
+    def test_fields_apply_to_details(self):
+        patient = Patient.objects.first()
+        response, _ = self.get(f'/api/patients/{patient.pk}/', fields='id,phone')
+        self.assertEqual(response.data, {'id': patient.pk, 'phone': patient.phone})
+
+    def test_unknown_fields_are_rejected(self):
+        response, _ = self.get('/api/patients/', fields='id,shoe_size')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'fields': ['Unknown field(s): shoe_size.']})
+        self.assertEqual(self.get('/api/patients/', omit='nope')[0].status_code, 400)
@@ -0,0 +1,63 @@
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.sqlite_stress import run_profile
+
+ALIAS = 'sqlite_profile_test'
+
+
+class ProductionProfileTests(SimpleTestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+    def connect(self, **options):
+        profile = settings.SQLITE_PRODUCTION_PROFILE
+        database = {**profile, 'OPTIONS': {**profile['OPTIONS'], **options}}
+        connections.settings[ALIAS] = connections.configure_settings({
+            'default': connections.settings['default'],
+            ALIAS: {**database, 'NAME': str(Path(self.workdir.name) / 'profile.sqlite3'), 'TEST': {}},
+        })[ALIAS]
+
+        def disconnect():
+            connections[ALIAS].close()
+            del connections[ALIAS]
+            del connections.settings[ALIAS]
+        self.addCleanup(disconnect)
+        return connections[ALIAS]
+
+    def test_pragmas_are_applied_to_new_connections(self):
+        connection = self.connect()
+        with connection.cursor() as cursor:
+            for name, expected in [('journal_mode', 'wal'), ('synchronous', 1), ('busy_timeout', 5000)]:
+                cursor.execute(f'PRAGMA {name}')
+                self.assertEqual(cursor.fetchone()[0], expected)
+
+    def test_atomic_begins_immediate(self):
+        connection = self.connect()
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic(using=ALIAS):
+                connection.cursor().execute('SELECT 1')
+        self.assertEqual(queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+    def test_unknown_transaction_mode(self):
+        connection = self.connect(transaction_mode='eventually')
+        with self.assertRaises(ImproperlyConfigured):
+            with transaction.atomic(using=ALIAS):
+                pass
+
+    def test_concurrent_writers_are_not_locked_out(self):
+        result = run_profile(
+            'test', settings.SQLITE_PRODUCTION_PROFILE, Path(self.workdir.name) / 'stress.sqlite3',
+            writers=4, readers=1, seconds=0.5,
+        )
+        self.assertGreater(result['writes'], 0)
+        self.assertEqual(result['failed_writes'], 0, result['errors'])
+        self.assertTrue(result['consistent'])
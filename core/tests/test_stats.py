@@ -0,0 +1,53 @@
+from datetime import date, time
+
+from django.core.cache import caches
+
+from core.models import Appointment, Patient
+from core.stats import CACHE_ALIAS, CACHE_KEY
+
+from .utils import ClinicTestCase, client_for
+
+
+class DashboardStatsTests(ClinicTestCase):
+
+    def stats(self, role):
+        response = client_for(self.users[role]).get('/api/dashboard-stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def book(self, patient):
+        return Appointment.objects.create(
+            patient=patient, practitioner=self.practitioner,
+            appointment_date=date(2030, 1, 1), appointment_time=time(9, 0),
+        )
+
+    def test_figures_are_scoped_by_role(self):
+        admin, doctor, patient = self.stats('admin'), self.stats('doctor'), self.stats('patient')
+        self.assertEqual(admin['patients']['total'], 3)
+        self.assertEqual(doctor['patients'], {'total': 3})
+        self.assertNotIn('patients', patient)
+        self.assertEqual(admin['appointments']['total'], 3)
+        self.assertEqual(patient['appointments']['total'], 1)
+        self.assertEqual(patient['treatment_plans']['remaining_amount'], 25000)
+        self.assertEqual(doctor['feedback']['average_rating'], 5)
+
+    def test_stats_are_cached_in_the_shared_cache(self):
+        self.stats('doctor')
+        key = CACHE_KEY.format(version=0, user_id=self.users['doctor'].pk)
+        self.assertIsNotNone(caches[CACHE_ALIAS].get(key))
+        with self.assertNumQueries(0):
+            self.stats('doctor')
+
+    def test_a_write_drops_the_affected_stats(self):
+        for role in ('admin', 'doctor', 'patient'):
+            self.stats(role)
+        self.book(Patient.objects.get(user=self.users['patient']))
+        self.assertEqual(self.stats('admin')['appointments']['total'], 4)
+        self.assertEqual(self.stats('doctor')['appointments']['total'], 4)
+        self.assertEqual(self.stats('patient')['appointments']['total'], 2)
+
+    def test_a_write_keeps_unaffected_users_stats(self):
+        self.stats('patient')
+        self.book(Patient.objects.exclude(user=self.users['patient']).first())
+        with self.assertNumQueries(0):
+            self.assertEqual(self.stats('patient')['appointments']['total'], 1)
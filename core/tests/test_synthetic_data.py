@@ -0,0 +1,84 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Sum
+from django.test import TestCase
+
+from core.models import (
+    Appointment, CareRelationship, Feedback, Notification, Patient, Practitioner, PractitionerFeedbackSummary,
+    TreatmentPlan,
+)
+from core.sample_data import local_caches
+from core.search import search
+from core.synthetic_data import Scale, SyntheticDataGenerator
+
+from .utils import fast_password_hashing
+
+SCALE = Scale(practitioners=3, patients=40, appointments=300)
+ANCHOR = date(2030, 1, 7)
+
+
+@fast_password_hashing
+@local_caches()
+class SyntheticDataTests(TestCase):
+
+    def generate(self, seed=0):
+        return SyntheticDataGenerator(SCALE, seed=seed, batch_size=50, anchor=ANCHOR).generate()
+
+    def snapshot(self):
+        return (
+            list(Patient.objects.order_by('pk').values_list('pk', 'first_name', 'last_name', 'phone')),
+            list(Appointment.objects.order_by('pk').values_list(
+                'pk', 'patient_id', 'practitioner_id', 'appointment_date', 'appointment_time', 'status',
+            )),
+        )
+
+    def test_counts(self):
+        counts = self.generate()
+        for model, expected in [
+            (Practitioner, 3), (Patient, 40), (TreatmentPlan, 40), (Appointment, 300),
+            (Notification, 60), (Feedback, 8),
+        ]:
+            with self.subTest(model=model.__name__):
+                self.assertEqual(model.objects.count(), expected)
+                self.assertEqual(counts[model.__name__], expected)
+        self.assertEqual(get_user_model().objects.count(), 43)
+
+    def test_same_seed_same_rows(self):
+        self.generate(seed=7)
+        first = self.snapshot()
+        get_user_model().objects.all().delete()
+        self.generate(seed=7)
+        self.assertEqual(self.snapshot(), first)
+
+        get_user_model().objects.all().delete()
+        self.generate(seed=8)
+        self.assertNotEqual(self.snapshot(), first)
+
+    def test_schedules_are_consistent(self):
+        self.generate()
+        appointments = Appointment.objects.all()
+        self.assertFalse(
+            appointments.values('practitioner', 'appointment_date', 'appointment_time')
+            .annotate(n=Count('pk')).filter(n__gt=1).exists()
+        )
+        for day, at in appointments.values_list('appointment_date', 'appointment_time'):
+            self.assertLess(day.weekday(), 6)
+            self.assertTrue(9 <= at.hour < 17)
+        # Every patient sees one practitioner.
+        self.assertFalse(
+            appointments.values('patient').annotate(n=Count('practitioner', distinct=True)).filter(n__gt=1).exists()
+        )
+
+    def test_derived_tables_are_rebuilt(self):
+        self.generate()
+        self.assertEqual(
+            set(CareRelationship.objects.values_list('practitioner_id', 'patient_id')),
+            set(Appointment.objects.values_list('practitioner_id', 'patient_id'))
+            | set(TreatmentPlan.objects.values_list('practitioner_id', 'patient_id')),
+        )
+        self.assertEqual(
+            PractitionerFeedbackSummary.objects.aggregate(total=Sum('feedback_count'))['total'], Feedback.objects.count(),
+        )
+        patient = Patient.objects.first()
+        self.assertIn(patient, search(Patient.objects.all(), patient.phone))
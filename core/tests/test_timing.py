@@ -0,0 +1,80 @@
+import json
+import re
+
+from django.test import SimpleTestCase, override_settings
+
+from core.timing import RequestTimings, _current, measure
+
+from .utils import ClinicTestCase, client_for, fake_llm
+
+TIMED = {'ENABLED': True, 'SAMPLE_PERCENT': 100, 'HEADER': True, 'LOG': True}
+
+
+def metrics(header):
+    """{name: {param: value}} of a Server-Timing header."""
+    parsed = {}
+    for metric in header.split(', '):
+        name, *params = metric.split(';')
+        parsed[name] = dict(param.split('=', 1) for param in params)
+    return parsed
+
+
+class RequestTimingsTests(SimpleTestCase):
+
+    def test_server_timing(self):
+        timings = RequestTimings()
+        timings.add('db', 0.002)
+        timings.add('total', 0.0125)
+        timings.add('db', 0.001)
+        self.assertEqual(timings.server_timing(), 'total;dur=12.5, db;dur=3.0;desc="2 queries"')
+
+    def test_measure(self):
+        with measure('serialize'):
+            pass  # no request being measured
+        timings = RequestTimings()
+        token = _current.set(timings)
+        self.addCleanup(_current.reset, token)
+        with measure('serialize'):
+            with measure('serialize'):
+                pass
+        self.assertEqual(timings.counts, {'serialize': 1})
+
+
+class ServerTimingMiddlewareTests(ClinicTestCase):
+
+    def get(self, url='/api/patients/'):
+        response = client_for(self.users['admin']).get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_disabled_by_default(self):
+        self.assertFalse(self.get().has_header('Server-Timing'))
+
+    @override_settings(REQUEST_TIMING=TIMED)
+    def test_header_and_log_line(self):
+        with self.assertLogs('core.timing') as logs:
+            response = self.get()
+        timed = metrics(response['Server-Timing'])
+        self.assertEqual(list(timed), ['total', 'view', 'db', 'serialize'])
+        self.assertRegex(timed['db']['desc'], r'^"\d+ quer(y|ies)"$')
+        self.assertLessEqual(float(timed['view']['dur']), float(timed['total']['dur']))
+
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual((entry['method'], entry['path'], entry['status']), ('GET', '/api/patients/', 200))
+        self.assertEqual(entry['db_queries'], int(re.match(r'"(\d+)', timed['db']['desc'])[1]))
+
+    @override_settings(REQUEST_TIMING={**TIMED, 'SAMPLE_PERCENT': 0})
+    def test_unsampled_requests_are_not_measured(self):
+        self.assertFalse(self.get().has_header('Server-Timing'))
+
+    @override_settings(REQUEST_TIMING={**TIMED, 'HEADER': False})
+    def test_log_only(self):
+        with self.assertLogs('core.timing'):
+            self.assertFalse(self.get().has_header('Server-Timing'))
+
+    @override_settings(REQUEST_TIMING=TIMED)
+    def test_model_calls(self):
+        with fake_llm(CHATBOT_CACHE={'ENABLED': False}), self.assertLogs('core.timing'):
+            response = client_for(self.users['patient']).post('/api/chat/', {'message': 'hello'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('llm', metrics(response['Server-Timing']))
@@ -0,0 +1,61 @@
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.management.commands.fake_llm_server import FakeGeminiHandler
+from core.sample_data import create_role_users, create_clinic, local_caches
+
+# The sample data creates a user per patient; real password hashing would dominate.
+fast_password_hashing = override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@contextmanager
+def fake_llm(reply=None, delay=0, timeout=5, **chatbot_settings):
+    """
+    Point the chatbot at ``manage.py fake_llm_server``'s handler on a free
+    local port. Extra keyword arguments replace CHATBOT_CACHE or
+    CHATBOT_ADMISSION, e.g. ``CHATBOT_CACHE={'ENABLED': False}``.
+    """
+    handler = type('Handler', (FakeGeminiHandler,), {'reply': reply, 'delay': delay})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    server.verbosity = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        with override_settings(
+            GEMINI_API_KEY='test',
+            CHATBOT_LLM={'MODEL': 'gemini-pro', 'API_ENDPOINT': endpoint, 'TRANSPORT': 'rest', 'TIMEOUT': timeout},
+            **chatbot_settings,
+        ):
+            yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@fast_password_hashing
+@local_caches()
+class ClinicTestCase(TestCase):
+    """A TestCase with an admin, a doctor and a patient user (``users``) and core.sample_data's clinic."""
+    patients = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = create_role_users()
+        cls.practitioner = create_clinic(cls.users, patients=cls.patients)
+
+    def tearDown(self):
+        # The database is rolled back after each test; the caches must be too.
+        for cache in caches.all():
+            cache.clear()
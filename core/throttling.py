@@ -0,0 +1,71 @@
+from django.core.cache import caches
+from rest_framework.throttling import UserRateThrottle
+
+CACHE_ALIAS = 'shared'
+
+
+class ChatRateThrottle(UserRateThrottle):
+    """
+    Per-user limit for the chatbot: the 'chatbot' rate in DEFAULT_THROTTLE_RATES
+    (e.g. "10/min") over a sliding window. A user may send that many messages in
+    a burst, then more as the burst slides out of the window.
+
+    Each fixed window's count is one key in the shared cache, created with add()
+    and bumped with incr(), so every worker enforces the same limit; the sliding
+    estimate weights the previous window's count by how much of it still
+    overlaps. incr() is atomic on Redis and Memcached. The file cache used by
+    default implements it as a read and a write, so two workers racing for a
+    user's last message can occasionally both get it.
+    """
+    scope = 'chatbot'
+
+    @property
+    def cache(self):
+        return caches[CACHE_ALIAS]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        window, elapsed = divmod(self.timer(), self.duration)
+        current_key, previous_key = self._window_keys(self.key, int(window))
+        previous = self.cache.get(previous_key, 0)
+        # Kept through the next window, where it is the previous count.
+        self.cache.add(current_key, 0, 2 * self.duration)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # Culled between add() and incr().
+            self.cache.set(current_key, 1, 2 * self.duration)
+            current = 1
+        if previous * (1 - elapsed / self.duration) + current <= self.num_requests:
+            return True
+
+        # A refused message does not count against the user.
+        self.cache.decr(current_key)
+        self.retry_after = self._retry_after(previous, current - 1, elapsed)
+        return False
+
+    def wait(self):
+        return self.retry_after
+
+    def reset(self, ident):
+        """Forget the messages counted for ``ident`` (a user pk)."""
+        key = self.cache_format % {'scope': self.scope, 'ident': ident}
+        self.cache.delete_many(self._window_keys(key, int(self.timer() // self.duration)))
+
+    @staticmethod
+    def _window_keys(key, window):
+        return f'{key}:{window}', f'{key}:{window - 1}'
+
+    def _retry_after(self, previous, current, elapsed):
+        """Seconds until the sliding estimate leaves room for one more message."""
+        room = self.num_requests - 1 - current
+        if room >= 0:
+            # Enough of the previous window has to slide out.
+            return max(0.0, self.duration * (1 - room / previous) - elapsed)
+        # Not before the next window, once enough of this one has slid out.
+        return self.duration - elapsed + max(0.0, self.duration * (1 - (self.num_requests - 1) / current))
@@ -0,0 +1,186 @@
+"""
+Per-request performance instrumentation.
+
+ServerTimingMiddleware measures a sampled share of requests: the whole request
+(``total``), the view (``view``; for DRF views up to the returned Response,
+before it is rendered), SQL queries on every database (``db``, with their
+count), DRF serializer work (``serialize``: ``.data`` and ``is_valid()``) and
+upstream chatbot model calls (``llm``). Each measured response gets a
+``Server-Timing`` header, which browser developer tools show next to the
+request, and one JSON line on the ``core.timing`` logger.
+
+Configured by REQUEST_TIMING in settings. When it is disabled the middleware
+removes itself at startup and none of the hooks below are installed, so
+requests pay nothing. When it is enabled, requests left out of the sample
+pay one context variable lookup per query and per serializer call.
+
+The hooks report to the request's RequestTimings through a context variable,
+which also reaches the threads sync_to_async() runs views in under ASGI.
+Work done while a streaming response is sent (exports, the chat stream after
+its first chunk) happens after the headers are out and is not included.
+"""
+
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+logger = logging.getLogger('core.timing')
+
+# In the order they are reported.
+METRICS = ('total', 'view', 'db', 'serialize', 'llm')
+
+_current = ContextVar('request_timings', default=None)
+_installed = False
+
+
+def timing_settings():
+    return getattr(settings, 'REQUEST_TIMING', {})
+
+
+class RequestTimings:
+    """Seconds spent and calls made per metric during one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = {}
+        self.counts = {}
+        self.running = set()
+        self.view_started = None
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def end_view(self):
+        if self.view_started is not None and 'view' not in self.durations:
+            self.add('view', time.perf_counter() - self.view_started)
+
+    def server_timing(self):
+        """The Server-Timing header value, durations in milliseconds."""
+        metrics = []
+        for name in sorted(self.durations, key=METRICS.index):
+            metric = f'{name};dur={self.durations[name] * 1000:.1f}'
+            if name == 'db':
+                count = self.counts[name]
+                metric += f';desc="{count} {"query" if count == 1 else "queries"}"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+
+@contextmanager
+def measure(name):
+    """Add the time spent in the block to ``name`` if this request is measured."""
+    timings = _current.get()
+    # A nested block of the same metric (a serializer validating another) is
+    # already inside the outer one's time.
+    if timings is None or name in timings.running:
+        yield
+        return
+    timings.running.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.running.discard(name)
+        timings.add(name, time.perf_counter() - started)
+
+
+def _record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', time.perf_counter() - started)
+
+
+def _wrap_connection(connection, **kwargs):
+    # First in the list: connection.execute_wrapper() blocks pop the last one.
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+def _timed(method):
+    def timed(self, *args, **kwargs):
+        with measure('serialize'):
+            return method(self, *args, **kwargs)
+    return timed
+
+
+def install():
+    """Hook query, serializer and model call timing into this process (once)."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    connection_created.connect(_wrap_connection)
+    for connection in connections.all(initialized_only=True):
+        _wrap_connection(connection)
+    # Serializer.data and ListSerializer.data both end in BaseSerializer.data.
+    BaseSerializer.data = property(_timed(BaseSerializer.data.fget))
+    BaseSerializer.is_valid = _timed(BaseSerializer.is_valid)
+    ListSerializer.is_valid = _timed(ListSerializer.is_valid)
+
+
+class ServerTimingMiddleware(MiddlewareMixin):
+    """
+    Measures REQUEST_TIMING['SAMPLE_PERCENT'] percent of requests; see the
+    module docstring. Listed first in MIDDLEWARE so ``total`` covers the
+    other middleware too.
+    """
+
+    def __init__(self, get_response):
+        options = timing_settings()
+        if not options.get('ENABLED'):
+            raise MiddlewareNotUsed
+        self.sample_percent = options.get('SAMPLE_PERCENT', 100)
+        self.header = options.get('HEADER', True)
+        self.log = options.get('LOG', True)
+        install()
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        if self.sample_percent < 100 and random.random() * 100 >= self.sample_percent:
+            return
+        _current.set(RequestTimings())
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _current.get()
+        if timings is not None:
+            timings.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF Responses come back here before they are rendered.
+        timings = _current.get()
+        if timings is not None:
+            timings.end_view()
+        return response
+
+    def process_response(self, request, response):
+        timings = _current.get()
+        if timings is None:
+            return response
+        _current.set(None)
+        timings.end_view()
+        timings.add('total', time.perf_counter() - timings.started)
+        if self.header:
+            response['Server-Timing'] = timings.server_timing()
+        if self.log:
+            entry = {'method': request.method, 'path': request.path, 'status': response.status_code}
+            for name in sorted(timings.durations, key=METRICS.index):
+                entry[f'{name}_ms'] = round(timings.durations[name] * 1000, 1)
+            entry['db_queries'] = timings.counts.get('db', 0)
+            logger.info(json.dumps(entry))
+        return response
@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     PatientViewSet, PractitionerViewSet, TreatmentPlanViewSet,
     AppointmentViewSet, NotificationViewSet, FeedbackViewSet, ChatBotAPIView,
+    DashboardStatsAPIView, ChatCacheStatsAPIView, ChatAdmissionStatsAPIView, chat_stream,
     admin_dashboard, doctor_dashboard, patient_dashboard
 )
 
@@ -17,6 +18,10 @@ router.register(r'feedback', FeedbackViewSet, basename='feedback')
 urlpatterns = [
     path('', include(router.urls)),
     path('chat/', ChatBotAPIView.as_view(), name='chatbot'),
+    path('chat/stream/', chat_stream, name='chatbot_stream'),
+    path('chat/cache-stats/', ChatCacheStatsAPIView.as_view(), name='chatbot_cache_stats'),
+    path('chat/admission-stats/', ChatAdmissionStatsAPIView.as_view(), name='chatbot_admission_stats'),
+    path('dashboard-stats/', DashboardStatsAPIView.as_view(), name='dashboard_stats'),
     
     # Dashboard URL patterns
     path('admin-dashboard/', admin_dashboard, name='admin_dashboard'),
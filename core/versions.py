@@ -0,0 +1,136 @@
+"""
+Validators behind list and detail ETags.
+
+Every table in VERSIONED_MODELS has a TableVersion row whose version goes up
+with each INSERT, UPDATE and DELETE on it. On SQLite, triggers do the counting,
+so the raw and bulk writes that send no signals (imports, bulk_update(),
+QuerySet.update()) count as well. ensure_table_versions() creates the rows
+and triggers after migrate.
+
+table_versions() reads the counters of several tables with one primary-key
+lookup. It suits lists that are not scoped to the user, which a COUNT/MAX over
+every row would make a full scan, and which any write to their tables may
+change anyway. On other databases, or before the triggers exist, it returns
+None. A list scoped to the user's own rows is validated instead by
+rows_version(): the number of rows and the latest updated_at among them and
+the rows they join, so writes to other users' rows leave its ETag alone.
+"""
+
+from django.db import connections
+from django.db.models import Count, Max, Value
+
+from .models import (
+    Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback, CareRelationship,
+    PractitionerFeedbackSummary, TreatmentPlanFeedbackSummary, TableVersion,
+)
+
+VERSIONED_MODELS = (
+    Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback, CareRelationship,
+    PractitionerFeedbackSummary, TreatmentPlanFeedbackSummary,
+)
+
+EVENTS = ('insert', 'update', 'delete')
+
+
+def trigger_sql(table):
+    bump = (
+        f"UPDATE {TableVersion._meta.db_table} SET version = version + 1 WHERE name = '{table}';"
+    )
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {table}_version_{event} AFTER {event.upper()} ON {table} '
+        f'BEGIN {bump} END'
+        for event in EVENTS
+    ]
+
+
+def ensure_table_versions(using='default'):
+    """Create the missing counter rows and triggers."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    tables = set(connection.introspection.table_names())
+    if TableVersion._meta.db_table not in tables:
+        return
+    with connection.cursor() as cursor:
+        for model in VERSIONED_MODELS:
+            table = model._meta.db_table
+            if table not in tables:
+                continue
+            cursor.execute(
+                f'INSERT OR IGNORE INTO {TableVersion._meta.db_table} (name, version) VALUES (%s, 0)', [table],
+            )
+            for statement in trigger_sql(table):
+                cursor.execute(statement)
+
+
+def versions_queryset(models, using='default'):
+    names = sorted({model._meta.db_table for model in models})
+    return TableVersion.objects.using(using).filter(name__in=names).order_by('name')
+
+
+def table_versions(models, using='default'):
+    """
+    The counters of ``models``' tables in table-name order, or None when any
+    of them is not counted (another database, or not migrated yet).
+    """
+    if not models:
+        return []
+    if connections[using].vendor != 'sqlite' or not set(models) <= set(VERSIONED_MODELS):
+        return None
+    rows = list(versions_queryset(models, using).values_list('name', 'version'))
+    if len(rows) != len({model._meta.db_table for model in models}):
+        return None
+    return [version for _name, version in rows]
+
+
+def related_paths(queryset):
+    """The select_related() paths of ``queryset``, each with the model it leads to."""
+    paths = {}
+
+    def follow(model, relations, prefix):
+        for name, nested in relations.items():
+            related = model._meta.get_field(name).related_model
+            paths[prefix + name] = related
+            follow(related, nested, f'{prefix}{name}__')
+
+    def follow_all(model, depth, prefix):
+        # select_related() with no fields follows every non-null foreign key.
+        for field in model._meta.concrete_fields:
+            if field.is_relation and not field.null and depth:
+                paths[prefix + field.name] = field.related_model
+                follow_all(field.related_model, depth - 1, f'{prefix}{field.name}__')
+
+    select_related = queryset.query.select_related
+    if isinstance(select_related, dict):
+        follow(queryset.model, select_related, '')
+    elif select_related:
+        follow_all(queryset.model, queryset.query.max_depth, '')
+    return paths
+
+
+def related_models(queryset):
+    """The models whose rows select_related() joins into ``queryset``'s rows."""
+    return set(related_paths(queryset).values())
+
+
+def _has_updated_at(model):
+    return any(field.name == 'updated_at' for field in model._meta.concrete_fields)
+
+
+def rows_validator(queryset):
+    """
+    A one-row queryset of how many rows ``queryset`` has and the latest
+    updated_at among them and among the rows select_related() joins to them.
+    """
+    lookups = ['updated_at'] + [
+        f'{path}__updated_at' for path, model in related_paths(queryset).items() if _has_updated_at(model)
+    ]
+    aggregates = {'count': Count('pk')}
+    aggregates.update((f'latest_{index}', Max(lookup)) for index, lookup in enumerate(lookups))
+    # Grouping on a constant adds no GROUP BY: one row for the whole queryset.
+    return queryset.order_by().values(_all=Value(1)).annotate(**aggregates).values(*aggregates)
+
+
+def rows_version(queryset):
+    """rows_validator()'s values, as a list."""
+    return list(next(iter(rows_validator(queryset))).values())
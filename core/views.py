@@ -1,16 +1,44 @@
+import hashlib
+import json
+import math
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from rest_framework import viewsets, permissions, status
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import viewsets, permissions, serializers, status, exceptions
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.conf import settings
-import google.generativeai as genai
 
-from .models import Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback
+from .models import (
+    Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback, CareRelationship,
+    PractitionerFeedbackSummary, TreatmentPlanFeedbackSummary, START_MONTH,
+)
 from .serializers import (
     PatientSerializer, PractitionerSerializer, TreatmentPlanSerializer,
-    AppointmentSerializer, NotificationSerializer, FeedbackSerializer
+    AppointmentSerializer, NotificationSerializer, FeedbackSerializer,
+    PractitionerFeedbackSummarySerializer, TreatmentPlanFeedbackSummarySerializer, OutstandingBalanceSerializer,
 )
+from .admission import Overloaded
+from .care import add_care_relationships
+from .exports import FORMATS as EXPORT_FORMATS, export_response
+from .imports import FORMATS as IMPORT_FORMATS, IMPORTERS, input_format, read_rows
+from .llm import get_llm_client
+from .scheduling import find_conflicts, free_slots, INACTIVE_STATUSES
+from .search import search
+from .stats import get_dashboard_stats, invalidate_dashboard_stats
+from .throttling import ChatRateThrottle
+from .versions import related_models, rows_validator, rows_version, table_versions, versions_queryset
 
 # --- Template Views (Dashboards) ---
 
@@ -29,88 +57,649 @@ def patient_dashboard(request):
 
 # --- API Views (ViewSets) ---
 
-class PatientViewSet(viewsets.ModelViewSet):
+BULK_MAX_ITEMS = 1000
+
+class StatusUpdateSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Appointment.APPOINTMENT_STATUS_CHOICES)
+
+class IdListSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=BULK_MAX_ITEMS)
+
+class FilteredListMixin:
+    """
+    Shared list/retrieve implementation with conditional GET. A list that
+    get_queryset() scopes to the user's own rows carries an ETag built from
+    the count and latest updated_at of those rows and of the rows joined for
+    names (core/versions.py), so other users' writes leave it alone. Lists
+    everyone sees in full use the change counters of the tables they are
+    read from instead, a single lookup. Details carry one built from the
+    object's and its joined rows' updated_at. A matching If-None-Match is
+    answered with 304 before the page is fetched or serialized. Safe requests
+    read from a replica (see core/db_routing.py).
+    """
+    replica_reads = True
+
+    def list(self, request, *args, **kwargs):
+        return self.filtered_list(self.get_queryset())
+
+    def filtered_list(self, queryset):
+        # Whether the role scoping narrowed the rows, not an action's own filter.
+        scoped = bool(self.get_queryset().query.where)
+        queryset = self.filter_queryset(queryset)
+        etag = self.list_etag(queryset, scoped)
+        not_modified = get_conditional_response(self.request, etag=etag)
+        if not_modified is not None:
+            return self.with_validator(not_modified, etag)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            response = Response(serializer.data)
+        return self.with_validator(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = self.make_etag(*rows_version(queryset.filter(pk=instance.pk)))
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return self.with_validator(not_modified, etag)
+        return self.with_validator(Response(self.get_serializer(instance).data), etag)
+
+    @staticmethod
+    def with_validator(response, etag):
+        if etag is None:
+            return response
+        response['ETag'] = etag
+        # Browsers keep the body but revalidate on every request.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def make_etag(self, *parts):
+        # The user and full path (cursor, ?fields=) are part of the tag, since
+        # they change the body for the same underlying rows.
+        raw = '|'.join(str(part) for part in (self.request.user.pk, self.request.get_full_path(), *parts))
+        return '"%s"' % hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+    def list_etag(self, queryset, scoped):
+        """
+        The ETag of a list of ``queryset``, which get_queryset() did or did not
+        narrow to the user's rows (``scoped``); None for an unscoped list whose
+        tables' versions are not kept (see core/versions.py).
+        """
+        if scoped:
+            return self.make_etag(*rows_version(queryset))
+        versions = table_versions(self.validator_models(queryset), queryset.db)
+        return None if versions is None else self.make_etag(*versions)
+
+    def validator_queryset(self, queryset, scoped):
+        """The query list_etag() runs."""
+        if scoped:
+            return rows_validator(queryset)
+        return versions_queryset(self.validator_models(queryset), queryset.db)
+
+    def validator_models(self, queryset):
+        return {queryset.model, *related_models(queryset)}
+
+class SparseFieldsMixin:
+    """
+    ?fields=a,b / ?omit=c on GET requests trim the serializer output and the
+    SELECT column list. List routes default to the serializer's Meta.list_fields.
+    """
+
+    def get_fieldset(self):
+        if self.request is None or self.request.method not in permissions.SAFE_METHODS:
+            return None, None
+        params = self.request.query_params
+        fields = [name for name in params.get('fields', '').split(',') if name] or None
+        omit = [name for name in params.get('omit', '').split(',') if name] or None
+        if fields is None and self.action == 'export':
+            # Every field, named so that the SELECT is still pruned to their columns.
+            fields = list(self.get_serializer_class()().fields)
+        elif fields is None and not self.detail:
+            fields = getattr(self.get_serializer_class().Meta, 'list_fields', None)
+        return fields, omit
+
+    def get_serializer(self, *args, **kwargs):
+        fields, omit = self.get_fieldset()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        if omit is not None:
+            kwargs.setdefault('omit', omit)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields, omit = self.get_fieldset()
+        if fields is None and omit is None:
+            return queryset
+        columns = self.get_serializer().model_columns()
+        if columns is None:
+            return queryset
+        # The paginator reads the ordering values back from each row;
+        # annotations (a search rank) are selected anyway.
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        columns.update(
+            name.lstrip('-') for name in ordering
+            if isinstance(name, str) and name.lstrip('-') not in queryset.query.annotations
+        )
+        relations = {column.split('__', 1)[0] for column in columns if '__' in column}
+        if queryset.query.select_related:
+            queryset = queryset.select_related(None).select_related(*relations)
+        return queryset.only(*columns, *relations)
+
+class SearchMixin:
+    """
+    ?q= on list routes: full-text search within the role-scoped queryset,
+    best matches first (see core/search.py).
+    """
+
+    def filter_queryset(self, queryset):
+        text = self.request.query_params.get('q', '').strip()
+        if text and not self.detail:
+            queryset = search(queryset, text)
+        return super().filter_queryset(queryset)
+
+class ExportMixin:
+    """
+    export/ on every resource: the role-scoped queryset, with ?q= and
+    ?fields=/?omit= applied, streamed as ?output=csv (the default) or ndjson
+    with every serializer field (see core/exports.py).
+    """
+
+    @action(detail=False)
+    def export(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"output must be one of: {', '.join(EXPORT_FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(
+            request._request, queryset, lambda rows: self.get_serializer(rows, many=True), output=output,
+        )
+
+class ImportMixin:
+    """
+    POST import/ (admins only): rows of a CSV or JSON Lines upload in the
+    'file' field, in the shape of the create payload, added in batches. The
+    format comes from ?input= or the file extension. The response reports
+    each rejected row by line number (see core/imports.py); a file that
+    cannot be read to the end gets a 400 naming the line it stopped at.
+    """
+    importer = None  # key of core.imports.IMPORTERS
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        if not request.user.is_admin:
+            return Response({"error": "Only admins can import records."}, status=status.HTTP_403_FORBIDDEN)
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Expected a CSV or JSON Lines file in 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+        kind = request.query_params.get('input') or input_format(upload.name)
+        if kind not in IMPORT_FORMATS:
+            return Response(
+                {"error": f"input must be one of: {', '.join(IMPORT_FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST,
+            )
+        report = IMPORTERS[self.importer]().run(read_rows(upload, kind))
+        if 'error' in report:
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK)
+
+class PatientViewSet(SearchMixin, ImportMixin, ExportMixin, SparseFieldsMixin, FilteredListMixin, viewsets.ModelViewSet):
     serializer_class = PatientSerializer
     permission_classes = [permissions.IsAuthenticated]
+    importer = 'patients'
 
     def get_queryset(self):
         user = self.request.user
         if user.is_admin:
             return Patient.objects.all()
         elif user.is_doctor:
-            return Patient.objects.filter(treatment_plans__practitioner__user=user).distinct()
+            cared_for = CareRelationship.objects.filter(practitioner__user=user).values('patient_id')
+            return Patient.objects.filter(pk__in=cared_for)
         else:
             return Patient.objects.filter(user=user)
 
-class PractitionerViewSet(viewsets.ModelViewSet):
+    @action(detail=False)
+    def active_patients(self, request):
+        return self.filtered_list(self.get_queryset().filter(status='Active'))
+
+class PractitionerViewSet(ExportMixin, SparseFieldsMixin, FilteredListMixin, viewsets.ModelViewSet):
     queryset = Practitioner.objects.all()
     serializer_class = PractitionerSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class TreatmentPlanViewSet(viewsets.ModelViewSet):
+    @action(detail=True)
+    def available_slots(self, request, pk=None):
+        """ Free appointment start times, e.g. ?start=2025-01-01&days=14&duration=60 """
+        practitioner = self.get_object()
+        try:
+            start = None
+            if 'start' in request.query_params:
+                start = parse_date(request.query_params['start'])
+                if start is None:
+                    raise ValueError('start must be a date in YYYY-MM-DD format.')
+            days = min(self._whole_number(request.query_params, 'days', 14), 60)
+            duration = self._whole_number(request.query_params, 'duration', 60)
+            if days < 1 or duration < 5:
+                raise ValueError('days must be at least 1 and duration at least 5 minutes.')
+            slots = free_slots(practitioner, start_date=start, days=days, duration_minutes=duration)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "practitioner": practitioner.pk,
+            "duration_minutes": duration,
+            "slots": {day.isoformat(): [t.strftime('%H:%M') for t in times] for day, times in slots.items()},
+        })
+
+    @staticmethod
+    def _whole_number(params, name, default):
+        try:
+            return int(params.get(name, default))
+        except ValueError:
+            raise ValueError(f'{name} must be a whole number.') from None
+
+    @action(detail=True)
+    def feedback_summary(self, request, pk=None):
+        """ Rating averages and histogram from the running totals, without reading feedback rows """
+        practitioner = self.get_object()
+        summary = PractitionerFeedbackSummary.objects.filter(practitioner=practitioner).first()
+        if summary is None:
+            summary = PractitionerFeedbackSummary(practitioner=practitioner)
+        return Response(PractitionerFeedbackSummarySerializer(summary).data)
+
+# ?group_by= names of the outstanding-balance report and the values they group
+# on, in the order groups are returned (that of plan_outstanding_idx).
+BALANCE_GROUPS = {'practitioner': F('practitioner_id'), 'month': START_MONTH, 'patient': F('patient_id')}
+
+class TreatmentPlanViewSet(SearchMixin, ExportMixin, SparseFieldsMixin, FilteredListMixin, viewsets.ModelViewSet):
     serializer_class = TreatmentPlanSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
+        queryset = TreatmentPlan.objects.select_related('patient', 'practitioner')
         if user.is_admin:
-            return TreatmentPlan.objects.all()
+            return queryset
         elif user.is_doctor:
-            return TreatmentPlan.objects.filter(practitioner__user=user)
+            return queryset.filter(practitioner__user=user)
         else:
-            return TreatmentPlan.objects.filter(patient__user=user)
+            return queryset.filter(patient__user=user)
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+    @action(detail=False)
+    def active_plans(self, request):
+        return self.filtered_list(self.get_queryset().filter(status='active'))
+
+    @action(detail=False)
+    def outstanding(self, request):
+        """ Plans with a balance left to pay, largest remaining_amount first """
+        plans = self.get_queryset().outstanding().with_remaining_amount()
+        return self.filtered_list(plans.order_by('-remaining_amount_db'))
+
+    @action(detail=False)
+    def outstanding_balances(self, request):
+        """
+        Balance left on the user's plans, summed per group, e.g.
+        ?group_by=practitioner,month (any of practitioner, month of start_date
+        and patient; default practitioner). Groups come in that order, each
+        page from one GROUP BY over the outstanding plan indexes.
+        """
+        dimensions = set(request.query_params.get('group_by', 'practitioner').split(',')) - {''}
+        if not dimensions or not dimensions <= set(BALANCE_GROUPS):
+            return Response(
+                {"error": f"group_by must list values from: {', '.join(BALANCE_GROUPS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # Every group key is an annotation, so GROUP BY lists them in the same
+        # order as ORDER BY and the index (model columns would come first).
+        keys = {f'group_{name}': value for name, value in BALANCE_GROUPS.items() if name in dimensions}
+        amount = DecimalField(max_digits=16, decimal_places=2)
+        groups = (
+            self.get_queryset().outstanding()
+            .annotate(**keys)
+            .values(*keys)
+            .annotate(
+                plans=Count('pk'),
+                billed=Sum('total_cost', output_field=amount),
+                paid=Sum('paid_amount', output_field=amount),
+                outstanding=Sum(F('total_cost') - F('paid_amount'), output_field=amount),
+            )
+            .order_by(*keys)
+        )
+        page = self.paginate_queryset(groups)
+        for model, name in ((Practitioner, 'practitioner'), (Patient, 'patient')):
+            if f'group_{name}' in keys:
+                names = model.objects.only('first_name', 'last_name').in_bulk({row[f'group_{name}'] for row in page})
+                for row in page:
+                    row[f'{name}_name'] = str(names[row[f'group_{name}']])
+        return self.get_paginated_response(OutstandingBalanceSerializer(page, many=True).data)
+
+    @staticmethod
+    def _whole_number(params, name, default):
+        try:
+            return int(params.get(name, default))
+        except ValueError:
+            raise ValueError(f'{name} must be a whole number.') from None
+
+    @action(detail=True)
+    def feedback_summary(self, request, pk=None):
+        """ Rating averages and histogram from the running totals, without reading feedback rows """
+        plan = self.get_object()
+        summary = TreatmentPlanFeedbackSummary.objects.filter(treatment_plan=plan).first()
+        if summary is None:
+            summary = TreatmentPlanFeedbackSummary(treatment_plan=plan)
+        return Response(TreatmentPlanFeedbackSummarySerializer(summary).data)
+
+class AppointmentViewSet(ImportMixin, ExportMixin, SparseFieldsMixin, FilteredListMixin, viewsets.ModelViewSet):
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    importer = 'appointments'
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Appointment.objects.select_related('patient', 'practitioner')
         if user.is_admin:
-            return Appointment.objects.all()
+            return queryset
         elif user.is_doctor:
-            return Appointment.objects.filter(practitioner__user=user)
+            return queryset.filter(practitioner__user=user)
         else:
-            return Appointment.objects.filter(patient__user=user)
+            return queryset.filter(patient__user=user)
+
+    # Validation checks the booking for overlaps; the check and the write share
+    # one transaction so that concurrent bookings cannot both pass it (see
+    # core.scheduling.lock_schedules).
+    def create(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
+
+    @action(detail=False)
+    def todays_appointments(self, request):
+        return self.filtered_list(self.get_queryset().filter(appointment_date=timezone.localdate()))
+
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """ Create a list of appointments in one transaction """
+        if not isinstance(request.data, list) or not 0 < len(request.data) <= BULK_MAX_ITEMS:
+            return Response(
+                {"error": f"Expected a list of 1 to {BULK_MAX_ITEMS} appointments."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            appointments = serializer.save()
+            add_care_relationships((a.practitioner_id, a.patient_id) for a in appointments)
+        invalidate_dashboard_stats(
+            {a.patient.user_id for a in appointments} | {a.practitioner.user_id for a in appointments}
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        """ Apply status transitions, e.g. {"updates": [{"id": 1, "status": "confirmed"}]} """
+        updates = request.data.get('updates') if isinstance(request.data, dict) else None
+        if not isinstance(updates, list) or not 0 < len(updates) <= BULK_MAX_ITEMS:
+            return Response(
+                {"error": f"Expected 'updates' with 1 to {BULK_MAX_ITEMS} items."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = StatusUpdateSerializer(data=updates, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        new_status = {item['id']: item['status'] for item in serializer.validated_data}
+        with transaction.atomic():
+            appointments = self.get_queryset().in_bulk(new_status.keys())
+            missing = sorted(set(new_status) - set(appointments))
+            if missing:
+                return Response({"error": "Appointments not found.", "ids": missing}, status=status.HTTP_404_NOT_FOUND)
+
+            # A cancelled or no-show appointment gave up its slot; taking it back
+            # must not overlap what was booked since. Nothing is updated if any does.
+            conflicts = find_conflicts(
+                [
+                    (pk, a.practitioner, a.appointment_date, a.appointment_time, a.duration_minutes)
+                    for pk, a in appointments.items()
+                    if a.status in INACTIVE_STATUSES and new_status[pk] not in INACTIVE_STATUSES
+                ],
+                exclude=[pk for pk in appointments if new_status[pk] in INACTIVE_STATUSES],
+            )
+            if conflicts:
+                errors = []
+                for item in serializer.validated_data:
+                    if item['id'] not in conflicts:
+                        errors.append({})
+                        continue
+                    kind, ref = conflicts[item['id']]
+                    practitioner = appointments[item['id']].practitioner
+                    if kind == 'appointment':
+                        message = f"{practitioner} already has appointment {ref} at this time."
+                    else:
+                        message = f"Overlaps appointment {ref}, also reactivated by this request, for {practitioner}."
+                    errors.append({"status": [message]})
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
-class NotificationViewSet(viewsets.ModelViewSet):
+            now = timezone.now()
+            for pk, appointment in appointments.items():
+                appointment.status = new_status[pk]
+                appointment.updated_at = now
+            Appointment.objects.bulk_update(appointments.values(), ['status', 'updated_at'], batch_size=500)
+        invalidate_dashboard_stats(
+            {a.patient.user_id for a in appointments.values()} | {a.practitioner.user_id for a in appointments.values()}
+        )
+        return Response({"updated": len(appointments)})
+
+class NotificationViewSet(ExportMixin, SparseFieldsMixin, FilteredListMixin, viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Notification.objects.select_related('patient', 'practitioner')
         if user.is_admin:
-            return Notification.objects.all()
+            return queryset
         elif user.is_doctor:
-            return Notification.objects.filter(practitioner__user=user)
+            return queryset.filter(practitioner__user=user)
         else:
-            return Notification.objects.filter(patient__user=user)
+            return queryset.filter(patient__user=user)
+
+    @action(detail=False)
+    def unread_notifications(self, request):
+        return self.filtered_list(self.get_queryset().filter(status='unread'))
+
+    @action(detail=False, methods=['post'])
+    def mark_read(self, request):
+        """ Mark the given notifications read, e.g. {"ids": [1, 2, 3]} """
+        serializer = IdListSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return self._mark_read(self.get_queryset().filter(pk__in=serializer.validated_data['ids']))
+
+    @action(detail=False, methods=['post'])
+    def mark_all_read(self, request):
+        return self._mark_read(self.get_queryset())
+
+    def _mark_read(self, queryset):
+        unread = queryset.filter(status='unread')
+        with transaction.atomic():
+            user_ids = set()
+            affected = unread.order_by().values_list('patient__user_id', 'practitioner__user_id').distinct()
+            for patient_user, practitioner_user in affected:
+                user_ids.update((patient_user, practitioner_user))
+            updated = unread.update(status='read', updated_at=timezone.now())
+        invalidate_dashboard_stats(user_ids)
+        return Response({"updated": updated})
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(ExportMixin, SparseFieldsMixin, FilteredListMixin, viewsets.ModelViewSet):
     serializer_class = FeedbackSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Feedback.objects.select_related('patient', 'practitioner')
         if user.is_admin:
-            return Feedback.objects.all()
+            return queryset
         elif user.is_doctor:
-            return Feedback.objects.filter(practitioner__user=user)
+            return queryset.filter(practitioner__user=user)
         else:
-            return Feedback.objects.filter(patient__user=user)
+            return queryset.filter(patient__user=user)
+
+    @action(detail=False)
+    def summaries(self, request):
+        """
+        Feedback totals per practitioner (?by=practitioner, the default; every
+        practitioner's, like their profiles) or per treatment plan
+        (?by=treatment_plan; the plans the user can see), read from the summary
+        tables maintained by core.feedback_summary.
+        """
+        by = request.query_params.get('by', 'practitioner')
+        user = request.user
+        if by == 'practitioner':
+            queryset = PractitionerFeedbackSummary.objects.select_related('practitioner')
+            serializer_class = PractitionerFeedbackSummarySerializer
+        elif by == 'treatment_plan':
+            queryset = TreatmentPlanFeedbackSummary.objects.all()
+            if user.is_doctor:
+                queryset = queryset.filter(treatment_plan__practitioner__user=user)
+            elif not user.is_admin:
+                queryset = queryset.filter(treatment_plan__patient__user=user)
+            serializer_class = TreatmentPlanFeedbackSummarySerializer
+        else:
+            return Response({"error": "by must be 'practitioner' or 'treatment_plan'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag = self.list_etag(queryset, scoped=bool(queryset.query.where))
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return self.with_validator(not_modified, etag)
+        page = self.paginate_queryset(queryset.order_by('pk'))
+        response = self.get_paginated_response(serializer_class(page, many=True).data)
+        return self.with_validator(response, etag)
+
+class DashboardStatsAPIView(APIView):
+    """ Role-scoped counts and totals for the dashboards """
+    permission_classes = [permissions.IsAuthenticated]
+    replica_reads = True
+
+    def get(self, request):
+        return Response(get_dashboard_stats(request.user))
 
 class ChatBotAPIView(APIView):
     """ AI Chatbot API endpoint """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [ChatRateThrottle]
 
     def post(self, request):
         user_message = request.data.get("message")
         if not user_message:
             return Response({"error": "Message is required."}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            model = genai.GenerativeModel('gemini-pro')
-            response = model.generate_content(user_message)
-            return Response({"text": response.text})
+            return Response({"text": get_llm_client().generate(user_message)})
+        except Overloaded as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            headers={"Retry-After": str(e.retry_after)})
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class ChatCacheStatsAPIView(APIView):
+    """ Hit/miss counters of this process's chatbot response cache (admins only) """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_admin:
+            return Response({"error": "Only admins can view chatbot cache statistics."}, status=status.HTTP_403_FORBIDDEN)
+        cache = get_llm_client().cache
+        if cache is None:
+            return Response({"enabled": False})
+        return Response({"enabled": True, **cache.stats()})
+
+class ChatAdmissionStatsAPIView(APIView):
+    """ Queue depth, wait times and rejections of this process's chatbot admission control (admins only) """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_admin:
+            return Response({"error": "Only admins can view chatbot admission statistics."}, status=status.HTTP_403_FORBIDDEN)
+        admission = get_llm_client().admission
+        if admission is None:
+            return Response({"enabled": False})
+        return Response({"enabled": True, **admission.stats()})
+
+def _sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@csrf_exempt
+@require_POST
+async def chat_stream(request):
+    """
+    Streaming AI Chatbot endpoint. Replies are sent as server-sent events
+    ({"text": ...} per chunk, then a "done" or "error" event). Under ASGI the
+    request holds no worker thread while waiting on the model.
+    """
+    # Authenticate exactly like the DRF views (token, or session with CSRF).
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        user = await sync_to_async(lambda: drf_request.user)()
+    except exceptions.APIException as exc:
+        return JsonResponse({"error": str(exc.detail)}, status=exc.status_code)
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Authentication credentials were not provided."}, status=status.HTTP_401_UNAUTHORIZED)
+
+    throttle = ChatRateThrottle()
+    if not await sync_to_async(throttle.allow_request)(drf_request, None):
+        retry_after = math.ceil(throttle.wait())
+        response = JsonResponse({"error": f"Request was throttled. Expected available in {retry_after} seconds."},
+                                status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = str(retry_after)
+        return response
+
+    try:
+        user_message = json.loads(request.body or b'{}').get("message")
+    except (ValueError, AttributeError):
+        user_message = None
+    if not user_message:
+        return JsonResponse({"error": "Message is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Wait for the first chunk before answering, so a refused or failed call
+    # still gets a proper status code.
+    chunks = get_llm_client().stream(user_message)
+    try:
+        first = await anext(chunks)
+    except StopAsyncIteration:
+        first = None
+    except Overloaded as e:
+        response = JsonResponse({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        response['Retry-After'] = str(e.retry_after)
+        return response
+    except TimeoutError:
+        return JsonResponse({"error": "The assistant took too long to reply."}, status=status.HTTP_504_GATEWAY_TIMEOUT)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def events():
+        try:
+            if first is not None:
+                yield _sse({"text": first})
+                async for text in chunks:
+                    yield _sse({"text": text})
+        except TimeoutError:
+            yield _sse({"error": "The assistant took too long to reply."}, event="error")
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            yield _sse({"error": str(e)}, event="error")
+        else:
+            yield _sse({}, event="done")
+        finally:
+            # Releases the admission slot promptly if the client disconnects.
+            await chunks.aclose()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
\ No newline at end of file
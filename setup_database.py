@@ -12,11 +12,31 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ayursutra.settings')
 django.setup()
 
-from django.contrib.auth.models import User
+from django.contrib.auth import get_user_model
 from core.models import Patient, Practitioner, TreatmentPlan, Appointment, Notification, Feedback
 from datetime import date, datetime, timedelta
 import random
 
+User = get_user_model()
+
+
+def get_or_create_user(data, user_type):
+    """Login account for a sample practitioner or patient (password: password123)"""
+    user, created = User.objects.get_or_create(
+        username=data['email'].split('@')[0],
+        defaults={
+            'email': data['email'],
+            'first_name': data['first_name'],
+            'last_name': data['last_name'],
+            'user_type': user_type,
+            'license_number': data.get('license_number'),
+        },
+    )
+    if created:
+        user.set_password('password123')
+        user.save()
+    return user
+
 def create_sample_data():
     """Create sample data for the application"""
     
@@ -24,7 +44,7 @@ def create_sample_data():
     
     # Create superuser if it doesn't exist
     if not User.objects.filter(username='admin').exists():
-        User.objects.create_superuser('admin', 'admin@ayursutra.com', 'admin123')
+        User.objects.create_superuser('admin', 'admin@ayursutra.com', 'admin123', user_type='admin')
         print("Created superuser: admin/admin123")
     
     # Clear existing data (optional - remove if you want to keep existing data)
@@ -81,7 +101,7 @@ def create_sample_data():
     
     practitioners = []
     for data in practitioners_data:
-        practitioner = Practitioner.objects.create(**data)
+        practitioner = Practitioner.objects.create(user=get_or_create_user(data, 'doctor'), **data)
         practitioners.append(practitioner)
         print(f"Created practitioner: Dr. {practitioner.first_name} {practitioner.last_name}")
     
@@ -156,7 +176,7 @@ def create_sample_data():
     
     patients = []
     for data in patients_data:
-        patient = Patient.objects.create(**data)
+        patient = Patient.objects.create(user=get_or_create_user(data, 'patient'), **data)
         patients.append(patient)
         print(f"Created patient: {patient.first_name} {patient.last_name}")
     
@@ -374,6 +394,7 @@ def create_sample_data():
     print(f"Created {Feedback.objects.count()} feedback entries")
     print("\nYou can now access the admin panel at /admin/")
     print("Superuser credentials: admin / admin123")
+    print("Practitioner and patient logins use their email name / password123")
     print("="*50)
 
 if __name__ == "__main__":
@@ -169,6 +169,59 @@ class APIClient {
         });
     }
 
+    async streamChatMessage(message, onText) {
+        // Reads the server-sent events from chat/stream/ and reports the reply so far.
+        const response = await fetch(`${API_BASE_URL}/chat/stream/`, {
+            method: 'POST',
+            headers: this.getHeaders(),
+            body: JSON.stringify({ message: message })
+        });
+
+        if (response.status === 401) {
+            this.logout();
+            throw new Error('Authentication required');
+        }
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let reply = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const event = this.parseServerEvent(buffer.slice(0, boundary));
+                buffer = buffer.slice(boundary + 2);
+                if (event.type === 'error') {
+                    throw new Error(event.data.error);
+                }
+                if (event.data.text) {
+                    reply += event.data.text;
+                    onText(reply);
+                }
+            }
+        }
+        return reply;
+    }
+
+    parseServerEvent(block) {
+        const event = { type: 'message', data: {} };
+        for (const line of block.split('\n')) {
+            if (line.startsWith('event: ')) {
+                event.type = line.slice(7);
+            } else if (line.startsWith('data: ')) {
+                event.data = JSON.parse(line.slice(6));
+            }
+        }
+        return event;
+    }
+
     async markNotificationAsRead(notificationId) {
         return this.updateDocument('notifications', notificationId, { status: 'read' });
     }
@@ -284,12 +337,22 @@ class ChatBot {
         this.showTypingIndicator();
 
         try {
-            const response = await this.apiClient.sendChatMessage(message, this.chatHistory);
+            // Show the reply as it streams in
+            let bubble = null;
+            const reply = await this.apiClient.streamChatMessage(message, (text) => {
+                if (!bubble) {
+                    this.hideTypingIndicator();
+                    bubble = this.addMessageToUI(text, 'assistant');
+                } else {
+                    bubble.innerHTML = this.formatMessage(text);
+                    this.scrollToBottom();
+                }
+            });
             
             // Add to chat history
             this.chatHistory.push(
                 { role: 'user', content: message },
-                { role: 'assistant', content: response.response }
+                { role: 'assistant', content: reply }
             );
 
             // Keep only last 10 exchanges
@@ -298,7 +361,6 @@ class ChatBot {
             }
 
             this.hideTypingIndicator();
-            this.addMessageToUI(response.response, 'assistant');
         } catch (error) {
             console.error('Chat error:', error);
             this.hideTypingIndicator();
@@ -340,6 +402,7 @@ class ChatBot {
         messageDiv.appendChild(bubble);
         messagesContainer.appendChild(messageDiv);
         this.scrollToBottom();
+        return bubble;
     }
 
     formatMessage(message) {